@@ -0,0 +1,76 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+# Components API tests
+
+import uuid
+
+from .lib import common
+
+NEXT_CURSOR_HEADER = "BOS-Next-Cursor"
+
+
+def test_snapshot_listing_matching_nothing():
+    """
+    A snapshot listing whose filters match no components returns an empty page, with no cursor
+    """
+    params = {"session": f"no-such-session-{uuid.uuid4().hex}", "snapshot": "true",
+              "page_size": "100"}
+    r = common.create_session().get(common.get_service_url('v2/components'), params=params)
+    assert (r.status_code, r.json()) == (200, []), \
+        "expected (200, []) received ({}, {})".format(r.status_code, r.text)
+    assert NEXT_CURSOR_HEADER not in r.headers, \
+        "expected no {} header".format(NEXT_CURSOR_HEADER)
+
+
+def test_single_page_snapshot_listing_is_conditional():
+    """
+    A snapshot listing which fits on one page has an ETag, and can be requested conditionally
+    """
+    session = common.create_session()
+    url = common.get_service_url('v2/components')
+    params = {"session": f"no-such-session-{uuid.uuid4().hex}", "snapshot": "true",
+              "page_size": "100"}
+    r = session.get(url, params=params)
+    assert r.status_code == 200 and "ETag" in r.headers, \
+        "expected 200 with an ETag received {} with headers {}".format(r.status_code, r.headers)
+    r = session.get(url, params=params, headers={"If-None-Match": r.headers["ETag"]})
+    assert r.status_code in (200, 304), \
+        "expected 200 or 304 received {} with data\n{}".format(r.status_code, r.text)
+
+
+def test_list_disabled_components():
+    """
+    Listing with enabled=false returns exactly the components which are not enabled
+    """
+    session = common.create_session()
+    url = common.get_service_url('v2/components')
+    r = session.get(url)
+    assert r.status_code == 200, \
+        "expected 200 received {} with data\n{}".format(r.status_code, r.text)
+    expected = sorted(c["id"] for c in r.json() if not c.get("enabled"))
+    r = session.get(url, params={"enabled": "false"})
+    assert r.status_code == 200, \
+        "expected 200 received {} with data\n{}".format(r.status_code, r.text)
+    assert sorted(c["id"] for c in r.json()) == expected, \
+        "expected only the disabled components, received\n{}".format(r.text)
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2025-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -23,12 +23,29 @@
 #
 from abc import ABC, abstractmethod
 from types import TracebackType
-from typing import Unpack
+from typing import NamedTuple, Unpack
 
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from requests_retry_session import RequestsRetryAdapterArgs
 
 from bos.common.utils import RetrySessionManager
 
+class ConnectionStats(NamedTuple):
+    """
+    The number of HTTP requests made by an API client, and the number of connections it opened
+    to make them. Requests which did not need a new connection reused an existing one.
+    """
+    requests: int
+    connections: int
+
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.connections, 0)
+
+    def __str__(self) -> str:
+        return (f"{self.requests} requests, {self.connections} new connections, "
+                f"{self.reused} reused")
+
 class APIClient[Endpoints](RetrySessionManager, ABC):
     """
     As a subclass of RetrySessionManager, this class can be used as a context manager,
@@ -49,6 +66,35 @@ class APIClient[Endpoints](RetrySessionManager, ABC):
     @abstractmethod
     def _init_endpoints(self) -> Endpoints: ...
 
+    def _http_adapters(self) -> list[HTTPAdapter]:
+        return [adapter for adapter in self.requests_session.adapters.values()
+                if isinstance(adapter, HTTPAdapter)]
+
+    def set_pool_size(self, maxsize: int) -> None:
+        """
+        Set the maximum number of connections kept open to each host by the requests session.
+        Must be called in the context of this client, while no requests are being made. Any
+        connections already open are closed.
+        """
+        for adapter in self._http_adapters():
+            adapter.poolmanager.clear()
+            adapter.init_poolmanager(DEFAULT_POOLSIZE, maxsize)
+
+    def connection_stats(self) -> ConnectionStats:
+        """
+        Returns the connection statistics of the requests session, for the connection pools it
+        currently has. Must be called in the context of this client.
+        """
+        requests = connections = 0
+        for adapter in self._http_adapters():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                if (pool := pools.get(key)) is None:
+                    continue
+                requests += pool.num_requests
+                connections += pool.num_connections
+        return ConnectionStats(requests=requests, connections=connections)
+
     def __exit__(self, exc_type: type[BaseException] | None,
                  exc_val: BaseException | None,
                  exc_tb: TracebackType | None) -> bool | None:
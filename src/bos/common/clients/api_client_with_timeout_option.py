@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2025-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -43,6 +43,8 @@ class APIClientWithTimeoutOption[T](APIClient[T], ABC):
                  **adapter_kwargs: Unpack[RequestsRetryAdapterArgs]) -> None:
         self._bos_options = options if bos_options is None else bos_options
         kwargs = self.retry_kwargs
+        # Saved so that changes to the options they are based on can be detected
+        self._initial_retry_kwargs = kwargs.copy()
         kwargs.update(adapter_kwargs)
         super().__init__(**kwargs)
 
@@ -60,3 +62,11 @@ class APIClientWithTimeoutOption[T](APIClient[T], ABC):
     @property
     def retry_kwargs(self) -> RequestsRetryAdapterArgs:
         return { "read_timeout": self.read_timeout }
+
+    @property
+    def retry_kwargs_changed(self) -> bool:
+        """
+        Returns True if the retry arguments (which are based on the BOS options) have changed
+        since this client was created. The client must be recreated for the changes to apply.
+        """
+        return self.retry_kwargs != self._initial_retry_kwargs
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -26,7 +26,7 @@ from collections.abc import Iterable, Mapping
 import logging
 from typing import cast
 
-from bos.common.clients.endpoints import BaseEndpoint
+from bos.common.clients.endpoints import BaseEndpoint, BaseGenericEndpoint
 from bos.common.clients.endpoints.base_generic_endpoint import GetDeleteKwargs, RequestKwargs
 from bos.common.tenant_utils import get_new_tenant_header
 from bos.common.utils import PROTOCOL
@@ -44,6 +44,21 @@ class BaseBosEndpoint(BaseEndpoint, ABC):
     The individual endpoint needs to be overridden for a specific endpoint.
     """
     BASE_ENDPOINT = BASE_BOS_ENDPOINT
+    # The BOS API accepts compressed request bodies
+    REQUEST_COMPRESSION_MIN_BYTES = 16*1024
+    # The BOS API returns ETags for components, sessions, and session templates
+    CONDITIONAL_GETS = True
+
+
+class BaseBosGenericEndpoint[RequestReturnT](BaseGenericEndpoint[RequestReturnT], ABC):
+    """
+    This base class provides generic access to the BOS API, for cases where something
+    other than the response body is returned (such as response headers as well).
+    The individual endpoint needs to be overridden for a specific endpoint.
+    """
+    BASE_ENDPOINT = BASE_BOS_ENDPOINT
+    REQUEST_COMPRESSION_MIN_BYTES = BaseBosEndpoint.REQUEST_COMPRESSION_MIN_BYTES
+    CONDITIONAL_GETS = BaseBosEndpoint.CONDITIONAL_GETS
 
 def get_delete_request_kwargs(tenant: str|None,
                               uri: str|None=None,
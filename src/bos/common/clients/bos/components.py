@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -21,21 +21,30 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 #
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 import logging
-from typing import Unpack
+from typing import NamedTuple, Self, Unpack, cast
 
+import requests
+
+from bos.common.clients.endpoints import ResponseData
 from bos.common.types.components import (ComponentData,
+                                         ComponentQuery,
                                          ComponentRecord,
                                          ComponentUpdateFilter,
                                          GetComponentsFilter)
 from bos.common.types.components import ComponentBulkUpdateParams as CompBulkUpdateParams
 
-from .base import (BaseBosNonTenantAwareGetItemEndpoint,
+from bos.common.values import NEXT_CURSOR_HEADER
+
+from .base import (BaseBosGenericEndpoint,
+                   BaseBosNonTenantAwareGetItemEndpoint,
                    BaseBosNonTenantAwareGetItemsEndpoint,
                    BaseBosNonTenantAwareUpdateItemEndpoint,
                    BaseBosNonTenantAwareUpdateItemsEndpoint,
-                   BaseBosNonTenantAwarePutItemsEndpoint)
+                   BaseBosNonTenantAwarePutItemsEndpoint,
+                   get_delete_request_kwargs,
+                   request_kwargs)
 from .options import options
 
 LOGGER = logging.getLogger(__name__)
@@ -44,6 +53,77 @@ type CompList = list[ComponentRecord]
 type CompUpdateData = ComponentData | ComponentRecord
 type CompBulkUpdateData = CompList | ComponentUpdateFilter
 
+# If the ids filter is longer than this, the components are retrieved using the query endpoint
+# (with the filters in the request body) rather than a GET request, to avoid URL length limits
+MAX_GET_IDS_LENGTH = 4096
+
+class ComponentPage(NamedTuple):
+    """
+    A page of a component listing
+    """
+    components: CompList
+    # The cursor for the next page, if this is a full page of a snapshot listing
+    next_cursor: str | None
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> Self:
+        return cls(components=cast(CompList, ResponseData.from_response(response).body),
+                   next_cursor=response.headers.get(NEXT_CURSOR_HEADER))
+
+type _GetPageFunc = Callable[[str | None, str | None], ComponentPage]
+
+def _get_all_pages(get_page: _GetPageFunc, page_size: int) -> CompList:
+    """
+    Call get_page(start_after_id, cursor) repeatedly, until a partial page is returned.
+    Returns all of the components.
+
+    The first page is requested with neither argument. Each following page is requested using
+    the cursor returned with the previous page, or, if there was none (because the server
+    does not support snapshot listings), after the ID of the last component of the previous page.
+    """
+    page = get_page(None, None)
+    results = page.components
+    if page_size == 0:
+        return results
+    while len(page.components) == page_size:
+        if page.next_cursor:
+            page = get_page(None, page.next_cursor)
+        else:
+            page = get_page(page.components[-1]["id"], None)
+        results.extend(page.components)
+    return results
+
+def _filter_to_query(kwargs: GetComponentsFilter) -> ComponentQuery:
+    """
+    Convert GET /v2/components parameters to the equivalent POST /v2/components/query body
+    """
+    query = cast(ComponentQuery, { key: value for key, value in kwargs.items()
+                                   if key not in ("ids", "fields") })
+    if "ids" in kwargs:
+        query["ids"] = [comp_id for comp_id in kwargs["ids"].split(",") if comp_id]
+    if "fields" in kwargs:
+        query["fields"] = [field for field in kwargs["fields"].split(",") if field]
+    return query
+
+class ComponentPagesEndpoint(BaseBosGenericEndpoint[ComponentPage]):
+    """
+    Used by ComponentEndpoint to retrieve pages of components, along with the cursor for the
+    next page (which is returned in a response header)
+    """
+    ENDPOINT = 'components'
+
+    @classmethod
+    def format_response(cls, response: requests.Response) -> ComponentPage:
+        return ComponentPage.from_response(response)
+
+    def get_page(self, params: GetComponentsFilter) -> ComponentPage:
+        kwargs = get_delete_request_kwargs(tenant=None, params=params)
+        return self.get(**kwargs)
+
+    def query_page(self, query: ComponentQuery) -> ComponentPage:
+        kwargs = request_kwargs(tenant=None, uri="query", json=query)
+        return self.post(**kwargs)
+
 class ComponentEndpoint(
     BaseBosNonTenantAwareGetItemEndpoint[ComponentRecord],
     BaseBosNonTenantAwareGetItemsEndpoint[GetComponentsFilter, ComponentRecord],
@@ -54,23 +134,58 @@ class ComponentEndpoint(
 ):
     ENDPOINT = 'components'
 
+    def __init__(self, session: requests.Session) -> None:
+        super().__init__(session)
+        self._pages = ComponentPagesEndpoint(session)
+
     def get_component(self, component_id: str) -> ComponentRecord:
         return self.get_item_untenanted(component_id)
 
     def get_components(self, **kwargs: Unpack[GetComponentsFilter]) -> CompList:
+        """
+        Retrieve all of the matching components, one page at a time. A snapshot listing is used,
+        so that components created or deleted in the meantime cannot cause any of the others to
+        be skipped or repeated. (The server only creates the snapshot if there is more than one
+        page, so that a listing which fits on one page can still be a conditional request.)
+        """
+        if len(kwargs.get("ids", "")) > MAX_GET_IDS_LENGTH:
+            return self.query_components(**_filter_to_query(kwargs))
         page_size = kwargs.get("page_size")
         if page_size is None:
             kwargs["page_size"] = page_size = options.max_component_batch_size
-        results = self.get_items_untenanted(params=kwargs)
-        if page_size == 0:
-            return results
-        next_page = results
-        while len(next_page) == page_size:
-            last_id = next_page[-1]["id"]
-            kwargs["start_after_id"]=last_id
-            next_page = self.get_items_untenanted(params=kwargs)
-            results.extend(next_page)
-        return results
+        kwargs.setdefault("snapshot", True)
+
+        def get_page(start_after_id: str | None, cursor: str | None) -> ComponentPage:
+            if cursor is not None:
+                # The ids filter is part of the snapshot, so it does not need to be resent
+                kwargs.pop("ids", None)
+                kwargs["cursor"] = cursor
+            elif start_after_id is not None:
+                kwargs["start_after_id"] = start_after_id
+            return self._pages.get_page(kwargs)
+
+        return _get_all_pages(get_page, page_size)
+
+    def query_components(self, **query: Unpack[ComponentQuery]) -> CompList:
+        """
+        The same as get_components, except that the filters are sent in the request body,
+        so there is no limit on the number of IDs that can be specified
+        """
+        page_size = query.get("page_size")
+        if page_size is None:
+            query["page_size"] = page_size = options.max_component_batch_size
+        query.setdefault("snapshot", True)
+
+        def get_page(start_after_id: str | None, cursor: str | None) -> ComponentPage:
+            if cursor is not None:
+                # The ids filter is part of the snapshot, so it does not need to be resent
+                query.pop("ids", None)
+                query["cursor"] = cursor
+            elif start_after_id is not None:
+                query["start_after_id"] = start_after_id
+            return self._pages.query_page(query)
+
+        return _get_all_pages(get_page, page_size)
 
     def update_component(self, component_id: str, data: CompUpdateData) -> ComponentRecord:
         return self.update_item_untenanted(component_id, data)
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -22,11 +22,16 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 #
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import Mapping
+import copy
+import json
 import logging
-from typing import cast, TypedDict, Unpack
+import threading
+from typing import cast, ClassVar, TypedDict, Unpack
 
 import requests
+import zstandard
 
 from bos.common.utils import compact_response_text
 
@@ -54,6 +59,72 @@ class RequestKwargs(GetDeleteKwargs, total=False):
     json: object
 
 
+class _ResponseCache:
+    """
+    The parsed result of the most recent successful response to each GET request (identified
+    by its URL and headers) which had an ETag, so that the request can be made conditional the
+    next time. The cache is bounded by the total size of the response bodies, and the least
+    recently used results are discarded when it is full.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+        # Maps each request key to the ETag, the result, and the size of the response body
+        self._results: OrderedDict[str, tuple[str, object, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def request_key(url: str, options: RequestOptions) -> str:
+        """
+        Returns the cache key for a GET request with the specified URL and options
+        """
+        full_url = requests.Request("GET", url, params=options.get("params")).prepare().url
+        headers = sorted((str(name).lower(), str(value))
+                         for name, value in (options.get("headers") or {}).items())
+        return f"{full_url} {headers}"
+
+    def get(self, key: str) -> tuple[str, object] | None:
+        """
+        Returns the ETag and the result, if there is a cached result for the request.
+        The result must not be modified.
+        """
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return None
+            self._results.move_to_end(key)
+            return entry[0], entry[1]
+
+    def put(self, key: str, etag: str, result: object, size: int) -> None:
+        """
+        Cache a copy of the result of a response whose body was size bytes, so that the caller
+        can still modify the result itself
+        """
+        if size > self._max_bytes:
+            self.discard(key)
+            return
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._discard(key)
+            self._results[key] = (etag, result, size)
+            self._total_bytes += size
+            while self._total_bytes > self._max_bytes:
+                _, (_, _, evicted_size) = self._results.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def discard(self, key: str) -> None:
+        """
+        Remove any cached result for the request
+        """
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        if (entry := self._results.pop(key, None)) is not None:
+            self._total_bytes -= entry[2]
+
+
 class BaseGenericEndpoint[RequestReturnT](ABC):
     """
     This base class provides generic access to an API endpoint.
@@ -67,6 +138,18 @@ class BaseGenericEndpoint[RequestReturnT](ABC):
     BASE_ENDPOINT: str = ''
     ENDPOINT: str = ''
 
+    # JSON request bodies of at least this many bytes are sent zstd-compressed.
+    # Only enabled (by setting this to a positive value) for endpoints whose server
+    # supports compressed request bodies.
+    REQUEST_COMPRESSION_MIN_BYTES: ClassVar[int] = 0
+
+    # If True, GET responses with ETags are cached, and the requests are made conditional.
+    # Only enabled for endpoints whose server returns ETags.
+    CONDITIONAL_GETS: ClassVar[bool] = False
+
+    # Shared by all endpoints (and all API clients), so that it persists between clients
+    _response_cache = _ResponseCache(max_bytes=32*1024*1024)
+
     @property
     def error_handler(self) -> type[BaseRequestErrorHandler]:
         return RequestErrorHandler
@@ -113,13 +196,58 @@ class BaseGenericEndpoint[RequestReturnT](ABC):
     @classmethod
     def _request(cls, method: RequestsMethod, url: str, /,
                  **kwargs: Unpack[RequestOptions]) -> RequestReturnT:
-        """Make API request"""
+        """
+        Make API request
+
+        For endpoints with CONDITIONAL_GETS set, GET requests are made conditional if a previous
+        response to the same request had an ETag. If the server reports that the data has not
+        been modified since then, (a copy of) the result of the previous response is returned.
+        """
+        cls._compress_request_body(kwargs)
+        cache_key: str | None = None
+        cached: tuple[str, object] | None = None
+        if cls.CONDITIONAL_GETS and method.__name__ == "get":
+            cache_key = cls._response_cache.request_key(url, kwargs)
+            if (cached := cls._response_cache.get(cache_key)) is not None:
+                kwargs["headers"] = {**(kwargs.get("headers") or {}), "If-None-Match": cached[0]}
         with method(url, **kwargs) as response:
             LOGGER.debug("Response status code=%d, reason=%s, body=%s", response.status_code,
                  response.reason, compact_response_text(response.text))
+            if response.status_code == 304 and cached is not None:
+                LOGGER.debug("Not modified; using previous result")
+                # Callers are free to modify the results they are given, so this returns a
+                # copy. That is still cheaper than decoding and parsing the body again.
+                return cast(RequestReturnT, copy.deepcopy(cached[1]))
             if not response.ok:
                 raise ApiResponseError(response=response, method=method.__name__.upper(), url=url)
-            return cls.format_response(response)
+            result = cls.format_response(response)
+            if cache_key is not None:
+                if etag := response.headers.get("ETag"):
+                    cls._response_cache.put(cache_key, etag, result, len(response.content))
+                else:
+                    cls._response_cache.discard(cache_key)
+            return result
+
+    @classmethod
+    def _compress_request_body(cls, kwargs: RequestOptions) -> None:
+        """
+        If the request has a JSON body, and this endpoint supports compressed request bodies,
+        replace it with the encoded body, compressed if it is large enough. The body is sent
+        as encoded here, so that it is not encoded again by requests.
+        """
+        if cls.REQUEST_COMPRESSION_MIN_BYTES <= 0 or "json" not in kwargs:
+            return
+        # Encoded the same way as requests encodes JSON bodies
+        body = json.dumps(kwargs.pop("json"), allow_nan=False).encode()
+        headers = {**(kwargs.get("headers") or {}), "Content-Type": "application/json"}
+        if len(body) >= cls.REQUEST_COMPRESSION_MIN_BYTES:
+            compressed_body = zstandard.ZstdCompressor().compress(body)
+            LOGGER.debug("Compressed request body: %d -> %d bytes", len(body),
+                         len(compressed_body))
+            body = compressed_body
+            headers["Content-Encoding"] = "zstd"
+        kwargs["data"] = body
+        kwargs["headers"] = headers
 
     def delete(self, **kwargs: Unpack[GetDeleteKwargs]) -> RequestReturnT:
         """Delete request"""
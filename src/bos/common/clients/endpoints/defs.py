@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -41,6 +41,7 @@ class RequestOptions(TypedDict, total=False):
     """
     params: Mapping[str,object]|None
     json: object
+    data: bytes
     headers: Mapping[str,object]|None
     verify: bool
 
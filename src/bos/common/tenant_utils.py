@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2023-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2023-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -23,10 +23,13 @@
 #
 
 from collections.abc import Callable
+from dataclasses import dataclass, field
 import functools
 import logging
 import hashlib
-from typing import cast, ParamSpec, Required, TypedDict, TypeVar
+import threading
+import time
+from typing import cast, ParamSpec, Protocol, Required, TypedDict, TypeVar
 
 import connexion
 from connexion.lifecycle import ConnexionResponse as CxResponse
@@ -34,7 +37,7 @@ import requests
 from requests.exceptions import HTTPError
 
 from bos.common.types.general import JsonDict
-from bos.common.utils import exc_type_msg, retry_session_get, PROTOCOL
+from bos.common.utils import exc_type_msg, float_from_env, retry_session_get, PROTOCOL
 
 LOGGER = logging.getLogger(__name__)
 
@@ -45,11 +48,62 @@ SERVICE_NAME = 'cray-tapms/v1alpha3'  # CASMCMS-9125: Currently when TAPMS bumps
 BASE_ENDPOINT = f"{PROTOCOL}://{SERVICE_NAME}"
 TENANT_ENDPOINT = f"{BASE_ENDPOINT}/tenants"  # CASMPET-6433 changed this from tenant to tenants
 
+# Tenant data retrieved from TAPMS is reused for this long before it is retrieved again
+TENANT_CACHE_TTL_SECONDS = float_from_env("BOS_TENANT_CACHE_TTL_SECONDS", 30.0)
+
+# Once the TTL has expired, the old tenant data continues to be used for up to this long while
+# it is being refreshed in the background (except by callers which request fresh data). The
+# component sets limit what each tenant can access, so this is kept short.
+TENANT_CACHE_STALE_SECONDS = float_from_env("BOS_TENANT_CACHE_STALE_SECONDS", 30.0)
+
+
 
 class InvalidTenantException(Exception):
     pass
 
 
+class TenantDataUnavailableException(Exception):
+    pass
+
+
+class TenantMetrics(Protocol):
+    """
+    Records metrics for the retrieval of tenant data. By default, nothing is recorded; the API
+    server sets this (see set_tenant_metrics) to report them at /metrics.
+    """
+
+    def observe_tapms_request(self, seconds: float) -> None:
+        """Called with the time taken by each request for tenant data from TAPMS"""
+
+    def observe_cache_lookup(self, result: str) -> None:
+        """Called for each tenant cache lookup, with its result: hit, stale_hit, or miss"""
+
+    def observe_cache_error(self) -> None:
+        """Called for each failed attempt to retrieve tenant data for the cache"""
+
+
+class _NoTenantMetrics:
+    def observe_tapms_request(self, seconds: float) -> None:
+        pass
+
+    def observe_cache_lookup(self, result: str) -> None:
+        pass
+
+    def observe_cache_error(self) -> None:
+        pass
+
+
+_METRICS: TenantMetrics = _NoTenantMetrics()
+
+
+def set_tenant_metrics(metrics: TenantMetrics) -> None:
+    """
+    Set the object used to record metrics for the retrieval of tenant data in this process
+    """
+    global _METRICS  # pylint: disable=global-statement
+    _METRICS = metrics
+
+
 class TenantResource(TypedDict, total=False):
     """
     https://github.com/Cray-HPE/cray-tapms-operator/blob/main/docs/openapi.yaml
@@ -117,38 +171,185 @@ def get_tenant_aware_key(key: str, tenant: str | None) -> str:
 
 def get_tenant_data(tenant: str, session: requests.Session | None = None) -> Tenant:
     url = f"{TENANT_ENDPOINT}/{tenant}"
-    with retry_session_get(url, session=session) as response:
-        try:
-            response.raise_for_status()
-        except HTTPError as e:
-            LOGGER.error("Failed getting tenant data from tapms: %s",
-                         exc_type_msg(e))
-            if response.status_code == 404:
-                raise InvalidTenantException(
-                    f"Data not found for tenant {tenant}") from e
-            raise
-        return cast(Tenant, response.json())
-
-
-def get_tenant_component_set(tenant: str) -> set[str]:
+    start_time = time.monotonic()
+    try:
+        with retry_session_get(url, session=session) as response:
+            try:
+                response.raise_for_status()
+            except HTTPError as e:
+                LOGGER.error("Failed getting tenant data from tapms: %s",
+                             exc_type_msg(e))
+                if response.status_code == 404:
+                    raise InvalidTenantException(
+                        f"Data not found for tenant {tenant}") from e
+                raise
+            return cast(Tenant, response.json())
+    finally:
+        _METRICS.observe_tapms_request(time.monotonic() - start_time)
+
+
+def _tenant_component_set(data: Tenant) -> frozenset[str]:
     """
-    Returns set of component IDs that are assigned to the specified tenant
+    Returns set of component IDs that are assigned to the tenant with the specified data
     """
     components: set[str] = set()
-    if not tenant:
-        return components
-    data = get_tenant_data(tenant)
     status = data.get("status", {})
     tenantresources: list[TenantResource] = status.get("tenantresources", [])
     for resource in tenantresources:
         xnames: list[str] = resource.get("xnames", [])
         components.update(xnames)
-    return components
+    return frozenset(components)
+
+
+@dataclass(frozen=True)
+class _TenantCacheEntry:
+    """
+    The result of looking up a tenant in TAPMS: either its component set, or (if TAPMS reported
+    that the tenant does not exist) the message for the InvalidTenantException to raise
+    """
+    components: frozenset[str] | None
+    # Time (from time.monotonic) that the data was retrieved
+    retrieved: float
+    invalid_tenant_msg: str = ""
+
+
+@dataclass
+class _TenantFetch:
+    """
+    A TAPMS lookup which is in progress. Other threads which need the same tenant wait for
+    it to finish, rather than making their own TAPMS requests.
+    """
+    done: threading.Event = field(default_factory=threading.Event)
+    entry: _TenantCacheEntry | None = None
+    # Description of the error, if the fetch failed
+    error: str = ""
+
+
+class TenantDataCache:
+    """
+    Threadsafe cache of the component sets of tenants, as retrieved from TAPMS.
+
+    Data is reused for ttl seconds. After that, it continues to be returned for up to stale
+    seconds, while a background thread retrieves new data, unless the caller does not allow
+    stale data. Only one TAPMS request is made
+    at a time for any given tenant. Tenants that TAPMS reports do not exist are cached in the
+    same way, but failed TAPMS requests are not.
+    """
+
+    def __init__(self, ttl: float, stale: float) -> None:
+        self._ttl = ttl
+        self._stale = stale
+        self._entries: dict[str, _TenantCacheEntry] = {}
+        self._fetches: dict[str, _TenantFetch] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get_component_set(self, tenant: str, allow_stale: bool = True) -> frozenset[str]:
+        """
+        Returns the set of component IDs that are assigned to the specified tenant.
+        Raises InvalidTenantException if the tenant does not exist.
+        If allow_stale is False, data older than the TTL is never returned.
+        """
+        entry = self._get_entry(tenant, allow_stale)
+        if entry.components is None:
+            raise InvalidTenantException(entry.invalid_tenant_msg)
+        return entry.components
+
+    def clear(self) -> None:
+        """Discards all cached data"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Returns the cache counters"""
+        return { "hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses,
+                 "errors": self.errors, "entries": len(self._entries) }
+
+    def _get_entry(self, tenant: str, allow_stale: bool) -> _TenantCacheEntry:
+        with self._lock:
+            entry = self._entries.get(tenant)
+            age = time.monotonic() - entry.retrieved if entry is not None else float("inf")
+            if entry is not None and age < self._ttl:
+                self.hits += 1
+                _METRICS.observe_cache_lookup("hit")
+                return entry
+            fetch = self._fetches.get(tenant)
+            start_fetch = fetch is None
+            if fetch is None:
+                fetch = _TenantFetch()
+                self._fetches[tenant] = fetch
+            if allow_stale and entry is not None and age < self._ttl + self._stale:
+                self.stale_hits += 1
+                _METRICS.observe_cache_lookup("stale_hit")
+                if start_fetch:
+                    threading.Thread(target=self._fetch, args=(tenant, fetch), daemon=True,
+                                     name=f"tenant-refresh-{tenant}").start()
+                return entry
+            self.misses += 1
+            _METRICS.observe_cache_lookup("miss")
+        if start_fetch:
+            self._fetch(tenant, fetch)
+        else:
+            fetch.done.wait()
+        if fetch.entry is not None:
+            return fetch.entry
+        # This means the fetch failed
+        raise TenantDataUnavailableException(
+            f"Unable to retrieve data for tenant {tenant}: {fetch.error}")
+
+    def _fetch(self, tenant: str, fetch: _TenantFetch) -> None:
+        """
+        Retrieves the data for the specified tenant from TAPMS, and notifies any threads that are
+        waiting for it
+        """
+        try:
+            try:
+                fetch.entry = _TenantCacheEntry(
+                    components=_tenant_component_set(get_tenant_data(tenant)),
+                    retrieved=time.monotonic())
+            except InvalidTenantException as err:
+                fetch.entry = _TenantCacheEntry(components=None, retrieved=time.monotonic(),
+                                                invalid_tenant_msg=str(err))
+        except Exception as err:
+            LOGGER.warning("Unable to retrieve data for tenant %s: %s", tenant, exc_type_msg(err))
+            fetch.error = exc_type_msg(err)
+        with self._lock:
+            if fetch.entry is not None:
+                self._entries[tenant] = fetch.entry
+            else:
+                self.errors += 1
+                _METRICS.observe_cache_error()
+            del self._fetches[tenant]
+        fetch.done.set()
+
+
+_TENANT_CACHE = TenantDataCache(ttl=TENANT_CACHE_TTL_SECONDS, stale=TENANT_CACHE_STALE_SECONDS)
+
+
+def get_tenant_cache() -> TenantDataCache:
+    """
+    Returns the tenant data cache for this process
+    """
+    return _TENANT_CACHE
+
+
+def get_tenant_component_set(tenant: str, allow_stale: bool = True) -> set[str]:
+    """
+    Returns set of component IDs that are assigned to the specified tenant.
+    Checks which decide what a tenant may change should set allow_stale to False, so that
+    the data used is no older than the cache TTL.
+    """
+    if not tenant:
+        return set()
+    return set(_TENANT_CACHE.get_component_set(tenant, allow_stale))
 
 
 def validate_tenant_exists(tenant: str) -> bool:
     try:
-        get_tenant_data(tenant)
+        _TENANT_CACHE.get_component_set(tenant)
         return True
     except InvalidTenantException:
         return False
@@ -168,6 +369,11 @@ def tenant_error_handler(func: Callable[P1, R1]) -> Callable[P1, R1 | CxResponse
             return connexion.problem(status=400,
                                      title='Invalid tenant',
                                      detail=str(e))
+        except TenantDataUnavailableException as e:
+            LOGGER.error("Tenant data unavailable: %s", exc_type_msg(e))
+            return connexion.problem(status=503,
+                                     title='Tenant data unavailable',
+                                     detail=str(e))
 
     return wrapper
 
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2025-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -223,6 +223,26 @@ class ApplyStagedStatus(TypedDict, total=False):
     ignored: list[str]
     succeeded: list[str]
 
+class ComponentChange(TypedDict, total=True):
+    """
+    #/components/schemas/V2ComponentChange
+    """
+    cursor: str
+    id: str
+    op: Literal["put", "patch", "delete"]
+    fields: list[str]
+    status: str
+    phase: str
+    session: str
+
+class ComponentChanges(TypedDict, total=True):
+    """
+    #/components/schemas/V2ComponentChanges
+    """
+    changes: list[ComponentChange]
+    next_cursor: str
+    truncated: bool
+
 class GetComponentsFilter(TypedDict, total=False):
     """
     Filters that can be specified when doing a GET to /v2/components
@@ -235,6 +255,25 @@ class GetComponentsFilter(TypedDict, total=False):
     status: str
     start_after_id: str
     page_size: int
+    fields: str
+    snapshot: bool
+    cursor: str
+
+class ComponentQuery(TypedDict, total=False):
+    """
+    #/components/schemas/V2ComponentsQuery
+    """
+    ids: list[str]
+    session: str
+    staged_session: str
+    enabled: bool
+    phase: ComponentPhaseStr
+    status: str
+    fields: list[str]
+    start_after_id: str
+    page_size: int
+    snapshot: bool
+    cursor: str
 
 class ComponentBulkUpdateParams(TypedDict, total=False):
     """
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2022-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2022-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -27,11 +27,13 @@ BOS utilities used by both server and operators
 """
 
 # Standard imports
+from collections.abc import Callable
 from contextlib import nullcontext, AbstractContextManager
 import copy
 import datetime
 import functools
 import logging
+import os
 import re
 import traceback
 from typing import NoReturn, Unpack
@@ -129,6 +131,40 @@ def duration_to_timedelta(timestamp: str) -> datetime.timedelta:
     return datetime.timedelta(seconds=seconds)
 
 
+def int_from_env(env_var: str, default: int, minimum: int = 0) -> int:
+    """
+    Returns the value of the specified environment variable as an integer, or the default if it
+    is not set. If it is not an integer of at least the minimum, a warning is logged and the
+    default is used.
+    """
+    return _number_from_env(env_var, default, minimum, int)
+
+
+def float_from_env(env_var: str, default: float, minimum: float = 0) -> float:
+    """
+    Returns the value of the specified environment variable as a float, or the default if it
+    is not set. If it is not a number of at least the minimum, a warning is logged and the
+    default is used.
+    """
+    return _number_from_env(env_var, default, minimum, float)
+
+
+def _number_from_env[N: (int, float)](env_var: str, default: N, minimum: N,
+                                      convert: Callable[[str], N]) -> N:
+    if not (value := os.environ.get(env_var)):
+        return default
+    try:
+        number = convert(value)
+    except ValueError:
+        pass
+    else:
+        if number >= minimum:
+            return number
+    LOGGER.warning("%s must be a number of at least %s (not %r); using the default (%s)",
+                   env_var, minimum, value, default)
+    return default
+
+
 DEFAULT_RETRY_ADAPTER_ARGS = rrs.RequestsRetryAdapterArgs(
     retries=10,
     backoff_factor=0.5,
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2022, 2024-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2022, 2024-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -95,3 +95,6 @@ EMPTY_STAGED_STATE: ComponentStagedState = {
     "configuration": "",
     "boot_artifacts": EMPTY_BOOT_ARTIFACTS
 }
+
+# Response header containing the cursor for the next page of a snapshot listing
+NEXT_CURSOR_HEADER = "BOS-Next-Cursor"
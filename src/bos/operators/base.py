@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -28,7 +28,8 @@ BOS Operator - A Python operator for the Boot Orchestration Service.
 """
 
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import ExitStack
 import itertools
 import logging
@@ -36,8 +37,12 @@ import threading
 import os
 import time
 from types import TracebackType
-from typing import cast, ClassVar, Literal, NoReturn, Protocol, Self, TypedDict, Unpack
+from typing import Any, cast, ClassVar, Literal, NoReturn, Protocol, Self, TypedDict, Unpack
 
+from requests.adapters import DEFAULT_POOLSIZE
+
+from bos.common.clients.api_client import APIClient, ConnectionStats
+from bos.common.clients.api_client_with_timeout_option import APIClientWithTimeoutOption
 from bos.common.clients.bos import BOSClient
 from bos.common.clients.bos.options import options
 from bos.common.clients.bss import BSSClient
@@ -61,6 +66,9 @@ from bos.operators.utils.liveness.timestamp import Timestamp
 LOGGER = logging.getLogger(__name__)
 MAIN_THREAD = threading.current_thread()
 
+HTTP_POOL_SIZE_ENV_VAR = "BOS_OPERATOR_HTTP_POOL_SIZE"
+CHUNK_CONCURRENCY_ENV_VAR = "BOS_OPERATOR_CHUNK_CONCURRENCY"
+
 
 class BaseOperatorException(Exception):
     pass
@@ -79,27 +87,69 @@ class ApiClients:
     Essentially, it uses an ExitStack context manager to manage the API clients.
     """
 
-    def __init__(self) -> None:
-        self.bos = BOSClient()
+    def __init__(self, bos: BOSClient | None = None, cfs: CFSClient | None = None,
+                 hsm: HSMClient | None = None) -> None:
+        """
+        The BOS, CFS, and HSM clients may be specified (for example, to share data between
+        operators; see bos.operators.snapshot). Otherwise, the default clients are used.
+        """
+        self.bos = BOSClient() if bos is None else bos
         self.bss = BSSClient()
-        self.cfs = CFSClient()
-        self.hsm = HSMClient()
+        self.cfs = CFSClient() if cfs is None else cfs
+        self.hsm = HSMClient() if hsm is None else hsm
         self.ims = IMSClient()
         self.pcs = PCSClient()
         self._stack = ExitStack()
+        # The maximum number of connections each client keeps open, by service name
+        self._pool_sizes: dict[str, int] = {}
+
+    @property
+    def by_service(self) -> dict[str, APIClient[Any]]:
+        """
+        The API clients, by service name
+        """
+        return {"bos": self.bos, "bss": self.bss, "cfs": self.cfs, "hsm": self.hsm,
+                "ims": self.ims, "pcs": self.pcs}
 
     def __enter__(self) -> Self:
         """
-        Enter context for all API clients
+        Enter context for all API clients, and size their connection pools
         """
-        self._stack.enter_context(self.bos)
-        self._stack.enter_context(self.bss)
-        self._stack.enter_context(self.cfs)
-        self._stack.enter_context(self.hsm)
-        self._stack.enter_context(self.ims)
-        self._stack.enter_context(self.pcs)
+        for service, client in self.by_service.items():
+            self._stack.enter_context(client)
+            self._pool_sizes[service] = _http_pool_size(service)
+            client.set_pool_size(self._pool_sizes[service])
         return self
 
+    def ensure_pool_size(self, minimum: int) -> None:
+        """
+        Enlarge the connection pools of any API clients which keep fewer than the specified
+        number of connections open (so that they are not closed after being used concurrently)
+        """
+        for service, client in self.by_service.items():
+            if self._pool_sizes.get(service, DEFAULT_POOLSIZE) >= minimum:
+                continue
+            LOGGER.info("Increasing the %s HTTP connection pool size from %d to %d", service,
+                        self._pool_sizes.get(service, DEFAULT_POOLSIZE), minimum)
+            client.set_pool_size(minimum)
+            self._pool_sizes[service] = minimum
+
+    @property
+    def options_changed(self) -> bool:
+        """
+        Returns True if any of the API clients must be recreated for changes to the BOS options
+        to apply
+        """
+        return any(client.retry_kwargs_changed for client in self.by_service.values()
+                   if isinstance(client, APIClientWithTimeoutOption))
+
+    def connection_stats(self) -> dict[str, ConnectionStats]:
+        """
+        Returns the connection statistics of the API clients, by service name
+        """
+        return {service: client.connection_stats()
+                for service, client in self.by_service.items()}
+
     def __exit__(self, exc_type: type[BaseException] | None,
                  exc_val: BaseException | None,
                  exc_tb: TracebackType | None) -> bool | None:
@@ -110,6 +160,65 @@ class ApiClients:
         return self._stack.__exit__(exc_type, exc_val, exc_tb)
 
 
+class PersistentApiClients:
+    """
+    Keeps API clients open from one operator pass to the next, so that the connections in
+    their pools are reused, rather than new connections being opened on every pass.
+    The clients are recreated if a pass fails with an unhandled exception (see reset), or if
+    the BOS options they are based on (such as read timeouts) change.
+    """
+
+    def __init__(self, factory: Callable[[], ApiClients] = ApiClients) -> None:
+        self._factory = factory
+        self._clients: ApiClients | None = None
+
+    def get(self) -> ApiClients:
+        """
+        Returns the open API clients, creating them if necessary
+        """
+        if self._clients is not None and self._clients.options_changed:
+            LOGGER.info("API client options have changed; recreating the API clients")
+            self.reset()
+        if self._clients is None:
+            clients = self._factory()
+            self._clients = clients.__enter__()
+        return self._clients
+
+    def reset(self) -> None:
+        """
+        Close the API clients, so that new ones are created the next time they are needed
+        """
+        if self._clients is None:
+            return
+        clients, self._clients = self._clients, None
+        self._log_connection_stats(clients, logging.INFO)
+        try:
+            clients.__exit__(None, None, None)
+        except Exception as e:
+            LOGGER.warning("Error closing API clients: %s", exc_type_msg(e))
+
+    def log_connection_stats(self) -> None:
+        """
+        Log the connection statistics of the open API clients (at debug level)
+        """
+        if self._clients is not None:
+            self._log_connection_stats(self._clients, logging.DEBUG)
+
+    @staticmethod
+    def _log_connection_stats(clients: ApiClients, level: int) -> None:
+        if not LOGGER.isEnabledFor(level):
+            return
+        try:
+            stats = clients.connection_stats()
+        except Exception as e:
+            LOGGER.warning("Error getting HTTP connection statistics: %s", exc_type_msg(e))
+            return
+        LOGGER.log(level, "HTTP connection statistics: %s",
+                   "; ".join(f"{service}: {service_stats}"
+                             for service, service_stats in stats.items()
+                             if service_stats.requests) or "no requests")
+
+
 class DesiredConfigSetInCFSKwargs(TypedDict, total=False):
     """
     Format of non-cfs_client args to DesiredConfigurationSetInCFS.__init__ filter
@@ -146,6 +255,8 @@ class BaseOperator(ABC):
     def __init__(self) -> None:
         self.__max_batch_size = 0
         self._client: ApiClients | None = None
+        # The maximum number of chunks of components processed at once
+        self.chunk_concurrency = chunk_concurrency()
 
     @property
     def client(self) -> ApiClients:
@@ -193,20 +304,17 @@ class BaseOperator(ABC):
         This includes updating the options and logging level, as well as exception handling and
         sleeping between passes.
         """
+        clients = PersistentApiClients()
         while True:
             start_time = time.time()
             try:
                 options.update()
                 _update_log_level()
-                with ApiClients() as _client:
-                    self._client = _client
-                    self._run()
+                self.run_pass(clients.get())
+                clients.log_connection_stats()
             except Exception as e:
                 LOGGER.exception('Unhandled exception detected: %s', exc_type_msg(e))
-            finally:
-                # We have exited the context manager, so make sure to reset the client
-                # value for this operator
-                self._client = None
+                clients.reset()
 
             try:
                 sleep_time = getattr(options, self.frequency_option) - (
@@ -220,6 +328,20 @@ class BaseOperator(ABC):
                     5
                 )  # A small sleep for when exceptions getting the polling frequency
 
+    def run_pass(self, client: ApiClients) -> None:
+        """
+        A single pass of the operator, using the specified API clients (which must have
+        been entered)
+        """
+        self._client = client
+        try:
+            client.ensure_pool_size(self.chunk_concurrency)
+            self._run()
+        finally:
+            # Make sure to reset the client value for this operator, since the API clients
+            # are not valid once their context has been exited
+            self._client = None
+
     @property
     def max_batch_size(self) -> int:
         max_batch_size = options.max_component_batch_size
@@ -246,8 +368,32 @@ class BaseOperator(ABC):
             LOGGER.debug('Found 0 components that require action')
             return
         LOGGER.info('Found %d components that require action', len(components))
-        for chunk in self._chunk_components(components):
-            self._run_on_chunk(chunk)
+        self._run_on_chunks(components)
+
+    def _run_on_chunks(self, components: list[ComponentRecord]) -> None:
+        """
+        Calls _run_on_chunk for each chunk of the components.
+        If chunk_concurrency is more than 1, up to that many chunks are processed at once, in
+        worker threads. An exception while processing one chunk then does not stop the others
+        from being processed; once they have all finished, the first exception is raised.
+        """
+        chunks = list(self._chunk_components(components))
+        workers = min(self.chunk_concurrency, len(chunks))
+        if workers <= 1:
+            for chunk in chunks:
+                self._run_on_chunk(chunk)
+            return
+        LOGGER.debug("Processing %d chunks of components, %d at a time", len(chunks), workers)
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix=type(self).__name__) as executor:
+            futures = [executor.submit(self._run_on_chunk, chunk) for chunk in chunks]
+        errors = [e for future in futures if (e := future.exception()) is not None]
+        if not errors:
+            return
+        for e in errors[1:]:
+            LOGGER.error("Unhandled exception processing a chunk of components: %s",
+                         exc_type_msg(e), exc_info=e)
+        raise errors[0]
 
     def _run_on_chunk(self, components: list[ComponentRecord]) -> None:
         """
@@ -435,6 +581,48 @@ def chunk_components(components: list[ComponentRecord],
     yield from itertools.batched(components, chunk_size)
 
 
+def chunk_concurrency(operator_name: str | None = None) -> int:
+    """
+    Returns the maximum number of chunks of components an operator processes at once.
+    This is set by BOS_OPERATOR_CHUNK_CONCURRENCY_<OPERATOR> (for example,
+    BOS_OPERATOR_CHUNK_CONCURRENCY_POWER_ON), if the operator name is specified, or else by
+    BOS_OPERATOR_CHUNK_CONCURRENCY. By default, the chunks are processed one at a time.
+    """
+    env_vars = [CHUNK_CONCURRENCY_ENV_VAR]
+    if operator_name:
+        env_vars.insert(0, f"{CHUNK_CONCURRENCY_ENV_VAR}_{operator_name.upper()}")
+    return _positive_int_from_env(env_vars, 1)
+
+
+def _http_pool_size(service: str) -> int:
+    """
+    Returns the maximum number of connections the API client for the specified service keeps
+    open to it. This is set by BOS_OPERATOR_HTTP_POOL_SIZE_<SERVICE> (for example,
+    BOS_OPERATOR_HTTP_POOL_SIZE_PCS), or else BOS_OPERATOR_HTTP_POOL_SIZE, or else the requests
+    default is used.
+    """
+    return _positive_int_from_env([f"{HTTP_POOL_SIZE_ENV_VAR}_{service.upper()}",
+                                   HTTP_POOL_SIZE_ENV_VAR], DEFAULT_POOLSIZE)
+
+
+def _positive_int_from_env(env_vars: Iterable[str], default: int) -> int:
+    """
+    Returns the value of the first of the environment variables which is set to a positive
+    integer, or else the default
+    """
+    for env_var in env_vars:
+        if not (value := os.environ.get(env_var)):
+            continue
+        try:
+            number = int(value)
+        except ValueError:
+            number = 0
+        if number > 0:
+            return number
+        LOGGER.warning("%s must be a positive integer (not %r); ignoring it", env_var, value)
+    return default
+
+
 def _update_log_level() -> None:
     """ Updates the current logging level base on the value in the options database """
     try:
@@ -472,14 +660,20 @@ def _init_logging() -> None:
     logging.basicConfig(level=log_level, format=LOG_FORMAT)
 
 
-def main(operator: type[BaseOperator]) -> NoReturn:
+def init_operator_process() -> None:
     """
-    The main method for any operator type.
-    Automatically handles logging and heartbeats as well as starting the operator.
+    Sets up logging and starts the liveness heartbeat thread
     """
     _init_logging()
     heartbeat = threading.Thread(target=_liveliness_heartbeat, args=())
     heartbeat.start()
 
+
+def main(operator: type[BaseOperator]) -> NoReturn:
+    """
+    The main method for any operator type.
+    Automatically handles logging and heartbeats as well as starting the operator.
+    """
+    init_operator_process()
     op = operator()
     op.run()
@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2022-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2022-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -92,7 +92,7 @@ class DiscoveryOperator(BaseActionOperator):
         The set of component IDs currently known to BOS
         """
         components = set()
-        for component in self.client.bos.components.get_components():
+        for component in self.client.bos.components.get_components(fields="id"):
             components.add(component['id'])
         return components
 
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+
+"""
+Runs several BOS operators in a single process
+
+The operators to run are listed (comma separated, by the names of their modules) in the
+BOS_OPERATORS environment variable. By default, all of them are run. The number of chunks of
+components each operator processes at once may be set for that operator by
+BOS_OPERATOR_CHUNK_CONCURRENCY_<OPERATOR> (for example, BOS_OPERATOR_CHUNK_CONCURRENCY_POWER_ON).
+
+The operators are run in cycles. In each cycle, every operator which is due to run (according
+to its polling or discovery frequency option, as when it runs on its own) makes one pass, in
+the order listed. The operators share a CycleSnapshot (see bos.operators.snapshot), so the
+components they query are read once per cycle, rather than once per operator. They also share
+the same API clients, which are kept open from one cycle to the next. An exception in one
+operator's pass is logged, and does not prevent the others from running (but the API clients
+are recreated before the next cycle).
+"""
+
+import logging
+import os
+import time
+from functools import partial
+from typing import NoReturn
+
+from bos.common.clients.bos.options import options
+from bos.common.utils import exc_type_msg
+from bos.operators.actual_state_cleanup import ActualStateCleanupOperator
+from bos.operators.base import (BaseOperator,
+                                PersistentApiClients,
+                                _update_log_level,
+                                chunk_concurrency,
+                                init_operator_process)
+from bos.operators.configuration import ConfigurationOperator
+from bos.operators.discovery import DiscoveryOperator
+from bos.operators.power_off_forceful import ForcefulPowerOffOperator
+from bos.operators.power_off_graceful import GracefulPowerOffOperator
+from bos.operators.power_on import PowerOnOperator
+from bos.operators.session_cleanup import SessionCleanupOperator
+from bos.operators.session_completion import SessionCompletionOperator
+from bos.operators.session_setup import SessionSetupOperator
+from bos.operators.snapshot import CycleSnapshot, snapshot_api_clients
+from bos.operators.status import StatusOperator
+
+LOGGER = logging.getLogger(__name__)
+
+OPERATORS_ENV_VAR = "BOS_OPERATORS"
+
+# All of the operators, by module name, in the order in which they are run by default (so
+# that the changes each makes in a cycle are seen by those after it)
+OPERATORS: dict[str, type[BaseOperator]] = {
+    "discovery": DiscoveryOperator,
+    "session_setup": SessionSetupOperator,
+    "actual_state_cleanup": ActualStateCleanupOperator,
+    "status": StatusOperator,
+    "power_on": PowerOnOperator,
+    "power_off_graceful": GracefulPowerOffOperator,
+    "power_off_forceful": ForcefulPowerOffOperator,
+    "configuration": ConfigurationOperator,
+    "session_completion": SessionCompletionOperator,
+    "session_cleanup": SessionCleanupOperator,
+}
+
+# The time to wait before retrying an operator whose frequency option could not be read
+_RETRY_SECONDS = 5
+
+
+def get_operator_names() -> list[str]:
+    """
+    Returns the names of the operators listed in the environment, in order
+    """
+    setting = os.environ.get(OPERATORS_ENV_VAR, "")
+    names = [name.strip() for name in setting.split(",") if name.strip()]
+    if not names:
+        return list(OPERATORS)
+    if (unknown := [name for name in names if name not in OPERATORS]):
+        raise ValueError(f"Unknown operator(s) in {OPERATORS_ENV_VAR}: {', '.join(unknown)}. "
+                         f"Valid operators are: {', '.join(OPERATORS)}")
+    return list(dict.fromkeys(names))
+
+
+class MultiOperator:
+    """
+    Runs several operators in cycles, sharing the data they query in each cycle
+    """
+
+    def __init__(self, operators: dict[str, BaseOperator]) -> None:
+        self.operators = operators
+        # The time at which each operator is next due to run
+        self._next_run = {name: 0.0 for name in operators}
+        self.snapshot = CycleSnapshot()
+        self.clients = PersistentApiClients(partial(snapshot_api_clients, self.snapshot))
+
+    def run(self) -> NoReturn:
+        """
+        Run cycles of the operators forever, sleeping until the next one is due
+        """
+        while True:
+            try:
+                options.update()
+                _update_log_level()
+                self._run_cycle()
+            except Exception as e:
+                LOGGER.exception('Unhandled exception detected: %s', exc_type_msg(e))
+                self.clients.reset()
+                time.sleep(_RETRY_SECONDS)
+                continue
+            sleep_time = min(self._next_run.values()) - time.time()
+            if sleep_time > 0:
+                time.sleep(sleep_time)
+
+    def _run_cycle(self) -> None:
+        """
+        A single pass of each operator which is due to run
+        """
+        start_time = time.time()
+        due = [name for name, next_run in self._next_run.items() if next_run <= start_time]
+        if not due:
+            return
+        LOGGER.debug("Running operators: %s", ", ".join(due))
+        self.snapshot.clear()
+        clients = self.clients.get()
+        failed = False
+        for name in due:
+            operator = self.operators[name]
+            try:
+                operator.run_pass(clients)
+            except Exception as e:
+                LOGGER.exception('Unhandled exception detected in %s operator: %s', name,
+                                 exc_type_msg(e))
+                failed = True
+            try:
+                frequency = getattr(options, operator.frequency_option)
+            except Exception as e:
+                LOGGER.exception('Unhandled exception getting polling frequency: %s',
+                                 exc_type_msg(e))
+                frequency = _RETRY_SECONDS
+            # Operators with the same frequency stay in step, so that they share snapshots
+            self._next_run[name] = start_time + frequency
+        self.snapshot.log_stats()
+        if failed:
+            self.clients.reset()
+        else:
+            self.clients.log_connection_stats()
+        LOGGER.debug("Cycle completed in %.1f seconds", time.time() - start_time)
+
+
+def main() -> NoReturn:
+    """
+    The main method for the multi-operator process
+    """
+    init_operator_process()
+    operators = {name: OPERATORS[name]() for name in get_operator_names()}
+    for name, operator in operators.items():
+        operator.chunk_concurrency = chunk_concurrency(name)
+    LOGGER.info("Running operators: %s", ", ".join(operators))
+    MultiOperator(operators).run()
+
+
+if __name__ == '__main__':
+    main()
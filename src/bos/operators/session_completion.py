@@ -86,11 +86,14 @@ class SessionCompletionOperator(BaseOperator):
 
         # Query BOS for all components that are enabled and have the session name in their
         # session field
-        components = self.client.bos.components.get_components(session=session_id, enabled=True)
+        # Only the component IDs are needed
+        components = self.client.bos.components.get_components(session=session_id, enabled=True,
+                                                                fields="id")
 
         # Query BOS for all components that have the session name in their staged_state.session
         # field, and append this to our previous list
-        components += self.client.bos.components.get_components(staged_session=session_id)
+        components += self.client.bos.components.get_components(staged_session=session_id,
+                                                                 fields="id")
 
         # If the above did not find any components, then we are done, before even worrying about
         # multi-tenancy. The session is complete.
@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -401,7 +401,7 @@ class BaseSession[TargetStateT: (ComponentDesiredState, ComponentStagedState)](A
         if not tenant:
             return nodes
         try:
-            tenant_limit = get_tenant_component_set(tenant)
+            tenant_limit = get_tenant_component_set(tenant, allow_stale=False)
         except InvalidTenantException as e:
             raise SessionSetupException(str(e)) from e
         nodes_after = nodes.intersection(tenant_limit)
@@ -0,0 +1,393 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+API clients which share the data read by several operators during a single cycle
+
+When several operators are run in one process (see bos.operators.multi), they are given
+API clients which read the data they query from a CycleSnapshot:
+- The BOS components are listed once, and the component queries of each operator are
+  answered by filtering them the same way the BOS API does. Only the enabled components are
+  listed, unless a query needs the others too (most operators only query enabled components).
+- The HSM state of each node, the set of locked nodes, and the CFS components are each read
+  at most once.
+
+The data is read when it is first needed in the cycle. The BOS component records are copied
+for each query, since the operators modify them, but the HSM and CFS records are not.
+The snapshot is locked while it is read or changed, since an operator may process several
+chunks of components at once (see BaseOperator.chunk_concurrency). The lock is held while
+reading the full lists of components (so that they are still only read once), but not while
+reading individual components or making changes.
+
+Changes the operators make through these clients are applied to the snapshot (using the
+records returned by BOS, or by reading the changed CFS components again), so later operators
+in the cycle see them. Changes made by anything else are seen in the next cycle, just as they
+would be by the next pass of an operator running on its own.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+import copy
+import logging
+import threading
+from typing import cast, Unpack
+
+import requests
+
+from bos.common.clients.bos import BOSClient
+from bos.common.clients.bos.components import CompBulkUpdateData, CompUpdateData
+from bos.common.clients.bos.components import ComponentEndpoint as BosComponentEndpoint
+from bos.common.clients.cfs import CFSClient
+from bos.common.clients.cfs.components import ComponentEndpoint as CfsComponentEndpoint
+from bos.common.clients.cfs.types import CfsComponentData
+from bos.common.clients.hsm import HSMClient
+from bos.common.clients.hsm.locks import LocksEndpoint
+from bos.common.clients.hsm.state_components import StateComponentsEndpoint
+from bos.common.clients.hsm.types import StateComponentData, StateComponentsDataArray
+from bos.common.types.components import (ComponentBulkUpdateParams,
+                                         ComponentRecord,
+                                         GetComponentsFilter)
+from bos.operators.base import ApiClients
+
+LOGGER = logging.getLogger(__name__)
+
+# The BOS component filters which can be applied to the snapshot. Queries using any others
+# (such as start_after_id) are sent to BOS.
+_LOCAL_FILTERS = frozenset(["ids", "session", "staged_session", "enabled", "phase", "status",
+                            "fields", "page_size", "snapshot"])
+
+
+class CycleSnapshot:
+    """
+    The data shared by the operators during a single cycle
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Discard the data, at the start of a new cycle
+        """
+        # All of the BOS components, and the enabled BOS components, by ID
+        self.bos_components: dict[str, ComponentRecord] | None = None
+        self.enabled_bos_components: dict[str, ComponentRecord] | None = None
+        # HSM state components, by ID
+        self.hsm_components: dict[str, StateComponentData] = {}
+        self.locked_nodes: set[str] | None = None
+        # CFS components, by ID
+        self.cfs_components: dict[str, CfsComponentData] = {}
+        # Whether cfs_components contains all of the CFS components
+        self.cfs_complete = False
+        # The number of queries answered from the snapshot, and the number sent to the APIs,
+        # by query name
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+    def log_stats(self) -> None:
+        """
+        Log the number of queries answered from the snapshot during the cycle
+        """
+        LOGGER.debug("Queries answered from the snapshot: %s; queries sent: %s",
+                     dict(self.hits) or "none", dict(self.misses) or "none")
+
+
+def component_matches(component: ComponentRecord, kwargs: GetComponentsFilter,
+                      id_set: set[str] | None) -> bool:
+    """
+    Returns True if the BOS component matches the filters, as applied by the BOS API
+    """
+    if id_set is not None and component["id"] not in id_set:
+        return False
+    if (enabled := kwargs.get("enabled")) is not None and component.get("enabled") != enabled:
+        return False
+    if (session := kwargs.get("session")) and component.get("session") != session:
+        return False
+    if (staged_session := kwargs.get("staged_session")) and \
+       component.get("staged_state", {}).get("session") != staged_session:
+        return False
+    status = component.get("status", {})
+    if (phase := kwargs.get("phase")) and status.get("phase") != phase:
+        return False
+    if (statuses := kwargs.get("status")) and status.get("status") not in statuses.split(","):
+        return False
+    return True
+
+
+def _split(value: str | None) -> list[str]:
+    return [item for item in value.split(",") if item] if value else []
+
+
+class SnapshotBosComponentEndpoint(BosComponentEndpoint):
+    """
+    BOS components endpoint which answers queries from the snapshot
+    """
+
+    def __init__(self, session: requests.Session, snapshot: CycleSnapshot) -> None:
+        super().__init__(session)
+        self.snapshot = snapshot
+
+    def _snapshot_components(self, enabled_only: bool) -> dict[str, ComponentRecord]:
+        """
+        Returns the components in the snapshot, reading them if necessary. If enabled_only is
+        True, only the enabled components are needed.
+        """
+        with self.snapshot.lock:
+            if self.snapshot.bos_components is not None:
+                self.snapshot.hits["bos_components"] += 1
+                return self.snapshot.bos_components
+            if enabled_only and self.snapshot.enabled_bos_components is not None:
+                self.snapshot.hits["bos_components"] += 1
+                return self.snapshot.enabled_bos_components
+            self.snapshot.misses["bos_components"] += 1
+            query = GetComponentsFilter(enabled=True) if enabled_only else GetComponentsFilter()
+            components = {
+                component["id"]: component for component in super().get_components(**query)
+            }
+            LOGGER.debug("Read %d %sBOS components into the snapshot", len(components),
+                         "enabled " if enabled_only else "")
+            if enabled_only:
+                self.snapshot.enabled_bos_components = components
+            else:
+                self.snapshot.bos_components = components
+            return components
+
+    def get_components(self, **kwargs: Unpack[GetComponentsFilter]) -> list[ComponentRecord]:
+        if not _LOCAL_FILTERS.issuperset(kwargs):
+            return super().get_components(**kwargs)
+        id_set = set(_split(kwargs["ids"])) if "ids" in kwargs else None
+        fields = set(_split(kwargs.get("fields")))
+        results: list[ComponentRecord] = []
+        with self.snapshot.lock:
+            components = self._snapshot_components(enabled_only=kwargs.get("enabled") is True)
+            for component in components.values():
+                if not component_matches(component, kwargs, id_set):
+                    continue
+                if fields:
+                    component = cast(ComponentRecord, {
+                        field: value for field, value in component.items()
+                        if field in fields or field == "id"
+                    })
+                # The operators modify the records they are given
+                results.append(copy.deepcopy(component))
+        return results
+
+    def _update_snapshot(self, components: Iterable[ComponentRecord]) -> None:
+        updated = [copy.deepcopy(component) for component in components if "id" in component]
+        with self.snapshot.lock:
+            all_components = self.snapshot.bos_components
+            enabled_components = self.snapshot.enabled_bos_components
+            for component in updated:
+                if all_components is not None:
+                    all_components[component["id"]] = component
+                if enabled_components is None:
+                    continue
+                if component.get("enabled"):
+                    enabled_components[component["id"]] = component
+                else:
+                    enabled_components.pop(component["id"], None)
+
+    def update_component(self, component_id: str, data: CompUpdateData) -> ComponentRecord:
+        result = super().update_component(component_id, data)
+        self._update_snapshot([result])
+        return result
+
+    def update_components(self, data: CompBulkUpdateData,
+                          **params: Unpack[ComponentBulkUpdateParams]) -> list[ComponentRecord]:
+        results = super().update_components(data, **params)
+        self._update_snapshot(results)
+        return results
+
+    def put_components(self, data: Iterable[ComponentRecord]) -> list[ComponentRecord]:
+        results = super().put_components(data)
+        self._update_snapshot(results)
+        return results
+
+
+class SnapshotStateComponentsEndpoint(StateComponentsEndpoint):
+    """
+    HSM State/Components endpoint which reads the state of each node at most once per cycle
+    """
+
+    def __init__(self, session: requests.Session, snapshot: CycleSnapshot) -> None:
+        super().__init__(session)
+        self.snapshot = snapshot
+
+    def get_components(self, node_list: list[str],
+                       enabled: bool|None=None) -> StateComponentsDataArray:
+        cached = self.snapshot.hsm_components
+        with self.snapshot.lock:
+            missing = [node for node in node_list if node not in cached]
+            if missing:
+                self.snapshot.misses["hsm_state_components"] += 1
+            else:
+                self.snapshot.hits["hsm_state_components"] += 1
+        if missing:
+            components = super().get_components(missing)["Components"]
+            with self.snapshot.lock:
+                for component in components:
+                    cached[component["ID"]] = component
+        with self.snapshot.lock:
+            return {"Components": [
+                cached[node] for node in node_list
+                if node in cached and (enabled is None or cached[node].get("Enabled") == enabled)
+            ]}
+
+
+class SnapshotLocksEndpoint(LocksEndpoint):
+    """
+    HSM locks endpoint which reads the locked nodes at most once per cycle
+    """
+
+    def __init__(self, session: requests.Session, snapshot: CycleSnapshot) -> None:
+        super().__init__(session)
+        self.snapshot = snapshot
+
+    def get_locked_nodes(self) -> set[str]:
+        with self.snapshot.lock:
+            if self.snapshot.locked_nodes is None:
+                self.snapshot.misses["hsm_locked_nodes"] += 1
+                self.snapshot.locked_nodes = super().get_locked_nodes()
+            else:
+                self.snapshot.hits["hsm_locked_nodes"] += 1
+            return set(self.snapshot.locked_nodes)
+
+
+class SnapshotCfsComponentEndpoint(CfsComponentEndpoint):
+    """
+    CFS components endpoint which reads each component at most once per cycle, unless it is
+    changed by an operator
+    """
+
+    def __init__(self, session: requests.Session, snapshot: CycleSnapshot) -> None:
+        super().__init__(session)
+        self.snapshot = snapshot
+
+    def get_components(self, ids: str|None=None) -> list[CfsComponentData]:
+        cached = self.snapshot.cfs_components
+        if ids is None:
+            with self.snapshot.lock:
+                if self.snapshot.cfs_complete:
+                    self.snapshot.hits["cfs_components"] += 1
+                else:
+                    self.snapshot.misses["cfs_components"] += 1
+                    cached.clear()
+                    cached.update((component["id"], component)
+                                  for component in super().get_components())
+                    self.snapshot.cfs_complete = True
+                return list(cached.values())
+        id_list = _split(ids)
+        with self.snapshot.lock:
+            missing = [comp_id for comp_id in id_list if comp_id not in cached]
+            if missing and not self.snapshot.cfs_complete:
+                self.snapshot.misses["cfs_components"] += 1
+            else:
+                missing = []
+                self.snapshot.hits["cfs_components"] += 1
+        if missing:
+            components = super().get_components(ids=",".join(missing))
+            with self.snapshot.lock:
+                for component in components:
+                    cached[component["id"]] = component
+        with self.snapshot.lock:
+            return [cached[comp_id] for comp_id in id_list if comp_id in cached]
+
+    def patch_desired_config(self,
+                             node_ids: list[str],
+                             desired_config: str,
+                             enabled: bool = False,
+                             tags: dict[str, str]|None = None,
+                             clear_state: bool = False) -> None:
+        # These components are read again if they are needed later in the cycle
+        with self.snapshot.lock:
+            for node_id in node_ids:
+                self.snapshot.cfs_components.pop(node_id, None)
+            self.snapshot.cfs_complete = False
+        super().patch_desired_config(node_ids, desired_config, enabled=enabled, tags=tags,
+                                     clear_state=clear_state)
+
+
+class SnapshotBOSClient(BOSClient):
+    """
+    BOS client whose components endpoint uses the snapshot
+    """
+
+    def __init__(self, snapshot: CycleSnapshot) -> None:
+        super().__init__()
+        self.snapshot = snapshot
+
+    @property
+    def components(self) -> BosComponentEndpoint:
+        if self._endpoints.components is None:
+            self._endpoints.components = SnapshotBosComponentEndpoint(self.requests_session,
+                                                                      self.snapshot)
+        return self._endpoints.components
+
+
+class SnapshotCFSClient(CFSClient):
+    """
+    CFS client whose components endpoint uses the snapshot
+    """
+
+    def __init__(self, snapshot: CycleSnapshot) -> None:
+        super().__init__()
+        self.snapshot = snapshot
+
+    @property
+    def components(self) -> CfsComponentEndpoint:
+        if self._endpoints.components is None:
+            self._endpoints.components = SnapshotCfsComponentEndpoint(self.requests_session,
+                                                                      self.snapshot)
+        return self._endpoints.components
+
+
+class SnapshotHSMClient(HSMClient):
+    """
+    HSM client whose locks and state components endpoints use the snapshot
+    """
+
+    def __init__(self, snapshot: CycleSnapshot) -> None:
+        super().__init__()
+        self.snapshot = snapshot
+
+    @property
+    def locks(self) -> LocksEndpoint:
+        if self._endpoints.locks is None:
+            self._endpoints.locks = SnapshotLocksEndpoint(self.requests_session, self.snapshot)
+        return self._endpoints.locks
+
+    @property
+    def state_components(self) -> StateComponentsEndpoint:
+        if self._endpoints.state_components is None:
+            self._endpoints.state_components = SnapshotStateComponentsEndpoint(
+                self.requests_session, self.snapshot)
+        return self._endpoints.state_components
+
+
+def snapshot_api_clients(snapshot: CycleSnapshot) -> ApiClients:
+    """
+    Returns API clients which share the data in the snapshot
+    """
+    return ApiClients(bos=SnapshotBOSClient(snapshot), cfs=SnapshotCFSClient(snapshot),
+                      hsm=SnapshotHSMClient(snapshot))
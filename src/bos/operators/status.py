@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2022-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2022-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -107,8 +107,13 @@ class StatusOperator(BaseOperator):
             return
         LOGGER.debug('Found %d components that require action',
                      len(components))
-        for chunk in self._chunk_components(components):
-            self._run_on_chunk(chunk)
+        # Recreate these filters to pull in the latest options values. This is done before the
+        # chunks are processed, since they may be processed concurrently.
+        self.boot_wait_time_elapsed = TimeSinceLastAction(
+            seconds=options.max_boot_wait_time).component_match
+        self.power_on_wait_time_elapsed = TimeSinceLastAction(
+            seconds=options.max_power_on_wait_time).component_match
+        self._run_on_chunks(components)
 
     def _run_on_chunk(self, components: list[ComponentRecord]) -> None:
         """
@@ -120,11 +125,6 @@ class StatusOperator(BaseOperator):
             component_ids)
         cfs_states = self._get_cfs_components()
         updated_components = []
-        # Recreate these filters to pull in the latest options values
-        self.boot_wait_time_elapsed = TimeSinceLastAction(
-            seconds=options.max_boot_wait_time).component_match
-        self.power_on_wait_time_elapsed = TimeSinceLastAction(
-            seconds=options.max_power_on_wait_time).component_match
         for component in components:
             updated_component = self._check_status(
                 component, power_states.get(component['id']),
@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2019-2022, 2024-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2019-2022, 2024-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -30,8 +30,17 @@ import os
 import connexion
 
 from bos.common.values import LOG_FORMAT
+from bos.server.compression import compress_response, RequestDecompressionMiddleware
 from bos.server.options import init_options
-from bos.server.encoder import JSONEncoder
+from bos.server.redis_db_utils import init_db_indexes
+from bos.server.request_tracing import (end_request_tracing,
+                                       record_response,
+                                       start_request_tracing)
+from bos.server.json_provider import (get_json_provider_setting,
+                                     JsonProvider,
+                                     OrjsonProvider,
+                                     StdlibProvider)
+from bos.server.metrics import init_metrics, metrics_view
 
 LOGGER = logging.getLogger(__name__)
 
@@ -42,13 +51,27 @@ def create_app() -> connexion.App:
     logging.basicConfig(level=log_level, format=LOG_FORMAT)
     LOGGER.info("BOS server starting.")
 
+    init_metrics()
     init_options()
+    init_db_indexes()
 
     app = connexion.App(__name__, specification_dir='./openapi/')
-    app.app.json_encoder = JSONEncoder
+    json_provider = get_json_provider_setting()
+    LOGGER.info("Using %s JSON provider", json_provider.value)
+    if json_provider == JsonProvider.ORJSON:
+        app.app.json = OrjsonProvider(app.app)
+    else:
+        app.app.json = StdlibProvider(app.app)
     app.add_api('openapi.yaml',
                 arguments={'title': 'Cray Boot Orchestration Service'},
                 base_path='/')
+    app.app.wsgi_app = RequestDecompressionMiddleware(app.app.wsgi_app)
+    app.app.add_url_rule('/metrics', 'metrics', metrics_view)
+    app.app.before_request(start_request_tracing)
+    app.app.teardown_request(end_request_tracing)
+    # after_request functions are called in the reverse of the order they were registered
+    app.app.after_request(record_response)
+    app.app.after_request(compress_response)
     return app
 
 
@@ -0,0 +1,209 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Compression of API request and response bodies
+
+Request bodies with a Content-Encoding of gzip or zstd are decompressed by a WSGI middleware,
+before the request reaches connexion (which validates the request body before the endpoint
+controller is called). JSON response bodies are compressed using the best encoding accepted by
+the client, if they are large enough for it to be worthwhile.
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+import gzip
+import io
+import json
+import logging
+from typing import TYPE_CHECKING, Protocol
+import zlib
+
+import flask
+import zstandard
+
+if TYPE_CHECKING:
+    from _typeshed.wsgi import StartResponse, WSGIApplication, WSGIEnvironment
+
+LOGGER = logging.getLogger(__name__)
+
+# Supported encodings, in order of preference for responses
+GZIP = "gzip"
+ZSTD = "zstd"
+_RESPONSE_ENCODINGS = [ZSTD, GZIP]
+
+# Responses smaller than this are not compressed
+_MIN_COMPRESS_BYTES = 1024
+
+# Decompressed request bodies larger than this are rejected
+_MAX_REQUEST_BYTES = 512*1024*1024
+
+# zstd request bodies are decompressed in chunks of this size, so that memory is only used for
+# as much of the body as there actually is
+_ZSTD_READ_BYTES = 1024*1024
+
+_GZIP_LEVEL = 5
+_ZSTD_LEVEL = 3
+
+_COMPRESSIBLE_MIMETYPES = frozenset(["application/json", "application/problem+json"])
+
+
+class RequestDecodeError(ValueError):
+    """
+    Raised when a request body cannot be decompressed
+    """
+
+
+def _decompress_gzip(data: bytes) -> bytes:
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    result = decompressor.decompress(data, _MAX_REQUEST_BYTES + 1)
+    if len(result) > _MAX_REQUEST_BYTES:
+        raise RequestDecodeError("Decompressed request body is too large")
+    if not decompressor.eof:
+        raise RequestDecodeError("Truncated gzip request body")
+    return result
+
+
+def _decompress_zstd(data: bytes) -> bytes:
+    chunks: list[bytes] = []
+    total = 0
+    with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+        while chunk := reader.read(_ZSTD_READ_BYTES):
+            total += len(chunk)
+            if total > _MAX_REQUEST_BYTES:
+                raise RequestDecodeError("Decompressed request body is too large")
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+_REQUEST_DECOMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    GZIP: _decompress_gzip,
+    ZSTD: _decompress_zstd,
+}
+
+
+class RequestDecompressionMiddleware:  # pylint: disable=too-few-public-methods
+    """
+    WSGI middleware which decompresses request bodies with a supported Content-Encoding, so
+    that the rest of the application sees an uncompressed request
+    """
+
+    def __init__(self, app: "WSGIApplication") -> None:
+        self._app = app
+
+    def __call__(self, environ: "WSGIEnvironment",
+                 start_response: "StartResponse") -> Iterable[bytes]:
+        encoding = environ.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+        if not encoding or encoding == "identity":
+            return self._app(environ, start_response)
+        decompress = _REQUEST_DECOMPRESSORS.get(encoding)
+        if decompress is None:
+            return _problem(start_response, 415, "Unsupported Media Type",
+                            f"Unsupported Content-Encoding: {encoding}")
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            data = decompress(environ["wsgi.input"].read(length) if length else b"")
+        except Exception as err:
+            LOGGER.error("Unable to decode %s request body: %s", encoding, err)
+            return _problem(start_response, 400, "Bad Request",
+                            f"Unable to decode {encoding} request body: {err}")
+        LOGGER.debug("Decompressed %s request body: %d bytes", encoding, len(data))
+        environ["wsgi.input"] = io.BytesIO(data)
+        environ["CONTENT_LENGTH"] = str(len(data))
+        del environ["HTTP_CONTENT_ENCODING"]
+        return self._app(environ, start_response)
+
+
+def _problem(start_response: "StartResponse", status: int, title: str,
+             detail: str) -> list[bytes]:
+    """
+    Respond with an RFC 7807 problem details body, as connexion.problem would
+    """
+    body = json.dumps({"type": "about:blank", "title": title, "status": status,
+                       "detail": detail}).encode()
+    start_response(f"{status} {title}", [("Content-Type", "application/problem+json"),
+                                         ("Content-Length", str(len(body)))])
+    return [body]
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes, /) -> bytes: ...
+    def flush(self) -> bytes: ...
+
+
+def _new_compressor(encoding: str) -> _Compressor:
+    """
+    Returns a streaming compressor for the specified encoding
+    """
+    if encoding == GZIP:
+        return zlib.compressobj(_GZIP_LEVEL, wbits=zlib.MAX_WBITS | 16)
+    return zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compressobj()
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == GZIP:
+        return gzip.compress(data, compresslevel=_GZIP_LEVEL)
+    return zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(data)
+
+
+def _compress_stream(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """
+    Compress a streamed response body. Each chunk is compressed as it is produced, so the
+    response is still sent incrementally.
+    """
+    compressor = _new_compressor(encoding)
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
+
+
+def compress_response(response: flask.Response) -> flask.Response:
+    """
+    For use as a flask after_request function.
+    Compress the response body, if the client accepts a supported encoding and the response
+    is a large enough JSON response.
+    """
+    if response.status_code < 200 or response.status_code in (204, 304) \
+       or response.mimetype not in _COMPRESSIBLE_MIMETYPES \
+       or "Content-Encoding" in response.headers:
+        return response
+    encoding = flask.request.accept_encodings.best_match(_RESPONSE_ENCODINGS)
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = _compress_stream(response.iter_encoded(), encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < _MIN_COMPRESS_BYTES:
+            return response
+        response.set_data(_compress(data, encoding))
+        LOGGER.debug("Compressed response body using %s: %d -> %d bytes", encoding, len(data),
+                     response.content_length)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    # The compressed representation is not byte-for-byte identical to the uncompressed one
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+    return response
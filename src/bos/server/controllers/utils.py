@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2019, 2021-2022, 2024-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2019, 2021-2022, 2024-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -21,16 +21,30 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 #
+from collections.abc import Callable, Generator, Iterable
+import functools
+import hashlib
+from itertools import batched
 import logging
 import os
+from typing import cast
 from urllib.parse import urlparse, urlunparse
 
 import connexion
 from connexion.lifecycle import ConnexionResponse
 import flask
+import orjson
+from werkzeug.http import quote_etag
+
+from bos.common.tenant_utils import get_tenant_from_header
+from bos.server.options import update_server_log_level
+from bos.server.redis_db_utils import DBWrapper
 
 LOGGER = logging.getLogger(__name__)
 
+# Number of items encoded at a time in streamed responses
+_STREAM_BATCH_SIZE = 500
+
 
 class BadRequest(Exception):
     """
@@ -124,3 +138,96 @@ def _404_tenanted_resource_not_found(resource_type: str, resource_id: str,
     if tenant:
         resource_type+=f" for tenant '{tenant}'"
     return _404_resource_not_found(resource_type, resource_id)
+
+
+def _json_array_chunks(items: Iterable[object]) -> Generator[bytes, None, None]:
+    """
+    Yields the JSON encoding of a list of the specified items, in chunks
+    """
+    yield b"["
+    separator = b""
+    for batch in batched(items, _STREAM_BATCH_SIZE):
+        yield separator + b",".join(orjson.dumps(item) for item in batch)
+        separator = b","
+    yield b"]"
+
+
+def streamed_json_array(items: Iterable[object], status: int=200) -> flask.Response:
+    """
+    Returns a response whose body is a JSON list of the specified items. The list is encoded
+    and sent incrementally, as the items are produced, so the full list is never held in memory.
+    Because the response status has already been sent by the time the items are produced, an
+    error while producing them results in a truncated response, rather than an error response.
+    """
+    return flask.Response(flask.stream_with_context(_json_array_chunks(items)), status=status,
+                          mimetype="application/json")
+
+
+def _request_etag(db: DBWrapper) -> str:
+    """
+    Returns the (unquoted) entity tag for the response to the current request, which reads
+    from the specified database. It identifies the request (path, query, and tenant) and the
+    current generation of the database, which is incremented by every write. The generation
+    is read before the request is handled, so if the database is modified while the response
+    is being generated, the response is labeled with the older generation, which does no harm.
+    """
+    request_id = f"{flask.request.full_path}|{get_tenant_from_header()}"
+    request_hash = hashlib.sha1(request_id.encode()).hexdigest()[:16]
+    return f"{db.db.value}-{db.generation}-{request_hash}"
+
+
+def conditional_get[**P, R](
+    db: DBWrapper,
+    cacheable: Callable[..., bool] | None=None
+) -> Callable[[Callable[P, R]], Callable[P, R | flask.Response]]:
+    """
+    Decorator for GET endpoint controllers whose responses only depend on the request and the
+    contents of the specified database. Successful responses include an ETag header, and if the
+    request has an If-None-Match header with the current ETag, a 304 response is returned
+    without calling the controller at all (although the options and log level are still
+    refreshed, as every controller does).
+
+    If cacheable is specified, it is called with the same arguments as the controller, and
+    requests for which it returns False are handled normally, without an ETag (for example,
+    if the response also depends on the current time).
+    """
+    def decorator(func: Callable[P, R]) -> Callable[P, R | flask.Response]:
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R | flask.Response:
+            if cacheable is not None and not cacheable(*args, **kwargs):
+                return func(*args, **kwargs)
+            etag = _request_etag(db)
+            if flask.request.if_none_match.contains_weak(etag):
+                # The controller is not called, so this is done here instead
+                update_server_log_level()
+                LOGGER.debug("%s %s not modified", flask.request.method, flask.request.path)
+                response = flask.Response(status=304)
+                response.set_etag(etag)
+                return response
+            return _add_etag(func(*args, **kwargs), etag)
+
+        return wrapper
+
+    return decorator
+
+
+def untenanted_request(*_args: object, **_kwargs: object) -> bool:
+    """
+    For use with conditional_get, for endpoints whose responses to tenant-scoped requests
+    also depend on data from outside of the BOS database (the tenant's components)
+    """
+    return not get_tenant_from_header()
+
+
+def _add_etag[R](result: R, etag: str) -> R:
+    """
+    Add the ETag header to the specified controller result, if it is successful
+    """
+    if isinstance(result, flask.Response):
+        if result.status_code == 200:
+            result.set_etag(etag)
+        return result
+    if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+        return cast(R, (result[0], 200, {"ETag": quote_etag(etag)}))
+    return result
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -21,42 +21,56 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 #
+import base64
 import copy
-from collections import defaultdict
-from collections.abc import Callable, Iterable, Mapping
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, Sequence
 from functools import partial, singledispatch
+from itertools import batched
 import logging
 from typing import Literal, cast
 
 import connexion
 from connexion.lifecycle import ConnexionResponse as CxResponse
+import flask
 
 from bos.common.tenant_utils import (get_tenant_component_set,
                                      get_tenant_from_header,
+                                     InvalidTenantException,
                                      is_valid_tenant_component,
-                                     tenant_error_handler)
+                                     tenant_error_handler,
+                                     TenantDataUnavailableException)
 from bos.common.types.components import (ApplyStagedComponents,
                                          ApplyStagedStatus,
+                                         BootArtifacts,
+                                         ComponentChange,
+                                         ComponentChanges,
                                          ComponentData,
                                          ComponentDesiredState,
+                                         ComponentQuery,
                                          ComponentRecord,
                                          ComponentStagedState,
-                                         ComponentUpdateFilter,
-                                         update_component_record)
+                                         ComponentUpdateFilter)
+from bos.common.types.sessions import Session as SessionRecordT
 from bos.common.utils import components_by_id, exc_type_msg, get_current_timestamp
 from bos.common.values import (Phase,
                                Action,
                                Status,
                                EMPTY_ACTUAL_STATE,
                                EMPTY_BOOT_ARTIFACTS,
-                               EMPTY_STAGED_STATE)
+                               EMPTY_STAGED_STATE,
+                               NEXT_CURSOR_HEADER)
 from bos.server import redis_db_utils as dbutils
 from bos.server.controllers.utils import (_400_bad_request,
                                           _404_resource_not_found,
                                           BadRequest,
-                                          ResourceNotFound)
+                                          ResourceNotFound,
+                                          conditional_get,
+                                          streamed_json_array,
+                                          untenanted_request)
 from bos.server.options import get_v2_options_data
-from bos.server.dbs.boot_artifacts import get_boot_artifacts, BssTokenUnknown
+from bos.server.dbs.boot_artifacts import (get_boot_artifacts,
+                                           get_boot_artifacts_map,
+                                           BssTokenUnknown)
 from bos.server.options import update_server_log_level
 from bos.server.utils import get_request_json
 
@@ -64,6 +78,13 @@ LOGGER = logging.getLogger(__name__)
 DB = dbutils.ComponentDBWrapper()
 SESSIONS_DB = dbutils.SessionDBWrapper()
 
+# Number of components read and written at a time by applystaged
+_APPLY_STAGED_BATCH_SIZE = 500
+
+# Number of times that applystaged tries to update a component which keeps being changed by
+# other requests between being read and written, before recording it as failed
+_APPLY_STAGED_ATTEMPTS = 3
+
 # Need to shorten some of these unwieldy type annotations
 type CompAny = ComponentData | ComponentRecord
 
@@ -74,8 +95,19 @@ class ComponentNotFound(ResourceNotFound):
 
     RESOURCE_TYPE: str = "Component"
 
+type _ComponentsPage = tuple[list[ComponentRecord], Literal[200], dict[str, str]]
+
+def _not_cursor_paged(*args: object, cursor: str | None=None, **kwargs: object) -> bool:
+    """
+    Pages requested with a cursor come from a snapshot which only that listing uses, so there
+    is no point labeling them with an ETag. The first page of a snapshot listing is labeled if
+    it is the only page (the responses which include a cursor have no ETag).
+    """
+    return not cursor and untenanted_request(*args, **kwargs)
+
 @tenant_error_handler
 @dbutils.redis_error_handler
+@conditional_get(DB, _not_cursor_paged)
 def get_v2_components(
     ids: str | None=None,
     enabled: bool | None=None,
@@ -84,19 +116,28 @@ def get_v2_components(
     phase: str | None=None,
     status: str | None=None,
     start_after_id: str | None=None,
-    page_size: int=0
-) -> tuple[list[ComponentRecord], Literal[200]] | CxResponse:
+    page_size: int=0,
+    stream: bool=False,
+    fields: str | None=None,
+    snapshot: bool=False,
+    cursor: str | None=None
+) -> tuple[list[ComponentRecord], Literal[200]] | _ComponentsPage | CxResponse | flask.Response:
     """Used by the GET /components API operation
 
     Allows filtering using a comma separated list of ids.
+    If stream is true, the response is sent incrementally as the components are read.
+    If fields is specified, only those fields (and the id) of each component are returned.
+    If snapshot is true (and page_size is specified), or a cursor is specified, the components
+    are listed from a snapshot of the matching component IDs (see _get_v2_components_page).
     """
     # For all entry points into the server, first refresh options and update log level if needed
     update_server_log_level()
 
     LOGGER.debug(
         "GET /v2/components invoked get_v2_components with ids=%s enabled=%s session=%s "
-        "staged_session=%s phase=%s status=%s start_after_id=%s page_size=%d", ids,
-        enabled, session, staged_session, phase, status, start_after_id, page_size)
+        "staged_session=%s phase=%s status=%s start_after_id=%s page_size=%d fields=%s "
+        "snapshot=%s cursor=%s", ids, enabled, session, staged_session, phase, status,
+        start_after_id, page_size, fields, snapshot, cursor)
     if ids is not None:
         try:
             id_list = ids.split(',')
@@ -108,21 +149,186 @@ def get_v2_components(
     tenant = get_tenant_from_header() or None
     LOGGER.debug("GET /v2/components for tenant=%s with %d IDs specified",
                  tenant, len(id_list) if id_list else 0)
-    response = get_v2_components_data(id_list=id_list,
-                                      enabled=enabled,
-                                      session=session,
-                                      staged_session=staged_session,
-                                      phase=phase,
-                                      status=status,
-                                      tenant=tenant,
-                                      start_after_id=start_after_id,
-                                      page_size=page_size,
-                                      delete_timestamp=True)
+    if cursor or (snapshot and page_size):
+        return _get_v2_components_page(cursor=cursor,
+                                       id_list=id_list,
+                                       enabled=enabled,
+                                       session=session,
+                                       staged_session=staged_session,
+                                       phase=phase,
+                                       status=status,
+                                       tenant=tenant,
+                                       start_after_id=start_after_id,
+                                       page_size=page_size,
+                                       fields=_parse_fields(fields))
+    components = iter_v2_components_data(id_list=id_list,
+                                         enabled=enabled,
+                                         session=session,
+                                         staged_session=staged_session,
+                                         phase=phase,
+                                         status=status,
+                                         tenant=tenant,
+                                         start_after_id=start_after_id,
+                                         page_size=page_size,
+                                         delete_timestamp=True,
+                                         fields=_parse_fields(fields))
+    if stream:
+        LOGGER.debug("GET /v2/components streaming data for tenant=%s", tenant)
+        return streamed_json_array(components)
+    response = list(components)
     LOGGER.debug(
         "GET /v2/components returning data for tenant=%s on %d components",
         tenant, len(response))
     return response, 200
 
+@tenant_error_handler
+@dbutils.redis_error_handler
+def post_v2_components_query(
+    stream: bool=False
+) -> tuple[list[ComponentRecord], Literal[200]] | _ComponentsPage | CxResponse | flask.Response:
+    """Used by the POST /components/query API operation
+
+    The same as get_v2_components, except that the filters are in the request body, so
+    that long lists of component IDs can be specified.
+    """
+    # For all entry points into the server, first refresh options and update log level if needed
+    update_server_log_level()
+
+    LOGGER.debug("POST /v2/components/query invoked post_v2_components_query")
+    try:
+        query = cast(ComponentQuery, get_request_json())
+    except Exception as err:
+        LOGGER.error("Error parsing POST request data: %s", exc_type_msg(err))
+        return _400_bad_request(f"Error parsing the data provided: {err}")
+    tenant = get_tenant_from_header() or None
+    id_list = query.get("ids")
+    LOGGER.debug("POST /v2/components/query for tenant=%s with %d IDs specified",
+                 tenant, len(id_list) if id_list else 0)
+    if query.get("cursor") or (query.get("snapshot") and query.get("page_size")):
+        return _get_v2_components_page(cursor=query.get("cursor"),
+                                       id_list=id_list,
+                                       enabled=query.get("enabled"),
+                                       session=query.get("session"),
+                                       staged_session=query.get("staged_session"),
+                                       phase=query.get("phase"),
+                                       status=query.get("status"),
+                                       tenant=tenant,
+                                       start_after_id=query.get("start_after_id"),
+                                       page_size=query.get("page_size", 0),
+                                       fields=query.get("fields"))
+    components = iter_v2_components_data(id_list=id_list,
+                                         enabled=query.get("enabled"),
+                                         session=query.get("session"),
+                                         staged_session=query.get("staged_session"),
+                                         phase=query.get("phase"),
+                                         status=query.get("status"),
+                                         tenant=tenant,
+                                         start_after_id=query.get("start_after_id"),
+                                         page_size=query.get("page_size", 0),
+                                         delete_timestamp=True,
+                                         fields=query.get("fields"))
+    if stream:
+        LOGGER.debug("POST /v2/components/query streaming data for tenant=%s", tenant)
+        return streamed_json_array(components)
+    response = list(components)
+    LOGGER.debug(
+        "POST /v2/components/query returning data for tenant=%s on %d components",
+        tenant, len(response))
+    return response, 200
+
+def _get_v2_components_page(
+    cursor: str | None,
+    id_list: list[str] | None,
+    enabled: bool | None,
+    session: str | None,
+    staged_session: str | None,
+    phase: str | None,
+    status: str | None,
+    tenant: str | None,
+    start_after_id: str | None,
+    page_size: int,
+    fields: Collection[str] | None
+) -> tuple[list[ComponentRecord], Literal[200]] | _ComponentsPage | CxResponse:
+    """
+    Returns a page of a snapshot listing of the matching components.
+    If cursor is None, the first page is returned. It is read directly from the database,
+    and only if it is full is a snapshot of the IDs of the matching components created, for
+    the following pages. Otherwise, the page following the one the cursor was returned with
+    is returned, from that snapshot. The filters must be the same for every page (except that
+    the ids filter is only used for the first page and the snapshot).
+
+    If the page is full, the cursor for the next page is returned in the NEXT_CURSOR_HEADER
+    header. Responses are never streamed, since that header must be sent before the body.
+    """
+    if cursor is None:
+        components = list(iter_v2_components_data(id_list=id_list,
+                                                  enabled=enabled,
+                                                  session=session,
+                                                  staged_session=staged_session,
+                                                  phase=phase,
+                                                  status=status,
+                                                  tenant=tenant,
+                                                  start_after_id=start_after_id,
+                                                  page_size=page_size,
+                                                  delete_timestamp=True,
+                                                  fields=fields))
+        if len(components) < page_size:
+            LOGGER.debug("Returning only page of %d components for tenant=%s",
+                         len(components), tenant)
+            return components, 200
+        snapshot = create_v2_components_snapshot(id_list=id_list,
+                                                 enabled=enabled,
+                                                 session=session,
+                                                 staged_session=staged_session,
+                                                 phase=phase,
+                                                 status=status,
+                                                 tenant=tenant)
+        LOGGER.debug("Returning first page of %d components, with snapshot %s for tenant=%s",
+                     len(components), snapshot, tenant)
+        return components, 200, {NEXT_CURSOR_HEADER: _make_cursor(snapshot, components[-1]["id"])}
+    try:
+        snapshot, start_after_id = _parse_cursor(cursor)
+    except ValueError as err:
+        LOGGER.error("Error parsing cursor: %s", exc_type_msg(err))
+        return _400_bad_request(f"Invalid cursor: {cursor}")
+    try:
+        components = list(iter_v2_components_data(enabled=enabled,
+                                                  session=session,
+                                                  staged_session=staged_session,
+                                                  phase=phase,
+                                                  status=status,
+                                                  tenant=tenant,
+                                                  start_after_id=start_after_id,
+                                                  page_size=page_size,
+                                                  delete_timestamp=True,
+                                                  fields=fields,
+                                                  snapshot=snapshot))
+    except dbutils.KeySnapshotNotFound as err:
+        LOGGER.warning("Component listing snapshot not found: %s", err)
+        return _400_bad_request("The cursor has expired. Restart the listing.")
+    headers: dict[str, str] = {}
+    if page_size and len(components) == page_size:
+        headers[NEXT_CURSOR_HEADER] = _make_cursor(snapshot, components[-1]["id"])
+    LOGGER.debug("Returning page of %d components from snapshot %s for tenant=%s",
+                 len(components), snapshot, tenant)
+    return components, 200, headers
+
+def _make_cursor(snapshot: str, last_id: str) -> str:
+    """
+    Returns the opaque cursor for the page of a snapshot listing following the specified ID
+    """
+    return base64.urlsafe_b64encode(f"{snapshot}:{last_id}".encode()).decode()
+
+def _parse_cursor(cursor: str) -> tuple[str, str]:
+    """
+    Returns the snapshot ID and the ID to start after from the specified cursor.
+    Raises ValueError if it is not valid.
+    """
+    snapshot, _, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition(":")
+    if not snapshot or not last_id:
+        raise ValueError(f"Malformed cursor: {cursor}")
+    return snapshot, last_id
+
 def get_v2_components_data(
     id_list: list[str] | None=None,
     enabled: bool | None=None,
@@ -134,18 +340,64 @@ def get_v2_components_data(
     start_after_id: str | None=None,
     page_size: int=0,
     *,
-    delete_timestamp: bool=False
+    delete_timestamp: bool=False,
+    fields: Collection[str] | None=None
 ) -> list[ComponentRecord]:
     """Used by the GET /components API operation
 
     Allows filtering using a comma separated list of ids.
+    If fields is specified, only those fields (and the id) of each component are returned.
     """
-    id_set = _get_id_set(id_list, tenant)
+    return list(iter_v2_components_data(id_list=id_list,
+                                        enabled=enabled,
+                                        session=session,
+                                        staged_session=staged_session,
+                                        phase=phase,
+                                        status=status,
+                                        tenant=tenant,
+                                        start_after_id=start_after_id,
+                                        page_size=page_size,
+                                        delete_timestamp=delete_timestamp,
+                                        fields=fields))
+
+def iter_v2_components_data(
+    id_list: list[str] | None=None,
+    enabled: bool | None=None,
+    session: str | None=None,
+    staged_session: str | None=None,
+    phase: str | None=None,
+    status: str | None=None,
+    tenant: str | None=None,
+    start_after_id: str | None=None,
+    page_size: int=0,
+    *,
+    delete_timestamp: bool=False,
+    fields: Collection[str] | None=None,
+    snapshot: str | None=None
+) -> Iterator[ComponentRecord]:
+    """
+    The same as get_v2_components_data, except that the components are yielded as they
+    are read from the database.
+
+    If snapshot is specified, only the components in that snapshot (see
+    create_v2_components_snapshot) are considered. The filters are still applied to them.
+    """
+    if snapshot is not None:
+        # The ids filter and indexes were applied when the snapshot was created
+        id_set = _get_id_set(None, tenant)
+    else:
+        id_set = _get_matching_id_set(id_list=id_list,
+                                      enabled=enabled,
+                                      session=session,
+                                      staged_session=staged_session,
+                                      phase=phase,
+                                      status=status,
+                                      tenant=tenant)
 
     # If id_set is not None but is empty, that means no components in the system
     # will match our filter, so we can return an empty list immediately.
     if id_set is not None and not id_set:
-        return []
+        return iter(())
 
     _component_filter_func = _get_component_filter_func(enabled=enabled,
                                                         session=session,
@@ -153,11 +405,70 @@ def get_v2_components_data(
                                                         phase=phase,
                                                         status=status,
                                                         delete_timestamp=delete_timestamp)
-
-    return DB.get_all_filtered(filter_func=_component_filter_func,
-                               start_after_key=start_after_id,
-                               page_size=page_size,
-                               specific_keys=id_set)
+    if fields is not None:
+        _component_filter_func = partial(_project_component,
+                                         filter_func=_component_filter_func,
+                                         fields=frozenset(fields))
+
+    return DB.iter_filtered(filter_func=_component_filter_func,
+                            start_after_key=start_after_id,
+                            page_size=page_size,
+                            specific_keys=id_set,
+                            snapshot=snapshot)
+
+def create_v2_components_snapshot(
+    id_list: list[str] | None=None,
+    enabled: bool | None=None,
+    session: str | None=None,
+    staged_session: str | None=None,
+    phase: str | None=None,
+    status: str | None=None,
+    tenant: str | None=None
+) -> str:
+    """
+    Store a snapshot of the IDs of the components which may match the specified filters,
+    so that they can be paged through using iter_v2_components_data without being affected by
+    components which are created or deleted (or start matching the filters) in the meantime.
+    Returns the snapshot ID.
+    """
+    id_set = _get_matching_id_set(id_list=id_list,
+                                  enabled=enabled,
+                                  session=session,
+                                  staged_session=staged_session,
+                                  phase=phase,
+                                  status=status,
+                                  tenant=tenant)
+    return DB.create_key_snapshot(id_set)
+
+def _get_matching_id_set(
+    id_list: list[str] | None,
+    enabled: bool | None,
+    session: str | None,
+    staged_session: str | None,
+    phase: str | None,
+    status: str | None,
+    tenant: str | None
+) -> set[str] | None:
+    """
+    Returns the IDs of the components which may match the specified filters, or None if
+    any component may match them.
+    """
+    id_set = _get_id_set(id_list, tenant)
+    if id_set is not None and not id_set:
+        return id_set
+
+    if enabled is not None or any([session, staged_session, phase, status]):
+        # Use the DB indexes to narrow down which components need to be examined.
+        # The filter function is still applied to each component, so the results
+        # are the same either way.
+        indexed_ids = DB.get_indexed_ids(enabled=enabled,
+                                         session=session or None,
+                                         staged_session=staged_session or None,
+                                         phase=phase or None,
+                                         statuses=status.split(',') if status else None)
+        if indexed_ids is not None:
+            id_set = indexed_ids if id_set is None else id_set.intersection(indexed_ids)
+    return id_set
 
 def _get_id_set(id_list: list[str] | None, tenant: str | None) -> set[str] | None:
     """
@@ -190,7 +501,7 @@ def _get_component_filter_func(
     """
     Return the filter function to be used by get_v2_components_data
     """
-    if any([enabled, session, staged_session, phase, status]):
+    if enabled is not None or any([session, staged_session, phase, status]):
         return partial(_filter_component,
                        enabled=enabled,
                        session=session or None,
@@ -225,13 +536,41 @@ def _filter_component(
             return None
     return updated_data
 
-def _set_status(data: ComponentRecord, *, delete_timestamp: bool=False) -> ComponentRecord:
+def _parse_fields(fields: str | None) -> list[str] | None:
+    """
+    Parse a comma separated list of component fields. Returns None if none are specified.
+    """
+    if not fields:
+        return None
+    return [field for field in fields.split(',') if field]
+
+def _project_component(
+    data: ComponentRecord,
+    filter_func: Callable[[ComponentRecord], ComponentRecord | None],
+    fields: frozenset[str]
+) -> ComponentRecord | None:
+    """
+    Apply the filter function to the component, and then discard all of its fields except
+    for the specified ones and the id
+    """
+    if (filtered_data := filter_func(data)) is None:
+        return None
+    return cast(ComponentRecord, { field: value for field, value in filtered_data.items()
+                                   if field in fields or field == "id" })
+
+def _set_status(data: ComponentRecord, *, delete_timestamp: bool=False,
+                recalculate: bool=False) -> ComponentRecord:
     """
     This sets the status field of the overall status.
+
+    The status is calculated and stored whenever a component is written (see component_scripts
+    in bos.server.redis_db_utils), so for records read from the database, it is only calculated
+    here if it is missing, or if recalculate is True.
     """
     if "status" not in data:
         data["status"] = {"phase": "", "status_override": ""}
-    data['status']['status'] = _calculate_status(data)
+    if recalculate or "status" not in data['status']:
+        data['status']['status'] = _calculate_status(data)
     if delete_timestamp:
         del_timestamp(data)
     return data
@@ -296,7 +635,8 @@ def put_v2_components() -> tuple[list[ComponentRecord], Literal[200]] | CxRespon
         return _400_bad_request("At least one component is missing the required 'id' field")
 
     for comp_id in components:
-        components[comp_id] = _set_auto_fields(components[comp_id])
+        components[comp_id] = _set_status(_set_auto_fields(components[comp_id]),
+                                          recalculate=True)
 
     DB.mput(components)
     return list(components.values()), 200
@@ -319,8 +659,7 @@ def patch_v2_components(
         return _400_bad_request(f"Error parsing the data provided: {err}")
 
     try:
-        current_component_data, component_patch_data = _parse_v2_components_bulk_patch(
-                                                            data, skip_bad_ids=skip_bad_ids)
+        apply_patch = _parse_v2_components_bulk_patch(data, skip_bad_ids=skip_bad_ids)
     except ComponentNotFound as err:
         LOGGER.warning(err)
         return _404_component_not_found(resource_id=err.resource_id)  # pylint: disable=redundant-keyword-arg
@@ -331,26 +670,27 @@ def patch_v2_components(
         LOGGER.error("Error parsing PATCH request data: %s", exc_type_msg(err))
         return _400_bad_request(f"Error parsing the data provided: {err}")
 
-    if not current_component_data:
-        LOGGER.debug("patch_v2_components: No components to patch")
-        return [], 200
-
     try:
-        for comp_id, comp in current_component_data.items():
-            update_component_record(comp, component_patch_data[comp_id])
-    except Exception as err:
+        patched_component_data = apply_patch()
+    except dbutils.NotFoundInDB as err:
+        LOGGER.warning(err)
+        return _404_component_not_found(resource_id=err.key)  # pylint: disable=redundant-keyword-arg
+    except dbutils.InvalidDBPatch as err:
         LOGGER.error("Error patching component data: %s", exc_type_msg(err))
         return _400_bad_request(f"Error patching the data provided: {err}")
 
-    DB.mput(current_component_data)
-    return list(current_component_data.values()), 200
+    if not patched_component_data:
+        LOGGER.debug("patch_v2_components: No components patched")
+    return list(patched_component_data.values()), 200
+
+
+# The patching of the components is done in the DB, so the parsing functions return a
+# function which performs the patch and returns the updated component records
+type _ApplyPatchFunc = Callable[[], dict[str, ComponentRecord]]
 
 
 @singledispatch
-def _parse_v2_components_bulk_patch(
-    data: object, /, *, skip_bad_ids: bool
-) -> tuple[dict[str, ComponentRecord],
-           Mapping[str, ComponentData] | Mapping[str, ComponentRecord]]:
+def _parse_v2_components_bulk_patch(data: object, /, *, skip_bad_ids: bool) -> _ApplyPatchFunc:
     """
     This is the fallback function, for cases where data does not match one of the
     later definitions. This will only happen if data is not a list or a dict.
@@ -361,12 +701,11 @@ def _parse_v2_components_bulk_patch(
 
 
 @_parse_v2_components_bulk_patch.register(list)
-def _(
-    data: list[ComponentRecord], /, *, skip_bad_ids: bool
-) -> tuple[dict[str, ComponentRecord], dict[str, ComponentRecord]]:
+def _(data: list[ComponentRecord], /, *, skip_bad_ids: bool) -> _ApplyPatchFunc:
     """
     Set the automatic component fields for the specified patch data
-    Extract the IDs from the specified list of component records, and get the current data for them
+    Extract the IDs from the specified list of component records, and determine which
+    of them are to be patched
     """
     LOGGER.debug("_parse_v2_components_bulk_patch(list): %d components specified", len(data))
     try:
@@ -375,22 +714,22 @@ def _(
     except Exception as err:
         raise BadRequest(f"Error parsing the data provided: {exc_type_msg(err)}") from err
 
-    components = _load_comps_from_id_list(list(patch_data), skip_bad_ids=skip_bad_ids)
+    id_list = _check_id_list(list(patch_data), skip_bad_ids=skip_bad_ids)
+    if len(id_list) != len(patch_data):
+        patch_data = { comp_id: patch_data[comp_id] for comp_id in id_list }
 
     LOGGER.debug("_parse_v2_components_bulk_patch(list): %d components to be patched",
-                 len(components))
-    return components, patch_data
+                 len(patch_data))
+    return partial(DB.patch, patch_data, skip_bad_keys=skip_bad_ids)
 
 
 @_parse_v2_components_bulk_patch.register(dict)
-def _(
-    data: ComponentUpdateFilter, /, *, skip_bad_ids: bool
-) -> tuple[dict[str, ComponentRecord], defaultdict[str, ComponentData]]:
+def _(data: ComponentUpdateFilter, /, *, skip_bad_ids: bool) -> _ApplyPatchFunc:
     """
     Set the automatic component fields for the specified patch data.
     Remove its ID field, if present.
-    Determine whether this is a session filter or an id filter, and get the current component data
-    for the specified filter.
+    Determine whether this is a session filter or an id filter, and find the IDs of the
+    components matching the specified filter.
     """
     try:
         filters = data["filters"]
@@ -405,52 +744,65 @@ def _(
         raise BadRequest("No filter provided.")
     patch.pop("id", None)
     patch = _set_auto_fields(patch)
-    # Because in this case we are applying the same patch data to every component, we
-    # can just use a defaultdict that always returns our patch data
-    patch_data: defaultdict[str, ComponentData] = defaultdict(lambda: patch)
     if ids:
-        components = _update_filter_ids_to_components(ids,skip_bad_ids=skip_bad_ids)
+        id_list = _update_filter_ids_to_id_list(ids, skip_bad_ids=skip_bad_ids)
+        skip_missing = skip_bad_ids
     else:
-        # session
-        tenant = get_tenant_from_header()
-        components = components_by_id(get_v2_components_data(session=session, tenant=tenant))
+        # session (which the checks above guarantee is a non-empty string)
+        id_list = _get_session_component_ids(cast(str, session), get_tenant_from_header())
+        # Components which are deleted after we find them are just skipped
+        skip_missing = True
     LOGGER.debug("_parse_v2_components_bulk_patch(dict): %d IDs found in specified %s",
-                 len(components), 'id list' if ids else 'session')
-    return components, patch_data
+                 len(id_list), 'id list' if ids else 'session')
+    # The same patch data is applied to every component
+    return partial(DB.patch_all, id_list, patch, skip_bad_keys=skip_missing)
 
 
-def _update_filter_ids_to_components(ids: str, skip_bad_ids: bool) -> dict[str, ComponentRecord]:
+def _update_filter_ids_to_id_list(ids: str, skip_bad_ids: bool) -> list[str]:
     try:
         id_list = ids.split(',')
     except Exception as err:
         raise BadRequest(f"Error parsing the IDs provided: {exc_type_msg(err)}") from err
 
-    return _load_comps_from_id_list(id_list, skip_bad_ids=skip_bad_ids)
+    return _check_id_list(id_list, skip_bad_ids=skip_bad_ids)
 
 
-def _load_comps_from_id_list(id_list: list[str], skip_bad_ids: bool) -> dict[str, ComponentRecord]:
+def _check_id_list(id_list: list[str], skip_bad_ids: bool) -> list[str]:
+    """
+    Check the specified component IDs against the tenant (if any).
+    If skip_bad_ids is True, return the IDs which are valid for the tenant.
+    Otherwise, raise ComponentNotFound if any are not valid for the tenant.
+    Components which do not exist in the DB are dealt with when the patch is applied.
+    """
     start_len = len(id_list)
-    LOGGER.debug("_load_comps_from_id_list: %d IDs specified", start_len)
+    LOGGER.debug("_check_id_list: %d IDs specified", start_len)
     tenant = get_tenant_from_header()
+    if not tenant:
+        return id_list
 
     if skip_bad_ids:
-        if tenant:
-            legal_component_ids = get_tenant_component_set(tenant)
-            id_list = list(legal_component_ids.intersection(id_list))
-            if len(id_list) != start_len:
-                LOGGER.debug("After filtering out invalid IDs, %d IDs remain", len(id_list))
-            if not id_list:
-                return {}
+        legal_component_ids = get_tenant_component_set(tenant, allow_stale=False)
+        id_list = [comp_id for comp_id in id_list if comp_id in legal_component_ids]
+        if len(id_list) != start_len:
+            LOGGER.debug("After filtering out invalid IDs, %d IDs remain", len(id_list))
+        return id_list
 
-        return DB.mget_skip_bad_keys(id_list)
+    _check_for_invalid_tenant_comp(id_list, tenant)
+    return id_list
 
-    if tenant:
-        _check_for_invalid_tenant_comp(id_list, tenant)
 
-    try:
-        return DB.mget(id_list)
-    except dbutils.NotFoundInDB as exc:
-        raise ComponentNotFound(exc.key) from exc
+def _get_session_component_ids(session: str, tenant: str | None) -> list[str]:
+    """
+    Returns the IDs of the components (accessible to the specified tenant) that belong to the
+    specified session
+    """
+    if (indexed_ids := DB.get_indexed_ids(session=session)) is not None:
+        if tenant:
+            indexed_ids.intersection_update(get_tenant_component_set(tenant))
+        return sorted(indexed_ids)
+    # The indexes are not ready, so fall back to checking the components themselves
+    return [comp["id"] for comp in get_v2_components_data(session=session, tenant=tenant,
+                                                          fields=["id"])]
 
 
 def _check_for_invalid_tenant_comp(comp_id_list: Iterable[str], tenant: str) -> None:
@@ -458,7 +810,7 @@ def _check_for_invalid_tenant_comp(comp_id_list: Iterable[str], tenant: str) ->
     If any of the listed component IDs are not valid for the specified tenant, raise
     ComponentNotFound for one of the invalid IDs.
     """
-    legal_component_ids = get_tenant_component_set(tenant)
+    legal_component_ids = get_tenant_component_set(tenant, allow_stale=False)
     for comp_id in comp_id_list:
         if comp_id not in legal_component_ids:
             raise ComponentNotFound(comp_id)
@@ -466,6 +818,7 @@ def _check_for_invalid_tenant_comp(comp_id_list: Iterable[str], tenant: str) ->
 
 @tenant_error_handler
 @dbutils.redis_error_handler
+@conditional_get(DB, untenanted_request)
 def get_v2_component(component_id: str) -> tuple[ComponentRecord, Literal[200]] | CxResponse:
     """Used by the GET /components/{component_id} API operation"""
     # For all entry points into the server, first refresh options and update log level if needed
@@ -508,7 +861,7 @@ def put_v2_component(component_id: str) -> tuple[ComponentRecord, Literal[200]]
     # Fill in the other fields with the request body
     new_component.update(data)
 
-    new_component = _set_auto_fields(new_component)
+    new_component = _set_status(_set_auto_fields(new_component), recalculate=True)
     DB.put(component_id, new_component)
     return new_component, 200
 
@@ -532,43 +885,29 @@ def patch_v2_component(component_id: str) -> tuple[ComponentRecord, Literal[200]
     if not is_valid_tenant_component(component_id, get_tenant_from_header()):
         LOGGER.warning("Component %s could not be found", component_id)
         return _404_component_not_found(resource_id=component_id)  # pylint: disable=redundant-keyword-arg
+
+    patch_data.pop("id", None)
+    patch_data = _set_auto_fields(patch_data)
     try:
-        component = DB.get(component_id)
+        # If the patch includes actual_state, the DB refuses to apply it if BOS is currently
+        # changing the state of the component
+        component = DB.patch({component_id: patch_data}, check_actual_state=True)[component_id]
     except dbutils.NotFoundInDB:
         LOGGER.warning("Component %s could not be found", component_id)
         return _404_component_not_found(resource_id=component_id)  # pylint: disable=redundant-keyword-arg
-
-    if "actual_state" in patch_data and not _validate_actual_state_change_is_allowed(component):
+    except dbutils.DBPatchConflict:
         LOGGER.warning("Not able to update actual state")
         return connexion.problem(
             status=409,
             title="Actual state can not be updated.",
             detail="BOS is currently changing the state of the node,"
             " and the actual state can not be accurately recorded")
-    patch_data.pop("id", None)
-    patch_data = _set_auto_fields(patch_data)
-    update_component_record(component, patch_data)
-    DB.put(component_id, component)
+    except dbutils.InvalidDBPatch as err:
+        LOGGER.error("Error patching component %s: %s", component_id, exc_type_msg(err))
+        return _400_bad_request(f"Error patching the data provided: {err}")
     return component, 200
 
 
-def _validate_actual_state_change_is_allowed(current_data: CompAny) -> bool:
-    if not current_data["enabled"]:
-        # This component is not being managed on by BOS
-        return True
-    if _calculate_status(current_data) == Status.stable:
-        # BOS believes the component is in the correct state
-        return True
-    if current_data["last_action"]["action"] == Action.power_on:
-        # BOS just powered-on the component and is waiting for the new state to be reported
-        return True
-    # The component is being actively changed by BOS, and is going to be powered off or
-    #   is in a state where the next action hasn't been determined.  Allowing the actual
-    #   state to be updated can interfere with BOS' ability to determine the next action.
-    #   e.g. When the actual_state is deleted by the setup operator to trigger a reboot
-    return False
-
-
 @tenant_error_handler
 @dbutils.redis_error_handler
 def delete_v2_component(component_id: str) -> tuple[None, Literal[204]] | CxResponse:
@@ -612,17 +951,12 @@ def post_v2_apply_staged() -> tuple[ApplyStagedStatus, Literal[200]] | CxRespons
         xnames = data.get("xnames", [])
         allowed_xnames, rejected_xnames = _apply_tenant_limit(xnames)
         response["ignored"] = rejected_xnames
-        for xname in allowed_xnames:
-            try:
-                if _apply_staged(xname, clear_staged):
-                    response["succeeded"].append(xname)
-                else:
-                    response["ignored"].append(xname)
-            except Exception:
-                LOGGER.exception(
-                    "An error was encountered while attempting to apply stage for node %s",
-                    xname)
-                response["failed"].append(xname)
+        staged_sessions = _StagedSessionLookup(get_tenant_from_header())
+        for batch in batched(allowed_xnames, _APPLY_STAGED_BATCH_SIZE):
+            _apply_staged_batch(batch, clear_staged, staged_sessions, response)
+    except (InvalidTenantException, TenantDataUnavailableException):
+        # These are handled by tenant_error_handler
+        raise
     except Exception as err:
         LOGGER.error("Error parsing request data: %s", exc_type_msg(err))
         return _400_bad_request(f"Error parsing the data provided: {err}")
@@ -630,53 +964,214 @@ def post_v2_apply_staged() -> tuple[ApplyStagedStatus, Literal[200]] | CxRespons
     return response, 200
 
 
+@tenant_error_handler
+@dbutils.redis_error_handler
+def get_v2_component_changes(after: str | None=None,
+                             limit: int=1000) -> tuple[ComponentChanges, Literal[200]] | CxResponse:
+    """Used by the GET /componentchanges API operation"""
+    # For all entry points into the server, first refresh options and update log level if needed
+    update_server_log_level()
+
+    LOGGER.debug("GET /v2/componentchanges invoked get_v2_component_changes with after=%s "
+                 "limit=%d", after, limit)
+    try:
+        result = DB.get_changes(after, limit=limit)
+    except ValueError as err:
+        LOGGER.error("Error reading component changes: %s", exc_type_msg(err))
+        return _400_bad_request(str(err))
+    changes = result.changes
+    if tenant := get_tenant_from_header():
+        tenant_components = get_tenant_component_set(tenant)
+        changes = [change for change in changes if change.id in tenant_components]
+    response: ComponentChanges = {
+        "changes": [cast(ComponentChange, change._asdict()) for change in changes],
+        "next_cursor": result.next_cursor,
+        "truncated": result.truncated
+    }
+    LOGGER.debug("GET /v2/componentchanges returning %d changes", len(changes))
+    return response, 200
+
+
 def _apply_tenant_limit(component_list: list[str]) -> tuple[list[str], list[str]]:
     tenant = get_tenant_from_header()
     if not tenant:
         return component_list, []
-    tenant_components = get_tenant_component_set(tenant)
+    tenant_components = get_tenant_component_set(tenant, allow_stale=False)
     component_set = set(component_list)
     allowed_components = component_set.intersection(tenant_components)
     rejected_components = component_set.difference(tenant_components)
     return list(allowed_components), list(rejected_components)
 
 
-def _apply_staged(component_id: str, clear_staged: bool=False) -> bool:
+class _StagedSessionLookup:
+    """
+    Looks up staged sessions for an applystaged request, so that each distinct session is
+    only read from the DB once
+    """
+
+    def __init__(self, tenant: str | None) -> None:
+        self.tenant = tenant
+        self._sessions: dict[str, SessionRecordT | None] = {}
+
+    def get(self, session_id: str) -> SessionRecordT | None:
+        """
+        Returns the specified session, or None if it does not exist
+        """
+        if session_id not in self._sessions:
+            try:
+                self._sessions[session_id] = SESSIONS_DB.tenanted_get(session_id, self.tenant)
+            except dbutils.NotFoundInDB:
+                self._sessions[session_id] = None
+        return self._sessions[session_id]
+
+
+def _apply_staged_batch(component_ids: Sequence[str], clear_staged: bool,
+                        staged_sessions: _StagedSessionLookup,
+                        response: ApplyStagedStatus) -> None:
+    """
+    Apply the staged states of the specified components, reading and writing them
+    in bulk, and record the result for each of them in the response.
+    Components are only written if they have not been changed since they were read. Any which
+    have are read and updated again, up to _APPLY_STAGED_ATTEMPTS times in all, and are then
+    recorded as failed.
+    """
+    for _ in range(_APPLY_STAGED_ATTEMPTS):
+        component_ids = _try_apply_staged_batch(component_ids, clear_staged, staged_sessions,
+                                                response)
+        if not component_ids:
+            return
+    LOGGER.error("Components %s were changed by other requests while their staged states were "
+                 "being applied", component_ids)
+    response["failed"].extend(component_ids)
+
+
+def _try_apply_staged_batch(component_ids: Sequence[str], clear_staged: bool,
+                            staged_sessions: _StagedSessionLookup,
+                            response: ApplyStagedStatus) -> list[str]:
+    """
+    Make one attempt to apply the staged states of the specified components, and record the
+    result for each of them in the response -- except for those which were changed between
+    being read and written, whose IDs are returned instead.
+    """
     try:
-        data = DB.get(component_id)
-    except dbutils.NotFoundInDB:
-        return False
-    staged_state = data.get("staged_state", EMPTY_STAGED_STATE)
+        components = DB.mget_for_update(component_ids)
+    except Exception:
+        LOGGER.exception("An error was encountered while attempting to read components %s",
+                         component_ids)
+        response["failed"].extend(component_ids)
+        return []
+    # Look up the boot artifacts for all of the components at once
+    bss_tokens = { token for component, _ in components.values()
+                   if (token := component.get("actual_state", {}).get("bss_token")) }
+    known_boot_artifacts = get_boot_artifacts_map(bss_tokens) if bss_tokens else {}
+    updated_components: dict[str, ComponentRecord] = {}
+    succeeded: list[str] = []
+    failed: list[str] = []
+    for component_id in component_ids:
+        if component_id not in components:
+            response["ignored"].append(component_id)
+            continue
+        component = components[component_id][0]
+        try:
+            updated_component = _apply_staged(component, clear_staged, staged_sessions,
+                                              known_boot_artifacts)
+        except Exception as err:
+            LOGGER.exception(
+                "An error was encountered while attempting to apply stage for node %s",
+                component_id)
+            failed.append(component_id)
+            if isinstance(err, _StagedStateNotApplied):
+                # Write the component, to record the error
+                updated_components[component_id] = err.component
+            continue
+        if updated_component is None:
+            response["ignored"].append(component_id)
+            continue
+        succeeded.append(component_id)
+        updated_components[component_id] = updated_component
+    try:
+        conflicts = DB.mput_if_unchanged(updated_components,
+                                         { component_id: components[component_id][1]
+                                           for component_id in updated_components })
+    except Exception:
+        LOGGER.exception("An error was encountered while attempting to write components %s",
+                         list(updated_components))
+        response["failed"].extend(failed)
+        response["failed"].extend(succeeded)
+        return []
+    response["succeeded"].extend(component_id for component_id in succeeded
+                                 if component_id not in conflicts)
+    response["failed"].extend(component_id for component_id in failed
+                              if component_id not in conflicts)
+    if conflicts:
+        LOGGER.info("Components %s were changed while their staged states were being applied",
+                    sorted(conflicts))
+    return [component_id for component_id in component_ids if component_id in conflicts]
+
+
+class _StagedStateNotApplied(Exception):
+    """
+    Raised when the staged state of a component cannot be applied. The component record has
+    been updated to record the error, and should still be written.
+    """
+
+    def __init__(self, component: ComponentRecord, error: Exception) -> None:
+        super().__init__(str(error))
+        self.component = component
+
+
+def _apply_staged(component: ComponentRecord, clear_staged: bool,
+                  staged_sessions: _StagedSessionLookup,
+                  known_boot_artifacts: Mapping[str, BootArtifacts]) -> ComponentRecord | None:
+    """
+    Returns a copy of the specified component record, updated from its staged state, or None
+    if it has no staged session. The record itself is not changed.
+    Raises _StagedStateNotApplied (with a copy of the record updated to record the error) if
+    the staged state cannot be applied. If any other exception is raised, the component
+    should not be written.
+    """
+    staged_state = component.get("staged_state", EMPTY_STAGED_STATE)
     staged_session_id = staged_state.get("session", "")
     if not staged_session_id:
-        return False
+        return None
+    data = copy.deepcopy(component)
     try:
-        _set_state_from_staged(data, staged_state, staged_session_id)
-    except Exception as e:
-        data["error"] = str(e)
+        _set_state_from_staged(data, staged_state, staged_session_id,
+                               staged_sessions.get(staged_session_id), staged_sessions.tenant)
+    except Exception as err:
+        # Start again from the original record, in case the staged state was partly applied
+        data = copy.deepcopy(component)
+        data["error"] = str(err)
         data["enabled"] = False
-        raise e
-    finally:
-        # For both the successful and failed cases, we want the new session to own the node
-        data["session"] = staged_session_id
-        data["last_action"]["action"] = Action.apply_staged
-        if clear_staged:
-            data["staged_state"] = copy.deepcopy(EMPTY_STAGED_STATE)
-        _set_auto_fields(data)
-        DB.put(component_id, data)
-    return True
+        _set_applied_staged_fields(data, staged_session_id, clear_staged, known_boot_artifacts)
+        raise _StagedStateNotApplied(data, err) from err
+    _set_applied_staged_fields(data, staged_session_id, clear_staged, known_boot_artifacts)
+    return data
+
+
+def _set_applied_staged_fields(data: ComponentRecord, staged_session_id: str,
+                               clear_staged: bool,
+                               known_boot_artifacts: Mapping[str, BootArtifacts]) -> None:
+    """
+    Updates the fields of a component record which are set whether or not its staged state
+    was successfully applied
+    """
+    # For both the successful and failed cases, we want the new session to own the node
+    data["session"] = staged_session_id
+    data["last_action"]["action"] = Action.apply_staged
+    if clear_staged:
+        data["staged_state"] = copy.deepcopy(EMPTY_STAGED_STATE)
+    _set_auto_fields(data, known_boot_artifacts)
 
 
 def _set_state_from_staged(data: CompAny, staged_state: ComponentStagedState,
-                           staged_session_name: str) -> None:
-    tenant = get_tenant_from_header()
-    try:
-        session = SESSIONS_DB.tenanted_get(staged_session_name, tenant)
-    except dbutils.NotFoundInDB as exc:
+                           staged_session_name: str, session: SessionRecordT | None,
+                           tenant: str | None) -> None:
+    if session is None:
         raise Exception(
             "Staged session no longer exists "
             f"(session: {staged_session_name}, tenant: {tenant})"
-        ) from exc
+        )
     operation = session["operation"]
     if operation == "shutdown":
         if any(staged_state.get("boot_artifacts", {}).values()):
@@ -709,8 +1204,11 @@ def _set_state_from_staged(data: CompAny, staged_state: ComponentStagedState,
     data["enabled"] = True
 
 
-def _set_auto_fields[CompAnyT: (ComponentData, ComponentRecord)](data: CompAnyT) -> CompAnyT:
-    data = _populate_boot_artifacts(data)
+def _set_auto_fields[CompAnyT: (ComponentData, ComponentRecord)](
+    data: CompAnyT,
+    known_boot_artifacts: Mapping[str, BootArtifacts] | None=None
+) -> CompAnyT:
+    data = _populate_boot_artifacts(data, known_boot_artifacts)
     data = _set_last_updated(data)
     data = _set_on_hold_when_enabled(data)
     data = _clear_session_when_manually_updated(data)
@@ -718,12 +1216,15 @@ def _set_auto_fields[CompAnyT: (ComponentData, ComponentRecord)](data: CompAnyT)
     return data
 
 def _populate_boot_artifacts[CompAnyT: (ComponentData, ComponentRecord)](
-    data: CompAnyT
+    data: CompAnyT,
+    known_boot_artifacts: Mapping[str, BootArtifacts] | None=None
 ) -> CompAnyT:
     """
     If there is a BSS Token present in the actual_state,
     then look up the boot artifacts and add them to the
-    actual_state data.
+    actual_state data. If known_boot_artifacts is specified,
+    it is used instead of the DB, and must contain every known
+    token that the caller needs.
 
     If the data contains any boot artifacts and the BSS
     token, then those boot artifacts will be overwritten.
@@ -741,8 +1242,13 @@ def _populate_boot_artifacts[CompAnyT: (ComponentData, ComponentRecord)](
         # Populate the boot artifacts using the bss_token
         if token:
             try:
-                data['actual_state']['boot_artifacts'] = get_boot_artifacts(
-                    token)
+                if known_boot_artifacts is None:
+                    data['actual_state']['boot_artifacts'] = get_boot_artifacts(token)
+                elif token in known_boot_artifacts:
+                    data['actual_state']['boot_artifacts'] = copy.deepcopy(
+                        known_boot_artifacts[token])
+                else:
+                    raise BssTokenUnknown
             except BssTokenUnknown:
                 LOGGER.warning("Reported BSS Token '%s' is unknown.", token)
     return data
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2022, 2024-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2022, 2024-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -30,7 +30,7 @@ from bos.common.types.options import OptionsDict
 from bos.common.utils import exc_type_msg
 from bos.server import redis_db_utils as dbutils
 from bos.server.controllers.utils import _400_bad_request
-from bos.server.options import DB, get_options, update_server_log_level
+from bos.server.options import DB, OptionsData, get_options, update_server_log_level
 from bos.server.utils import get_request_json
 
 LOGGER = logging.getLogger(__name__)
@@ -61,6 +61,8 @@ def patch_v2_options() -> tuple[OptionsDict, Literal[200]] | ConnexionResponse:
     options = get_options()
     options.update(patch_data)
     DB.put_options(options)
+    # Make sure this process picks up the new options immediately
+    OptionsData().invalidate()
     if "logging_level" in patch_data:
         update_server_log_level()
     return options, 200
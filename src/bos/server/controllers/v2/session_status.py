@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -27,7 +27,7 @@ SessionStatusData class
 """
 
 from collections import defaultdict, Counter
-from typing import NamedTuple
+from typing import NamedTuple, cast
 
 from bos.common.types.components import ComponentPhaseStr, ComponentRecord, COMPONENT_PHASE_STR
 from bos.common.types.session_extended_status import (SessionExtendedStatus,
@@ -39,19 +39,32 @@ from bos.common.utils import (cached_property,
                               get_current_time,
                               load_timestamp)
 from bos.common.values import Phase, Status
-from bos.server.controllers.v2.components import get_v2_components_data
+from bos.server.controllers.v2.components import DB as COMPONENTS_DB, get_v2_components_data
 
 
 MAX_COMPONENTS_IN_ERROR_DETAILS = 10
 
 
 class _CompCounts(NamedTuple):
+    num_components: int
+    staged: int
     phases: defaultdict[ComponentPhaseStr,int]
     successful: int
     failed: int
+    # Mapping from error messages to the IDs of (up to MAX_COMPONENTS_IN_ERROR_DETAILS+1)
+    # components with that error, and the total number of components with that error
+    errors: dict[str, tuple[list[str], int]]
 
 
 class SessionStatusData:
+    """
+    Calculates the extended status of a session.
+
+    For sessions which are not tenant-scoped, this uses the session component counters which are
+    maintained by the component DB, if they are available. Otherwise, it reads all of the
+    components of the session.
+    """
+
     def __init__(self, session_id: str, tenant_id: str | None, session: SessionRecordT) -> None:
         self._session_id = session_id
         self._tenant_id = tenant_id
@@ -108,16 +121,37 @@ class SessionStatusData:
     def staged_components(self) -> list[ComponentRecord]:
         return get_v2_components_data(staged_session=self.session_id, tenant=self.tenant_id)
 
-    @cached_property
+    @property
     def num_components(self) -> int:
-        return len(self.components) + len(self.staged_components)
+        return self._component_counts.num_components
 
     @cached_property
-    def _component_phase_success_fail_counts(self) -> _CompCounts:
+    def _component_counts(self) -> _CompCounts:
+        if not self.tenant_id:
+            # The component counters do not distinguish between sessions of the same name
+            # belonging to different tenants, so they are only used when there is no tenant
+            counts = COMPONENTS_DB.get_session_counts(
+                        self.session_id, max_error_components=MAX_COMPONENTS_IN_ERROR_DETAILS + 1)
+            if counts is not None:
+                phase_counts: defaultdict[ComponentPhaseStr,int] = defaultdict(int)
+                phase_counts.update(cast(dict[ComponentPhaseStr,int], counts.phases))
+                return _CompCounts(num_components=counts.total + counts.staged,
+                                   staged=counts.staged,
+                                   phases=phase_counts,
+                                   successful=counts.statuses.get(Status.stable, 0),
+                                   failed=counts.statuses.get(Status.failed, 0),
+                                   errors={ error: (counts.error_components.get(error, []), count)
+                                            for error, count in counts.errors.items() })
+        return self._count_components()
+
+    def _count_components(self) -> _CompCounts:
         phase_counts: defaultdict[ComponentPhaseStr,int] = defaultdict(int)
         num_successful = 0
         num_failed = 0
+        comp_errs_data: defaultdict[str, set[str]] = defaultdict(set)
         for c in self.components:
+            if (error_str := c.get('error')):
+                comp_errs_data[error_str].add(c['id'])
             c_status = c.get("status")
             if not c_status:
                 continue
@@ -132,19 +166,26 @@ class SessionStatusData:
                 continue
             if (phase := c_status.get('phase')) is not None:
                 phase_counts[phase] += 1
-        return _CompCounts(phases=phase_counts, successful=num_successful, failed=num_failed)
+        num_staged = len(self.staged_components)
+        return _CompCounts(num_components=len(self.components) + num_staged,
+                           staged=num_staged,
+                           phases=phase_counts,
+                           successful=num_successful,
+                           failed=num_failed,
+                           errors={ error: (list(component_ids), len(component_ids))
+                                    for error, component_ids in comp_errs_data.items() })
 
     @property
     def phase_counts(self) -> defaultdict[ComponentPhaseStr,int]:
-        return self._component_phase_success_fail_counts.phases
+        return self._component_counts.phases
 
     @property
     def successful_count(self) -> int:
-        return self._component_phase_success_fail_counts.successful
+        return self._component_counts.successful
 
     @property
     def failed_count(self) -> int:
-        return self._component_phase_success_fail_counts.failed
+        return self._component_counts.failed
 
     @property
     def complete_count(self) -> int:
@@ -152,7 +193,7 @@ class SessionStatusData:
 
     @property
     def staged_count(self) -> int:
-        return len(self.staged_components)
+        return self._component_counts.staged
 
     @cached_property
     def phase_percents(self) -> dict[ComponentPhaseStr,float]:
@@ -193,17 +234,12 @@ class SessionStatusData:
         Returns a mapping from error messages, to a SessionExtendedStatusErrorComponents
         object reflecting the components with that error.
         """
-        comp_errs_data: defaultdict[str, set[str]] = defaultdict(set)
-        for component in self.components:
-            if (error_str := component.get('error')):
-                comp_errs_data[error_str].add(component['id'])
         comp_errs: dict[str, SessionExtendedStatusErrorComponents] = {}
-        for error, component_ids in comp_errs_data.items():
-            component_list = ','.join(
-                list(component_ids)[:MAX_COMPONENTS_IN_ERROR_DETAILS])
-            if len(component_ids) > MAX_COMPONENTS_IN_ERROR_DETAILS:
+        for error, (component_ids, count) in self._component_counts.errors.items():
+            component_list = ','.join(component_ids[:MAX_COMPONENTS_IN_ERROR_DETAILS])
+            if count > MAX_COMPONENTS_IN_ERROR_DETAILS:
                 component_list += '...'
-            comp_errs[error] = SessionExtendedStatusErrorComponents(count=len(component_ids),
+            comp_errs[error] = SessionExtendedStatusErrorComponents(count=count,
                                                                     list=component_list)
         return comp_errs
 
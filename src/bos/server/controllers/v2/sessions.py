@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -21,6 +21,7 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 #
+from collections.abc import Iterator
 from datetime import datetime, timedelta
 from functools import partial
 import logging
@@ -30,6 +31,7 @@ import uuid
 
 import connexion
 from connexion.lifecycle import ConnexionResponse as CxResponse
+import flask
 
 from bos.common.tenant_utils import (get_tenant_from_header,
                                      reject_invalid_tenant)
@@ -45,10 +47,13 @@ from bos.common.utils import (exc_type_msg,
                               get_current_timestamp,
                               load_timestamp)
 from bos.server import redis_db_utils as dbutils
-from bos.server.controllers.utils import _400_bad_request, _404_tenanted_resource_not_found
+from bos.server.controllers.utils import (_400_bad_request,
+                                          _404_tenanted_resource_not_found,
+                                          conditional_get,
+                                          streamed_json_array)
 from bos.server.controllers.v2.boot_set import BootSetStatus, validate_boot_sets
 from bos.server.options import OptionsData
-from bos.server.controllers.v2.sessiontemplates import get_v2_sessiontemplate
+from bos.server.controllers.v2.sessiontemplates import get_v2_sessiontemplate_data
 from bos.server.models.v2_session import V2Session as Session  # noqa: E501
 from bos.server.models.v2_session_create import V2SessionCreate as SessionCreate  # noqa: E501
 from bos.server.options import update_server_log_level
@@ -111,7 +116,7 @@ def post_v2_session() -> tuple[SessionRecordT, Literal[201]] | CxResponse:  # no
     LOGGER.debug("Template Name: %s operation: %s", template_name,
                  session_create.operation)
     # Check that the template_name exists.
-    session_template_response = get_v2_sessiontemplate(template_name)
+    session_template_response = get_v2_sessiontemplate_data(template_name)
     if isinstance(session_template_response, CxResponse):
         msg = f"Session Template Name invalid: {template_name}"
         LOGGER.error(msg)
@@ -201,6 +206,7 @@ def patch_v2_session(session_id: str) -> tuple[SessionRecordT, Literal[200]] | C
 
 
 @dbutils.redis_error_handler
+@conditional_get(DB)
 def get_v2_session(
         session_id: str) -> tuple[SessionRecordT, Literal[200]] | CxResponse:  # noqa: E501
     """GET /v2/session
@@ -223,13 +229,25 @@ def get_v2_session(
     return session, 200
 
 
+def _not_age_filtered(*_args: object, min_age: str | None=None, max_age: str | None=None,
+                      **_kwargs: object) -> bool:
+    """
+    Responses to requests which filter sessions by age depend on the current time, so they
+    cannot be labeled with an ETag
+    """
+    return not min_age and not max_age
+
+
 @dbutils.redis_error_handler
+@conditional_get(DB, _not_age_filtered)
 def get_v2_sessions(min_age: str | None=None, max_age: str | None=None,
-                    status: str | None=None) -> tuple[list[SessionRecordT],
-                                                         Literal[200]]:  # noqa: E501
+                    status: str | None=None,
+                    stream: bool=False) -> tuple[list[SessionRecordT],
+                                                 Literal[200]] | flask.Response:  # noqa: E501
     """GET /v2/session
 
     List all sessions
+    If stream is true, the response is sent incrementally as the sessions are read.
     """
     # For all entry points into the server, first refresh options and update log level if needed
     update_server_log_level()
@@ -237,10 +255,14 @@ def get_v2_sessions(min_age: str | None=None, max_age: str | None=None,
     LOGGER.debug(
         "GET /v2/sessions invoked get_v2_sessions with min_age=%s max_age=%s status=%s",
         min_age, max_age, status)
-    response = _get_filtered_sessions(tenant=get_tenant_from_header(),
-                                      min_age=min_age,
-                                      max_age=max_age,
-                                      status=status)
+    sessions = _iter_filtered_sessions(tenant=get_tenant_from_header(),
+                                       min_age=min_age,
+                                       max_age=max_age,
+                                       status=status)
+    if stream:
+        LOGGER.debug("get_v2_sessions streaming sessions")
+        return streamed_json_array(sessions)
+    response = list(sessions)
     LOGGER.debug("get_v2_sessions returning %d sessions", len(response))
     return response, 200
 
@@ -288,9 +310,11 @@ def delete_v2_sessions(
         LOGGER.error("Error parsing age field: %s", exc_type_msg(err))
         return _400_bad_request(f"Error parsing age field: {err}")
 
-    for session in sessions:
-        _tenanted_delete_if_present(STATUS_DB, session['name'], tenant)
-        _tenanted_delete_if_present(DB, session['name'], tenant)
+    name_tenant_pairs = [ (session['name'], tenant) for session in sessions ]
+    STATUS_DB.tenanted_mdelete(name_tenant_pairs)
+    count = DB.tenanted_mdelete(name_tenant_pairs)
+    LOGGER.info("Deleted %d of %d matching sessions (tenant = '%s')", count,
+                len(name_tenant_pairs), tenant)
 
     return None, 204
 
@@ -369,8 +393,14 @@ def save_v2_session_status(
 
 def _get_filtered_sessions(tenant: str | None, min_age: str | None, max_age: str | None,
                            status: str | None) -> list[SessionRecordT]:
+    return list(_iter_filtered_sessions(tenant=tenant, min_age=min_age, max_age=max_age,
+                                        status=status))
+
+
+def _iter_filtered_sessions(tenant: str | None, min_age: str | None, max_age: str | None,
+                            status: str | None) -> Iterator[SessionRecordT]:
     if not any([tenant, min_age, max_age, status]):
-        return DB.get_all()
+        return DB.iter_values()
     min_start = None
     max_start = None
     if min_age:
@@ -385,9 +415,9 @@ def _get_filtered_sessions(tenant: str | None, min_age: str | None, max_age: str
         except Exception as e:
             LOGGER.warning('Unable to parse max_age: %s', max_age)
             raise ParsingException(e) from e
-    return DB.get_all_filtered(filter_func=partial(_matches_filter, tenant=tenant,
-                                                   min_start=min_start, max_start=max_start,
-                                                   status=status))
+    return DB.iter_filtered(filter_func=partial(_matches_filter, tenant=tenant,
+                                                min_start=min_start, max_start=max_start,
+                                                status=status))
 
 
 def _matches_filter(data: SessionRecordT, tenant: str | None, min_start: datetime | None,
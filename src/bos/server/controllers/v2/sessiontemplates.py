@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -21,11 +21,13 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 #
+from collections.abc import Iterator
 from functools import partial
 import logging
 from typing import Literal, cast
 
 from connexion.lifecycle import ConnexionResponse as CxResponse
+import flask
 
 from bos.common.tenant_utils import (get_tenant_from_header,
                                      reject_invalid_tenant)
@@ -37,7 +39,10 @@ from bos.common.types.templates import (BootSet,
                                         update_template_record)
 from bos.common.utils import exc_type_msg
 from bos.server import redis_db_utils as dbutils
-from bos.server.controllers.utils import _400_bad_request, _404_tenanted_resource_not_found
+from bos.server.controllers.utils import (_400_bad_request,
+                                          _404_tenanted_resource_not_found,
+                                          conditional_get,
+                                          streamed_json_array)
 from bos.server.options import update_server_log_level
 from bos.server.schema import validator
 from bos.server.utils import get_request_json
@@ -99,29 +104,39 @@ def put_v2_sessiontemplate(
 
 
 @dbutils.redis_error_handler
-def get_v2_sessiontemplates() -> tuple[list[SessionTemplate], Literal[200]]:  # noqa: E501
+@conditional_get(DB)
+def get_v2_sessiontemplates(
+    stream: bool=False
+) -> tuple[list[SessionTemplate], Literal[200]] | flask.Response:  # noqa: E501
     """
     GET /v2/sessiontemplates
 
     List all sessiontemplates
+    If stream is true, the response is sent incrementally as the templates are read.
     """
     # For all entry points into the server, first refresh options and update log level if needed
     update_server_log_level()
 
     LOGGER.debug("GET /v2/sessiontemplates invoked get_v2_sessiontemplates")
     tenant=get_tenant_from_header()
+    templates: Iterator[SessionTemplate]
     if tenant:
         def _matches_filter(data: SessionTemplate) -> SessionTemplate | None:
             return data if tenant == data.get("tenant") else None
-        response = DB.get_all_filtered(filter_func=_matches_filter)
+        templates = DB.iter_filtered(filter_func=_matches_filter)
     else:
-        response = DB.get_all()
+        templates = DB.iter_values()
+    if stream:
+        LOGGER.debug("get_v2_sessiontemplates streaming templates")
+        return streamed_json_array(templates)
+    response = list(templates)
     LOGGER.debug("get_v2_sessiontemplates returning %d templates",
                  len(response))
     return response, 200
 
 
 @dbutils.redis_error_handler
+@conditional_get(DB)
 def get_v2_sessiontemplate(
     session_template_id: str
 ) -> tuple[SessionTemplate, Literal[200]] | CxResponse:
@@ -135,6 +150,16 @@ def get_v2_sessiontemplate(
 
     LOGGER.debug("GET /v2/sessiontemplates/%s invoked get_v2_sessiontemplate",
                  session_template_id)
+    return get_v2_sessiontemplate_data(session_template_id)
+
+
+def get_v2_sessiontemplate_data(
+    session_template_id: str
+) -> tuple[SessionTemplate, Literal[200]] | CxResponse:
+    """
+    Get the session template by session template ID, for the tenant specified in the request
+    header (if any). This is used by other endpoint controllers which need a template.
+    """
     tenant = get_tenant_from_header()
     try:
         template = DB.tenanted_get(session_template_id, tenant)
@@ -248,7 +273,7 @@ def validate_v2_sessiontemplate(
     LOGGER.debug(
         "GET /v2/sessiontemplatesvalid/%s invoked validate_v2_sessiontemplate",
         session_template_id)
-    response = get_v2_sessiontemplate(session_template_id)
+    response = get_v2_sessiontemplate_data(session_template_id)
     if isinstance(response, CxResponse):
         # This means it was an error, so we just pass it up
         return response
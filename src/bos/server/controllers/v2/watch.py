@@ -0,0 +1,265 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+GET /v2/watch, which streams Component and Session changes as server-sent events
+
+The changes are received from the Redis pub/sub channels (see
+bos.server.redis_db_utils.notifications), so watching clients do not poll the database.
+Each stream only lasts for a bounded time, because uWSGI kills requests which take too long.
+Clients are expected to reconnect (as an EventSource does automatically), passing the ID of
+the last event they received in the Last-Event-ID header (or the after parameter), so that any
+Component changes made while they were disconnected are replayed from the change stream.
+Each open stream occupies a uWSGI worker thread, so the number of streams open at once in each
+worker process is limited, and further watches are refused (with a 503) until one ends.
+"""
+
+from collections.abc import Generator
+import logging
+import threading
+import time
+
+import connexion
+from connexion.lifecycle import ConnexionResponse as CxResponse
+import flask
+import orjson
+
+from bos.common.tenant_utils import (get_tenant_component_set,
+                                     get_tenant_from_header,
+                                     tenant_error_handler)
+from bos.common.types.general import JsonDict
+from bos.common.utils import exc_type_msg, int_from_env
+from bos.server import redis_db_utils as dbutils
+from bos.server.controllers.utils import _400_bad_request
+from bos.server.options import update_server_log_level
+
+LOGGER = logging.getLogger(__name__)
+DB = dbutils.ComponentDBWrapper()
+
+COMPONENTS_KIND = "components"
+SESSIONS_KIND = "sessions"
+
+# Must stay below the uWSGI harakiri timeout (see config/uwsgi.ini)
+MAX_WATCH_SECONDS = 25
+
+# A comment is sent if no event has been sent for this long, so that idle connections
+# are not closed by proxies
+_KEEPALIVE_SECONDS = 10
+
+# How often the tenant's component set is refreshed during a watch
+_TENANT_REFRESH_SECONDS = 10
+
+# Number of changes read at a time when replaying the change stream
+_REPLAY_BATCH_SIZE = 1000
+
+# Maximum number of watches open at once in each worker process. Each one occupies one of the
+# worker threads (see config/uwsgi.ini), so this must leave most of them for other requests.
+MAX_WATCHES_PER_PROCESS = int_from_env("BOS_MAX_WATCHES_PER_PROCESS", 4, minimum=1)
+_watch_slots = threading.BoundedSemaphore(MAX_WATCHES_PER_PROCESS)
+
+# Clients which are refused a watch are asked to retry after this long
+_WATCH_RETRY_AFTER_SECONDS = 5
+
+
+class _WatchFilter:
+    """
+    Decides which change notifications are sent to a watching client
+    """
+
+    def __init__(self, kind: str | None, session: str | None, id_set: set[str] | None,
+                 tenant: str) -> None:
+        self.components = kind in (None, COMPONENTS_KIND)
+        # The ids filter only applies to components
+        self.sessions = kind in (None, SESSIONS_KIND) and id_set is None
+        self.session = session
+        self.id_set = id_set
+        self.tenant = tenant
+        self._tenant_components: set[str] = set()
+        self._tenant_refreshed = 0.0
+        if tenant:
+            # Done before the response starts, so that an invalid tenant results in an error
+            self._refresh_tenant_components()
+
+    def _refresh_tenant_components(self) -> None:
+        self._tenant_components = get_tenant_component_set(self.tenant)
+        self._tenant_refreshed = time.monotonic()
+
+    def _in_tenant(self, component_id: str) -> bool:
+        if time.monotonic() - self._tenant_refreshed > _TENANT_REFRESH_SECONDS:
+            try:
+                self._refresh_tenant_components()
+            except Exception as err:
+                # Keep using the previous component set
+                LOGGER.warning("Error refreshing components of tenant '%s': %s", self.tenant,
+                               exc_type_msg(err))
+                self._tenant_refreshed = time.monotonic()
+        return component_id in self._tenant_components
+
+    def component_matches(self, change: dbutils.ComponentChange) -> bool:
+        """
+        Returns True if the specified component change should be sent
+        """
+        if not self.components:
+            return False
+        if self.id_set is not None and change.id not in self.id_set:
+            return False
+        if self.session is not None and change.session != self.session:
+            return False
+        return not self.tenant or self._in_tenant(change.id)
+
+    def session_matches(self, data: JsonDict) -> bool:
+        """
+        Returns True if the specified session change notification should be sent
+        """
+        if not self.sessions:
+            return False
+        if self.session is not None and data.get("name") != self.session:
+            return False
+        return not self.tenant or data.get("tenant") == self.tenant
+
+
+def _sse_event(event: str, data: object, event_id: str | None=None) -> bytes:
+    """
+    Encodes a server-sent event
+    """
+    lines = [f"event: {event}".encode()]
+    if event_id:
+        lines.append(f"id: {event_id}".encode())
+    lines.append(b"data: " + orjson.dumps(data))
+    return b"\n".join(lines) + b"\n\n"
+
+
+def _component_event(change: dbutils.ComponentChange) -> bytes:
+    return _sse_event("component", change._asdict(), change.cursor)
+
+
+def _replay_changes(after: str, watch_filter: _WatchFilter,
+                    replayed: set[str]) -> Generator[bytes, None, None]:
+    """
+    Yields events for the matching changes in the component change stream following the
+    specified cursor, and adds the cursors of all of the changes read to replayed
+    """
+    truncated = False
+    while True:
+        result = DB.get_changes(after, limit=_REPLAY_BATCH_SIZE)
+        truncated = truncated or result.truncated
+        for change in result.changes:
+            replayed.add(change.cursor)
+            if watch_filter.component_matches(change):
+                yield _component_event(change)
+        if len(result.changes) < _REPLAY_BATCH_SIZE:
+            break
+        after = result.next_cursor
+    if truncated:
+        yield _sse_event("reset", {"reason": "Some of the changes since the last event are no "
+                                             "longer available"})
+
+
+def _watch_events(watcher: dbutils.Watcher, watch_filter: _WatchFilter, after: str | None,
+                  deadline: float) -> Generator[bytes, None, None]:
+    """
+    Yields the server-sent events for the watch, until the deadline is reached or the watcher is
+    closed. In either case, the client may reconnect to continue watching.
+    """
+    with watcher:
+        # Ensure that the response headers are sent immediately
+        yield b": watching\n\n"
+        replayed: set[str] = set()
+        if after is not None and watch_filter.components:
+            # The watcher was created first, so any changes made after the replay are received
+            # by it. Those made during the replay may be received twice, so they are skipped.
+            yield from _replay_changes(after, watch_filter, replayed)
+        last_sent = time.monotonic()
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                notification = watcher.get(min(remaining, _KEEPALIVE_SECONDS))
+            except dbutils.WatcherClosed:
+                LOGGER.debug("Watch ended early because the watcher was closed")
+                return
+            event: bytes | None = None
+            if notification is None:
+                pass
+            elif notification.channel == dbutils.COMPONENT_CHANGES_CHANNEL:
+                change = dbutils.ComponentChange(**notification.data)
+                if change.cursor not in replayed and watch_filter.component_matches(change):
+                    event = _component_event(change)
+            elif notification.channel == dbutils.SESSION_CHANGES_CHANNEL:
+                if watch_filter.session_matches(notification.data):
+                    event = _sse_event("session", notification.data)
+            if event is not None:
+                yield event
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= _KEEPALIVE_SECONDS:
+                yield b": keepalive\n\n"
+                last_sent = time.monotonic()
+
+
+@tenant_error_handler
+@dbutils.redis_error_handler
+def get_v2_watch(kind: str | None=None,
+                 session: str | None=None,
+                 ids: str | None=None,
+                 after: str | None=None,
+                 timeout: int=MAX_WATCH_SECONDS) -> flask.Response | CxResponse:
+    """Used by the GET /watch API operation"""
+    # For all entry points into the server, first refresh options and update log level if needed
+    update_server_log_level()
+
+    if after is None:
+        after = flask.request.headers.get("Last-Event-ID") or None
+    LOGGER.debug("GET /v2/watch invoked get_v2_watch with kind=%s session=%s ids=%s after=%s "
+                 "timeout=%d", kind, session, ids, after, timeout)
+    id_set: set[str] | None = None
+    if ids is not None:
+        id_set = {component_id for component_id in ids.split(',') if component_id}
+    watch_filter = _WatchFilter(kind, session, id_set, get_tenant_from_header())
+    if after is not None:
+        # Check the cursor before the response starts, so that an invalid one results in an error
+        try:
+            DB.get_changes(after, limit=1)
+        except ValueError as err:
+            LOGGER.error("Error reading component changes: %s", exc_type_msg(err))
+            return _400_bad_request(str(err))
+    if not _watch_slots.acquire(blocking=False):
+        LOGGER.warning("Refusing watch: %d watches are already open in this process",
+                       MAX_WATCHES_PER_PROCESS)
+        return connexion.problem(
+            status=503,
+            title="Too many watches",
+            detail="Too many watches are open. Retry later.",
+            headers={"Retry-After": str(_WATCH_RETRY_AFTER_SECONDS)})
+    try:
+        deadline = time.monotonic() + min(timeout, MAX_WATCH_SECONDS)
+        watcher = dbutils.watch_changes()
+        response = flask.Response(
+            flask.stream_with_context(_watch_events(watcher, watch_filter, after, deadline)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    except Exception:
+        _watch_slots.release()
+        raise
+    # In case the stream is never started
+    response.call_on_close(watcher.close)
+    # Called once the response has been sent (or the client has disconnected)
+    response.call_on_close(_watch_slots.release)
+    return response
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2022, 2024-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2022, 2024-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -21,6 +21,7 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 #
+from collections.abc import Iterable
 import logging
 
 from bos.common.types.components import BootArtifacts
@@ -70,3 +71,14 @@ def get_boot_artifacts(token: str) -> BootArtifacts:
         return TOKENS_DB.get(token)
     except NotFoundInDB as exc:
         raise BssTokenUnknown from exc
+
+
+def get_boot_artifacts_map(tokens: Iterable[str]) -> dict[str, BootArtifacts]:
+    """
+    Get the boot artifacts associated with each of the specified BSS tokens, using a single
+    DB query.
+
+    Returns:
+      Mapping from BSS tokens to boot artifacts. Unknown tokens are omitted.
+    """
+    return TOKENS_DB.mget_skip_bad_keys(list(tokens))
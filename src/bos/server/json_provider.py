@@ -0,0 +1,120 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+JSON provider for the Flask app, using orjson
+
+Connexion encodes response bodies (and Flask decodes request bodies) using the JSON provider
+of the Flask app. The orjson provider produces the same JSON as the default one: keys are
+sorted, the indentation requested by connexion is used, and anything orjson cannot encode
+natively (such as the generated API model classes, and dates, which Flask encodes as HTTP
+dates) is converted by the generated JSONEncoder. The only difference is that non-ASCII
+characters are encoded as UTF-8 rather than escaped.
+
+Anything orjson cannot handle (such as integers too large for 64 bits, NaN when decoding, or
+formatting options it does not support) is passed to the default provider instead. That
+provider, and the one used when the stdlib provider is selected, also uses the generated
+JSONEncoder for anything that the json module cannot encode natively.
+"""
+
+from enum import StrEnum
+import logging
+import os
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+import orjson
+
+from bos.server.encoder import JSONEncoder
+
+LOGGER = logging.getLogger(__name__)
+
+# The JSON provider to use is set using this environment variable
+JSON_PROVIDER_ENV_VAR = "BOS_JSON_PROVIDER"
+
+class JsonProvider(StrEnum):
+    """
+    JSON providers which can be used by the API server
+    """
+    ORJSON = "orjson"
+    STDLIB = "stdlib"
+
+# Dates and dataclasses are passed to the JSONEncoder, which encodes them differently
+# than orjson does
+_DUMPS_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                  | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+_ENCODER = JSONEncoder()
+
+
+def get_json_provider_setting() -> JsonProvider:
+    """
+    Returns the JSON provider specified in the environment, defaulting to orjson
+    """
+    setting = os.environ.get(JSON_PROVIDER_ENV_VAR, JsonProvider.ORJSON.value)
+    try:
+        return JsonProvider(setting.lower())
+    except ValueError:
+        LOGGER.warning("Invalid value for %s (%s); using %s", JSON_PROVIDER_ENV_VAR, setting,
+                       JsonProvider.ORJSON.value)
+        return JsonProvider.ORJSON
+
+
+class StdlibProvider(DefaultJSONProvider):
+    """
+    The default Flask JSON provider, using the generated JSONEncoder for anything that the json
+    module cannot encode natively
+    """
+    default = staticmethod(_ENCODER.default)
+
+
+class OrjsonProvider(StdlibProvider):
+    """
+    Flask JSON provider which uses orjson, falling back to the stdlib provider for anything
+    that orjson cannot handle
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = _DUMPS_OPTIONS
+        indent = kwargs.get("indent")
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        elif indent:
+            return super().dumps(obj, **kwargs)
+        if set(kwargs).difference(["indent"]):
+            return super().dumps(obj, **kwargs)
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=_ENCODER.default, option=option).decode()
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass
+        # Either this raises the usual error, or the data is valid but unsupported by orjson
+        return super().loads(s, **kwargs)
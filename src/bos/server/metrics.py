@@ -0,0 +1,163 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Prometheus metrics for the BOS API server, served at /metrics
+
+Under uWSGI, each worker process records its metrics in files in the directory named by the
+PROMETHEUS_MULTIPROC_DIR environment variable, and /metrics (whichever worker handles it)
+reports the totals for all of them. That variable must be set before the server starts, and
+the directory is emptied when the server starts. If it is not set, /metrics only reports the
+metrics of the process which handles it.
+
+The API request metrics are labeled with the name of the endpoint controller. The tenant data
+metrics are recorded by bos.common.tenant_utils (which is also used by the operators, so it
+only records them once init_metrics has been called). Other metrics are defined by the modules
+which record them (for example, bos.server.redis_db_utils.read_cache).
+"""
+
+import logging
+import os
+from pathlib import Path
+
+import flask
+from prometheus_client import (CONTENT_TYPE_LATEST,
+                               REGISTRY,
+                               CollectorRegistry,
+                               Counter,
+                               Histogram,
+                               generate_latest,
+                               multiprocess)
+
+from bos.common.tenant_utils import set_tenant_metrics
+from bos.server.redis_db_utils.tracing import OperationStats
+
+LOGGER = logging.getLogger(__name__)
+
+MULTIPROC_DIR_ENV_VAR = "PROMETHEUS_MULTIPROC_DIR"
+
+# 64 bytes to 1 GiB
+_SIZE_BUCKETS = tuple(float(4**n) for n in range(3, 16))
+
+REQUEST_SECONDS = Histogram("bos_api_request_duration_seconds",
+                            "Time taken to handle BOS API requests (including sending any "
+                            "streamed response body)",
+                            ["operation", "method", "status"])
+REQUEST_BYTES = Histogram("bos_api_request_size_bytes", "Size of BOS API request bodies",
+                          ["operation"], buckets=_SIZE_BUCKETS)
+RESPONSE_BYTES = Histogram("bos_api_response_size_bytes",
+                           "Size of BOS API response bodies, as sent (not including streamed "
+                           "responses)", ["operation"], buckets=_SIZE_BUCKETS)
+
+REDIS_COMMANDS = Counter("bos_redis_commands", "Commands sent to the BOS databases",
+                         ["operation", "db"])
+REDIS_ROUND_TRIPS = Counter("bos_redis_round_trips", "Round trips to the BOS databases",
+                            ["operation", "db"])
+REDIS_BYTES_SENT = Counter("bos_redis_sent_bytes", "Bytes sent to the BOS databases",
+                           ["operation", "db"])
+REDIS_BYTES_RECEIVED = Counter("bos_redis_received_bytes",
+                               "Bytes received from the BOS databases", ["operation", "db"])
+REDIS_SECONDS = Counter("bos_redis_wait_seconds",
+                        "Time spent waiting for responses from the BOS databases",
+                        ["operation", "db"])
+REDIS_REQUEST_SECONDS = Histogram("bos_redis_request_wait_seconds",
+                                  "Time each BOS API request spent waiting for responses from "
+                                  "each BOS database (for requests which used it)", ["db"])
+
+TAPMS_REQUEST_SECONDS = Histogram("bos_tapms_request_duration_seconds",
+                                  "Time taken to retrieve tenant data from TAPMS")
+TENANT_CACHE_LOOKUPS = Counter("bos_tenant_cache_lookups",
+                               "Lookups in the tenant data cache, by result (hit, stale_hit, or "
+                               "miss)", ["result"])
+TENANT_CACHE_ERRORS = Counter("bos_tenant_cache_errors",
+                              "Failed attempts to retrieve tenant data for the cache")
+
+
+class _TenantMetrics:
+    """
+    Records the tenant data metrics (see bos.common.tenant_utils.TenantMetrics)
+    """
+
+    def observe_tapms_request(self, seconds: float) -> None:
+        TAPMS_REQUEST_SECONDS.observe(seconds)
+
+    def observe_cache_lookup(self, result: str) -> None:
+        TENANT_CACHE_LOOKUPS.labels(result).inc()
+
+    def observe_cache_error(self) -> None:
+        TENANT_CACHE_ERRORS.inc()
+
+
+def init_metrics() -> None:
+    """
+    Called when the server starts, before any worker processes are created. Sets up the
+    recording of the tenant data metrics, and removes the metrics recorded by any previous
+    server processes.
+    """
+    set_tenant_metrics(_TenantMetrics())
+    if (multiproc_dir := os.environ.get(MULTIPROC_DIR_ENV_VAR)) is None:
+        LOGGER.info("%s is not set; metrics will only be reported per process",
+                    MULTIPROC_DIR_ENV_VAR)
+        return
+    path = Path(multiproc_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    for db_file in path.glob("*.db"):
+        db_file.unlink()
+
+
+def observe_request(operation: str, method: str, status: int, seconds: float,
+                    request_bytes: int | None, response_bytes: int | None) -> None:
+    """
+    Record the metrics for a completed API request
+    """
+    REQUEST_SECONDS.labels(operation, method, str(status)).observe(seconds)
+    if request_bytes is not None:
+        REQUEST_BYTES.labels(operation).observe(request_bytes)
+    if response_bytes is not None:
+        RESPONSE_BYTES.labels(operation).observe(response_bytes)
+
+
+def observe_redis_calls(stats: OperationStats) -> None:
+    """
+    Record the database calls made by an API request
+    """
+    for db_name, db_stats in stats.by_db.items():
+        labels = (stats.operation, db_name)
+        REDIS_COMMANDS.labels(*labels).inc(db_stats.commands)
+        REDIS_ROUND_TRIPS.labels(*labels).inc(db_stats.round_trips)
+        REDIS_BYTES_SENT.labels(*labels).inc(db_stats.bytes_sent)
+        REDIS_BYTES_RECEIVED.labels(*labels).inc(db_stats.bytes_received)
+        REDIS_SECONDS.labels(*labels).inc(db_stats.seconds)
+        REDIS_REQUEST_SECONDS.labels(db_name).observe(db_stats.seconds)
+
+
+def metrics_view() -> flask.Response:
+    """
+    View function for /metrics
+    """
+    if MULTIPROC_DIR_ENV_VAR in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return flask.Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
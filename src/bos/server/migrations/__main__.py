@@ -2,7 +2,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2024-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2024-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -56,7 +56,7 @@ import sys
 
 from bos.common.values import LOG_FORMAT
 
-from .db import COMP_DB, SESS_DB, TEMP_DB, all_db_ready
+from .db import COMP_DB, SESS_DB, STAT_DB, TEMP_DB, all_db_ready
 from .sanitize import sanitize_component, sanitize_session, sanitize_session_template
 
 LOGGER = logging.getLogger(__name__)
@@ -82,6 +82,12 @@ def main() -> None:
         sanitize_component(key, data)
     LOGGER.info("Done sanitizing components")
 
+    for db in (TEMP_DB, SESS_DB, STAT_DB, COMP_DB):
+        # Existing records may have been written in a different format
+        db.convert_record_format()
+        # The indexes may be missing or stale if an older version of BOS was running
+        db.rebuild_indexes()
+
 
 if __name__ == "__main__":
     log_level = logging.getLevelName('INFO')
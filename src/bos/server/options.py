@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2019, 2021-2022, 2024-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2019, 2021-2022, 2024-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -41,13 +41,23 @@ LogLevelUpdateLock = threading.Lock()
 
 DB = dbutils.OptionsDBWrapper()
 
+# The options DB generation is checked at most this often. If it has changed, the options
+# are reloaded.
+_OPTIONS_CHECK_SECONDS = 1.0
+
+# The options are reloaded at least this often, even if the options DB generation has not changed
+_OPTIONS_MAX_AGE_SECONDS = 30.0
+
 @final
 class OptionsData(OptionsCache):
     """
     Handler for reading configuration options from the BOS DB
 
     This caches the options so that frequent use of these options do not all
-    result in DB calls.
+    result in DB calls. The options are only reloaded when the generation of the options DB
+    changes (or when they have not been reloaded for _OPTIONS_MAX_AGE_SECONDS), and the
+    generation is only checked once every _OPTIONS_CHECK_SECONDS. This means that calling
+    update() is almost always free.
     """
 
     # Use OptionsData instead of Self, because class is final
@@ -76,19 +86,55 @@ class OptionsData(OptionsCache):
         We only want this singleton to be initialized once
         """
         if _initialize:
+            # Time (from time.monotonic) that the options DB generation was last checked
+            self._last_check = float("-inf")
+            # Time (from time.monotonic) that the options were last loaded, and the
+            # options DB generation at that time
+            self._last_load = float("-inf")
+            self._loaded_generation: int | None = None
+            self._update_lock = threading.Lock()
             super().__init__()
 
+    def update(self) -> None:
+        """Refreshes the cached options data, if it may have changed"""
+        if time.monotonic() - self._last_check < _OPTIONS_CHECK_SECONDS:
+            return
+        with self._update_lock:
+            now = time.monotonic()
+            if now - self._last_check < _OPTIONS_CHECK_SECONDS:
+                # Another thread just did this
+                return
+            self._last_check = now
+            try:
+                generation: int | None = DB.generation
+            except Exception as err:
+                if hasattr(self, "options"):
+                    LOGGER.debug("Could not check BOS options generation: %s", exc_type_msg(err))
+                    # Continue using current option values
+                    return
+                # The options have not yet been loaded, so _get_options will handle this
+                generation = None
+            if generation is not None and generation == self._loaded_generation \
+               and now - self._last_load < _OPTIONS_MAX_AGE_SECONDS:
+                # No changes
+                return
+            super().update()
+            self._loaded_generation = generation
+            self._last_load = now
+
+    def invalidate(self) -> None:
+        """Ensures that the options are reloaded by the next call to update()"""
+        self._last_check = float("-inf")
+        self._loaded_generation = None
+
 
     def _get_options(self) -> OptionsDict:
         """Retrieves the current options from the BOS DB"""
         LOGGER.debug("Retrieving options data from BOS DB")
-        if DB.ready:
-            try:
-                return get_options()
-            except Exception as err:
-                LOGGER.info("Could not retrieve BOS options: %s", exc_type_msg(err))
-        else:
-            LOGGER.info("BOS DB is not ready -- cannot retrieve options")
+        try:
+            return get_options()
+        except Exception as err:
+            LOGGER.info("Could not retrieve BOS options: %s", exc_type_msg(err))
 
         # Continue using current option values, if we have them
         if hasattr(self, "options"):
@@ -116,13 +162,10 @@ def get_db_options_with_retries(max_attempts: int=10, sleep_seconds: int=1) -> O
         if attempt > 1:
             time.sleep(sleep_seconds)
         LOGGER.debug("Retrieving options data from BOS DB (attempt %d/%d)", attempt, max_attempts)
-        if DB.ready:
-            try:
-                return get_options()
-            except Exception as err:
-                LOGGER.debug("Could not retrieve BOS options: %s", exc_type_msg(err))
-        else:
-            LOGGER.debug("BOS DB is not ready -- cannot retrieve options")
+        try:
+            return get_options()
+        except Exception as err:
+            LOGGER.debug("Could not retrieve BOS options: %s", exc_type_msg(err))
         attempt+=1
     return None
 
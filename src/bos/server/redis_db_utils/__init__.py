@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2025-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -23,15 +23,30 @@
 #
 
 from .boot_artifacts_dbwrapper import BootArtifactsDBWrapper
-from .component_dbwrapper import ComponentDBWrapper
+from .codec import RecordFormat
+from .component_dbwrapper import (ComponentChange,
+                                  ComponentChanges,
+                                  ComponentDBWrapper,
+                                  SessionComponentCounts)
 from .dbwrapper import DBWrapper
 from .exceptions import (BosDBException,
                          BosDBEntryException,
+                         DBPatchConflict,
                          InvalidDBData,
                          InvalidDBDataType,
                          InvalidDBJsonDataType,
+                         InvalidDBPatch,
+                         KeySnapshotNotFound,
                          NonJsonDBData,
-                         NotFoundInDB)
+                         NotFoundInDB,
+                         UndecodableDBData)
+from .indexes import init_db_indexes
+from .notifications import (COMPONENT_CHANGES_CHANNEL,
+                            SESSION_CHANGES_CHANNEL,
+                            ChangeNotification,
+                            Watcher,
+                            WatcherClosed,
+                            watch_changes)
 from .options_dbwrapper import OptionsDBWrapper
 from .redis_error_handler import redis_error_handler
 from .session_dbwrapper import SessionDBWrapper
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2025-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -40,6 +40,9 @@ class BootArtifactsDBWrapper(DBWrapper[BootArtifacts]):
 
     _Database = Databases.BSS_TOKENS_BOOT_ARTIFACTS
 
+    # These records are read frequently and change rarely
+    _USE_READ_CACHE = True
+
     def _jsondict_to_bosdata(self, key: str, jsondict: JsonDict, /) -> BootArtifacts:
         """
         Eventually this should probably actually make sure that the record being returned is in the
@@ -0,0 +1,269 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Encoding and decoding of BOS DB records
+
+JSON records are stored as plain JSON, exactly as older versions of BOS stored them.
+Records in any other format begin with a header byte which can never begin a JSON record,
+followed by a byte identifying the format. The format of each record is detected when it is
+read, so a database may contain records in a mix of formats.
+
+Compressed records may use a zstd dictionary trained from the records in the database. The
+dictionaries are stored in the database itself, and are never removed, so that any record
+can always be decoded. The ID of the dictionary (if any) is recorded in the zstd frame header.
+"""
+
+from collections.abc import Iterable
+from enum import StrEnum
+import logging
+import os
+import threading
+import time
+from typing import cast
+
+import msgpack
+import orjson
+import redis
+import zstandard
+
+from .defs import META_KEY_PREFIX
+
+LOGGER = logging.getLogger(__name__)
+
+# The record format to use for writes is set using this environment variable
+RECORD_FORMAT_ENV_VAR = "BOS_DB_RECORD_FORMAT"
+
+class RecordFormat(StrEnum):
+    """
+    Formats in which BOS DB records can be written
+    """
+    JSON = "json"
+    MSGPACK = "msgpack"
+    MSGPACK_ZSTD = "msgpack+zstd"
+
+# 0xB0 is a UTF-8 continuation byte, so it cannot be the first byte of a JSON document
+_HEADER = b"\xb0"
+_FORMAT_IDS: dict[RecordFormat, bytes] = {
+    RecordFormat.MSGPACK: b"M",
+    RecordFormat.MSGPACK_ZSTD: b"Z",
+}
+_HEADER_LEN = len(_HEADER) + 1
+
+# The ID of the zstd dictionary to use for writes
+ZSTD_CURRENT_DICT_KEY = f"{META_KEY_PREFIX}zstd_dict"
+
+# The dictionaries themselves are stored under this prefix, followed by their IDs
+ZSTD_DICT_KEY_PREFIX = f"{META_KEY_PREFIX}zstd_dict:"
+
+_ZSTD_LEVEL = 3
+_ZSTD_DICT_SIZE = 16*1024
+
+# How often the ID of the dictionary to use for writes is read from the database, so that
+# dictionaries trained by other processes (such as the migration job) are used
+_WRITE_DICT_CHECK_SECONDS = 60
+
+class RecordDecodeError(ValueError):
+    """
+    Raised when a binary-format record cannot be decoded
+    """
+
+def dumps_json(data: object) -> bytes:
+    """
+    JSON-encode the specified data.
+    """
+    return orjson.dumps(data)
+
+def loads_json(data: bytes | bytearray | str) -> object:
+    """
+    Decode the specified JSON data. Raises json.JSONDecodeError on failure.
+    """
+    # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+    return orjson.loads(data)
+
+def _packb(data: object) -> bytes:
+    """
+    msgpack-encode the specified data
+    """
+    return cast(bytes, msgpack.packb(data, use_bin_type=True))
+
+def get_record_format_setting() -> RecordFormat:
+    """
+    Returns the record format specified in the environment, defaulting to JSON
+    """
+    setting = os.environ.get(RECORD_FORMAT_ENV_VAR, RecordFormat.JSON.value)
+    try:
+        return RecordFormat(setting.lower())
+    except ValueError:
+        LOGGER.warning("Invalid value for %s (%s); using %s", RECORD_FORMAT_ENV_VAR, setting,
+                       RecordFormat.JSON.value)
+        return RecordFormat.JSON
+
+class RecordCodec:
+    """
+    Encodes records for writing to a particular BOS database, and decodes records read from it.
+
+    This is threadsafe. The zstd compressors and decompressors are not, so each thread gets
+    its own.
+    """
+
+    def __init__(self, client: redis.Redis, write_format: RecordFormat) -> None:
+        self._client = client
+        self.write_format = write_format
+        self._format_prefix = b"" if write_format == RecordFormat.JSON \
+                              else _HEADER + _FORMAT_IDS[write_format]
+        # Mapping from dictionary ID to dictionary, for all dictionaries that have been loaded
+        self._zstd_dicts: dict[int, zstandard.ZstdCompressionDict] = {}
+        self._zstd_dicts_lock = threading.Lock()
+        # The ID of the dictionary used for writes (0 for none), and when it was last read
+        # from the database
+        self._write_dict_id = 0
+        self._write_dict_checked: float | None = None
+        self._thread_local = threading.local()
+
+    def encode(self, data: object) -> bytes:
+        """
+        Encode the specified record in the write format
+        """
+        match self.write_format:
+            case RecordFormat.JSON:
+                return dumps_json(data)
+            case RecordFormat.MSGPACK:
+                return self._format_prefix + _packb(data)
+            case RecordFormat.MSGPACK_ZSTD:
+                return self._format_prefix + self._get_compressor().compress(_packb(data))
+
+    def decode(self, data: bytes | bytearray | str) -> object:
+        """
+        Decode the specified record, whatever its format.
+        Raises json.JSONDecodeError or RecordDecodeError on failure.
+        """
+        if isinstance(data, str) or data[:len(_HEADER)] != _HEADER:
+            return loads_json(data)
+        format_id = bytes(data[len(_HEADER):_HEADER_LEN])
+        payload = bytes(data[_HEADER_LEN:])
+        try:
+            if format_id == _FORMAT_IDS[RecordFormat.MSGPACK]:
+                return msgpack.unpackb(payload, raw=False)
+            if format_id == _FORMAT_IDS[RecordFormat.MSGPACK_ZSTD]:
+                return msgpack.unpackb(self._decompress(payload), raw=False)
+        except RecordDecodeError:
+            raise
+        except Exception as err:
+            raise RecordDecodeError(f"Unable to decode record: {err}") from err
+        raise RecordDecodeError(f"Unknown record format ID: {format_id!r}")
+
+    def train_zstd_dict(self, samples: Iterable[object]) -> bool:
+        """
+        Train a new zstd dictionary from the specified sample records, store it in the database,
+        and use it for subsequent writes. Returns True if successful, False otherwise.
+        Training fails if there are not enough samples, in which case the records are still
+        compressed, but without a dictionary.
+        """
+        packed_samples = [_packb(sample) for sample in samples]
+        try:
+            zstd_dict = zstandard.train_dictionary(_ZSTD_DICT_SIZE, packed_samples,
+                                                   level=_ZSTD_LEVEL)
+        except zstandard.ZstdError as err:
+            LOGGER.info("Not using a zstd dictionary (%d samples): %s", len(packed_samples), err)
+            return False
+        dict_id = zstd_dict.dict_id()
+        with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(f"{ZSTD_DICT_KEY_PREFIX}{dict_id}", zstd_dict.as_bytes())
+            pipe.set(ZSTD_CURRENT_DICT_KEY, dict_id)
+            pipe.execute()
+        with self._zstd_dicts_lock:
+            self._zstd_dicts[dict_id] = zstd_dict
+            self._write_dict_id = dict_id
+            self._write_dict_checked = time.monotonic()
+        LOGGER.info("Trained zstd dictionary %d from %d samples", dict_id, len(packed_samples))
+        return True
+
+    def _get_compressor(self) -> zstandard.ZstdCompressor:
+        """
+        Returns this thread's compressor, recreating it if the dictionary to use for writes
+        has changed since it was created
+        """
+        dict_id = self._get_write_dict_id()
+        compressor: zstandard.ZstdCompressor | None = getattr(self._thread_local, "compressor",
+                                                              None)
+        if compressor is None or self._thread_local.compressor_dict_id != dict_id:
+            if dict_id:
+                compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL,
+                                                      dict_data=self._get_dict(dict_id))
+            else:
+                compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+            self._thread_local.compressor = compressor
+            self._thread_local.compressor_dict_id = dict_id
+        return compressor
+
+    def _get_write_dict_id(self) -> int:
+        """
+        Returns the ID of the zstd dictionary to use for writes (0 if there is none), reading it
+        from the database if it has not been read for _WRITE_DICT_CHECK_SECONDS
+        """
+        now = time.monotonic()
+        checked = self._write_dict_checked
+        if checked is not None and now - checked < _WRITE_DICT_CHECK_SECONDS:
+            return self._write_dict_id
+        # The redis type annotations are not ideal, so we need to use cast here
+        stored_id = cast(bytes | None, self._client.get(ZSTD_CURRENT_DICT_KEY))
+        dict_id = int(stored_id) if stored_id else 0
+        with self._zstd_dicts_lock:
+            if dict_id != self._write_dict_id:
+                LOGGER.info("Using zstd dictionary %d for writes", dict_id)
+                self._write_dict_id = dict_id
+            self._write_dict_checked = now
+        return dict_id
+
+    def _get_dict(self, dict_id: int) -> zstandard.ZstdCompressionDict:
+        """
+        Returns the specified zstd dictionary, loading it from the database if necessary
+        """
+        if (zstd_dict := self._zstd_dicts.get(dict_id)) is not None:
+            return zstd_dict
+        # The redis type annotations are not ideal, so we need to use cast here
+        # But we cast to object to avoid making any assumptions about its type
+        dict_data = cast(object, self._client.get(f"{ZSTD_DICT_KEY_PREFIX}{dict_id}"))
+        if not isinstance(dict_data, bytes):
+            raise RecordDecodeError(f"zstd dictionary {dict_id} not found in database")
+        zstd_dict = zstandard.ZstdCompressionDict(dict_data)
+        with self._zstd_dicts_lock:
+            self._zstd_dicts[dict_id] = zstd_dict
+        return zstd_dict
+
+    def _decompress(self, payload: bytes) -> bytes:
+        dict_id = zstandard.get_frame_parameters(payload).dict_id
+        decompressors: dict[int, zstandard.ZstdDecompressor] | None = getattr(
+            self._thread_local, "decompressors", None)
+        if decompressors is None:
+            decompressors = {}
+            self._thread_local.decompressors = decompressors
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id:
+                decompressor = zstandard.ZstdDecompressor(dict_data=self._get_dict(dict_id))
+            else:
+                decompressor = zstandard.ZstdDecompressor()
+            decompressors[dict_id] = decompressor
+        return decompressor.decompress(payload)
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2025-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -24,24 +24,435 @@
 """
 ComponentDBWrapper class
 """
-from typing import cast
+from collections.abc import Iterable, Mapping, Sequence
+import hashlib
+from itertools import batched
+import logging
+import re
+from typing import NamedTuple, cast
 
-from bos.common.types.components import ComponentRecord
+import redis
+
+from bos.common.types.components import ComponentData, ComponentRecord
 from bos.common.types.general import JsonDict
+from bos.common.utils import int_from_env
+
+from .codec import dumps_json, loads_json
+from .component_scripts import (COMPARE_AND_PUT_SCRIPT,
+                                GET_AND_DELETE_SCRIPT,
+                                PATCH_SCRIPT,
+                                PUT_SCRIPT,
+                                REINDEX_SCRIPT)
+from .dbwrapper import INDEX_VERSION_KEY, DBWrapper
+from .defs import META_KEY_PREFIX, Databases
+from .exceptions import DBPatchConflict, InvalidDBPatch, NotFoundInDB
+
+LOGGER = logging.getLogger(__name__)
+
+_INDEX_KEY_PREFIX = f"{META_KEY_PREFIX}index:"
+_INDEX_OF_KEY = f"{META_KEY_PREFIX}index_of"
+_COUNTS_OF_KEY = f"{META_KEY_PREFIX}counts_of"
+_SESSION_COUNTS_KEY_PREFIX = f"{META_KEY_PREFIX}session_counts:"
+_SESSION_ERRORS_KEY_PREFIX = f"{META_KEY_PREFIX}session_errors:"
+CHANGES_STREAM_KEY = f"{META_KEY_PREFIX}changes"
+
+# Approximate maximum number of entries kept in the component change stream.
+# If this is 0, component changes are not recorded.
+_CHANGES_MAXLEN = int_from_env("BOS_COMPONENT_CHANGES_MAXLEN", 100000)
+
+# Redis stream entry IDs are of the form <milliseconds>-<sequence number>
+_STREAM_ID_PATTERN = re.compile(r"^(\d+)-(\d+)$")
+
+# Maximum number of components passed to a single script call
+_SCRIPT_BATCH_SIZE = 500
+
+def _index_key(field: str, value: str) -> str:
+    return f"{_INDEX_KEY_PREFIX}{field}:{value}"
+
+def _patch_flags(*, skip_bad_keys: bool, check_actual_state: bool) -> str:
+    """
+    Returns the option flags argument for the patch script
+    """
+    return ("s" if skip_bad_keys else "") + ("a" if check_actual_state else "")
+
+def _decode(value: object) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+def _script_args(*args: str | bytes) -> list[str | bytes | int]:
+    """
+    Returns the arguments for one of the component scripts, prepending the arguments which are
+    common to all of them
+    """
+    return [META_KEY_PREFIX, _CHANGES_MAXLEN, *args]
+
+def _parse_stream_id(stream_id: str) -> tuple[int, int]:
+    """
+    Parses a Redis stream entry ID. Raises ValueError if it is not valid.
+    """
+    if (match := _STREAM_ID_PATTERN.match(stream_id)) is None:
+        raise ValueError(f"Invalid cursor: '{stream_id}'")
+    return int(match.group(1)), int(match.group(2))
+
+class SessionComponentCounts(NamedTuple):
+    """
+    Counts of the components of a session, as maintained by the component DB scripts
+    """
+    # Number of components in the session
+    total: int
+    # Number of components with the session staged
+    staged: int
+    # Number of components in the session, by status
+    statuses: dict[str, int]
+    # Number of enabled components in the session that are not on hold, by phase
+    phases: dict[str, int]
+    # Number of components in the session, by error
+    errors: dict[str, int]
+    # Some of the components in the session with each error
+    error_components: dict[str, list[str]]
+
+class ComponentChange(NamedTuple):
+    """
+    An entry in the component change stream
+    """
+    # The stream entry ID
+    cursor: str
+    # The component ID
+    id: str
+    # 'put', 'patch', or 'delete'
+    op: str
+    # The top-level fields of the component record which changed
+    fields: list[str]
+    # The new status, phase, and session of the component (empty if it was deleted)
+    status: str
+    phase: str
+    session: str
 
-from .dbwrapper import DBWrapper
-from .defs import Databases
+class ComponentChanges(NamedTuple):
+    """
+    A batch of entries read from the component change stream
+    """
+    changes: list[ComponentChange]
+    # The cursor to use to read the next batch
+    next_cursor: str
+    # True if some of the changes following the requested cursor are no longer in the stream
+    truncated: bool
 
 class ComponentDBWrapper(DBWrapper[ComponentRecord]):
     """
     Components database wrapper
+
+    In addition to the key index, this maintains Redis set indexes of the component IDs, by
+    enabled, session, staged session, phase, and status. All writes are done using Lua scripts,
+    so that the indexes are always updated atomically with the records.
     """
 
     _Database = Databases.COMPONENTS
 
+    # Version 2 added the session counters, and version 3 stores the status of each component
+    # in the component record (which the reindex script fills in for existing components)
+    _INDEX_VERSION = "3"
+
+    # The Lua scripts operate on JSON records
+    _BINARY_RECORDS_SUPPORTED = False
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._put_script = self.client.register_script(PUT_SCRIPT)
+        self._compare_and_put_script = self.client.register_script(COMPARE_AND_PUT_SCRIPT)
+        self._get_and_delete_script = self.client.register_script(GET_AND_DELETE_SCRIPT)
+        self._reindex_script = self.client.register_script(REINDEX_SCRIPT)
+        self._patch_script = self.client.register_script(PATCH_SCRIPT)
+
     def _jsondict_to_bosdata(self, key: str, jsondict: JsonDict, /) -> ComponentRecord:
         """
         Eventually this should probably actually make sure that the record being returned is in the
         correct format. But for now, we'll just satisfy mypy
         """
         return cast(ComponentRecord, jsondict)
+
+    def put(self, key: str, data: ComponentRecord | JsonDict, /) -> None:
+        """
+        JSON-encode the specified data and write it to the database under the specified key,
+        updating the indexes
+        """
+        self._put_script(args=_script_args(key, dumps_json(data)))
+
+    def mput(self, key_data_map: dict[str, ComponentRecord] | dict[str, JsonDict], /) -> None:
+        """
+        JSON-encode all data and then write each item to the database under its respective key,
+        updating the indexes
+        """
+        for batch in batched(key_data_map.items(), _SCRIPT_BATCH_SIZE):
+            args = _script_args()
+            for key, data in batch:
+                args.extend((key, dumps_json(data)))
+            self._put_script(args=args)
+
+    def mget_for_update(self, keys: Sequence[str], /) -> dict[str, tuple[ComponentRecord, bytes]]:
+        """
+        Returns a mapping from the specified keys to the corresponding component records, along
+        with their raw data, which can be passed to mput_if_unchanged.
+        Omits from the mapping any keys which do not exist in the DB.
+        """
+        # The redis type annotations are not ideal, so we need to use cast here
+        raw_data_list = cast(list[bytes | None], self.client.mget(keys))
+        return { key: (self._load_bosdata(key, data), data)
+                 for key, data in zip(keys, raw_data_list) if data is not None }
+
+    def mput_if_unchanged(self, key_data_map: Mapping[str, ComponentRecord],
+                          expected_data: Mapping[str, bytes], /) -> set[str]:
+        """
+        JSON-encode all data and then write each item to the database under its respective key,
+        updating the indexes -- but only if the raw data for that key is still the expected data
+        (as returned by mget_for_update).
+        Returns the keys which were not written, because their data had changed.
+        """
+        conflicts: set[str] = set()
+        for batch in batched(key_data_map.items(), _SCRIPT_BATCH_SIZE):
+            args = _script_args()
+            for key, data in batch:
+                args.extend((key, expected_data[key], dumps_json(data)))
+            # The redis type annotations are not ideal, so we need to use cast here
+            result = cast(list[bytes], self._compare_and_put_script(args=args))
+            conflicts.update(_decode(key) for key in result)
+        return conflicts
+
+    def _get_and_delete(self, key: str, /) -> object:
+        """
+        Delete the specified component from the DB and the indexes.
+        Returns its data, or None if it did not exist.
+        """
+        # The redis type annotations are not ideal, so we need to use cast here
+        # But we cast to object to avoid making any assumptions about its type
+        results = cast(list[object], self._get_and_delete_script(args=_script_args(key)))
+        return results[0]
+
+    def patch(self, key_patch_map: Mapping[str, ComponentData] | Mapping[str, ComponentRecord], /,
+              *, skip_bad_keys: bool = False,
+              check_actual_state: bool = False) -> dict[str, ComponentRecord]:
+        """
+        Apply the specified patches to the specified components (as update_component_record
+        would), and return a mapping from their IDs to their updated records.
+        The patches are applied inside the DB, so they are atomic with respect to other updates.
+
+        If skip_bad_keys is True, components which do not exist are skipped. Otherwise,
+        NotFoundInDB is raised and no components are updated.
+
+        If check_actual_state is True, DBPatchConflict is raised (and no components are updated)
+        if any patch includes actual_state but BOS is currently changing the state of the
+        component.
+        """
+        flags = _patch_flags(skip_bad_keys=skip_bad_keys, check_actual_state=check_actual_state)
+        if not skip_bad_keys:
+            self._check_all_exist(key_patch_map)
+        patched_records: dict[str, ComponentRecord] = {}
+        for keys in batched(key_patch_map, _SCRIPT_BATCH_SIZE):
+            args = _script_args(flags, "")
+            for key in keys:
+                args.extend((key, dumps_json(key_patch_map[key])))
+            patched_records.update(self._run_patch_script(keys, args))
+        return patched_records
+
+    def patch_all(self, keys: Sequence[str], patch: ComponentData, /, *,
+                  skip_bad_keys: bool = False) -> dict[str, ComponentRecord]:
+        """
+        Same as the patch method, except that the same patch is applied to all of the specified
+        components.
+        """
+        flags = _patch_flags(skip_bad_keys=skip_bad_keys, check_actual_state=False)
+        if not skip_bad_keys:
+            self._check_all_exist(keys)
+        patch_json = dumps_json(patch)
+        patched_records: dict[str, ComponentRecord] = {}
+        for key_batch in batched(keys, _SCRIPT_BATCH_SIZE):
+            patched_records.update(
+                self._run_patch_script(key_batch,
+                                       _script_args(flags, patch_json, *key_batch)))
+        return patched_records
+
+    def _check_all_exist(self, keys: Iterable[str], /) -> None:
+        """
+        The patch script checks that all of the components in each batch exist before updating
+        any of them. When there are multiple batches, this checks all of them up front, so
+        that a missing component in a later batch does not result in a partial update.
+        Raises NotFoundInDB if any components do not exist.
+        """
+        key_batches = list(batched(keys, _SCRIPT_BATCH_SIZE))
+        if len(key_batches) < 2:
+            return
+        for key_batch in key_batches:
+            with self.client.pipeline(transaction=False) as pipe:
+                for key in key_batch:
+                    pipe.exists(key)
+                for key, exists in zip(key_batch, pipe.execute()):
+                    if not exists:
+                        raise NotFoundInDB(db=self.db, key=key)
+
+    def _run_patch_script(self, keys: Sequence[str],
+                          args: list[str | bytes | int]) -> dict[str, ComponentRecord]:
+        """
+        Run the patch script with the specified arguments, and either return the patched
+        component records, or raise the appropriate exception.
+        """
+        # The redis type annotations are not ideal, so we need to use cast here
+        # But we cast to object to avoid making any assumptions about its type
+        result, *details = cast(list[object], self._patch_script(args=args))
+        match result:
+            case b"OK":
+                return { key: self._load_bosdata(key, data)
+                         for key, data in zip(keys, details) if data is not None }
+            case b"NOT_FOUND":
+                raise NotFoundInDB(db=self.db, key=_decode(details[0]))
+            case b"CONFLICT":
+                raise DBPatchConflict(db=self.db, key=_decode(details[0]))
+            case b"INVALID":
+                raise InvalidDBPatch(db=self.db, key=_decode(details[0]),
+                                     error=_decode(details[1]))
+        raise InvalidDBPatch(db=self.db, key=",".join(keys),
+                             error=f"Unexpected patch script result: {result!r}")
+
+    def _get_index_keys(self) -> list[str | bytes]:
+        """
+        Returns the names of all of the index keys in the DB
+        """
+        index_keys = super()._get_index_keys()
+        index_keys.extend((_INDEX_OF_KEY, _COUNTS_OF_KEY))
+        for prefix in (_INDEX_KEY_PREFIX, _SESSION_COUNTS_KEY_PREFIX, _SESSION_ERRORS_KEY_PREFIX):
+            index_keys.extend(self.client.scan_iter(match=f"{prefix}*"))
+        return index_keys
+
+    def _reindex(self, keys: Iterable[str], /) -> int:
+        """
+        Update the index entries for the specified components, based on their current data.
+        Returns the number of components processed.
+        """
+        return cast(int, self._reindex_script(args=_script_args(*keys)))
+
+    def get_indexed_ids(self, *,
+                        enabled: bool | None = None,
+                        session: str | None = None,
+                        staged_session: str | None = None,
+                        phase: str | None = None,
+                        statuses: Iterable[str] | None = None) -> set[str] | None:
+        """
+        Use the indexes to find the IDs of the components which match all of the specified
+        values (any of the statuses, if more than one is specified).
+        Returns None if the indexes are not ready, or if no values were specified, since in
+        that case the indexes cannot narrow down the set of components.
+        """
+        index_keys: list[str] = []
+        if enabled is not None:
+            index_keys.append(_index_key("enabled", "true" if enabled else "false"))
+        if session:
+            index_keys.append(_index_key("session", session))
+        if staged_session:
+            index_keys.append(_index_key("staged_session", staged_session))
+        if phase:
+            index_keys.append(_index_key("phase", phase))
+        status_keys = [_index_key("status", status) for status in statuses or [] if status]
+        if not index_keys and not status_keys:
+            return None
+
+        # Use a transaction so that the index version and index contents are consistent
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.get(INDEX_VERSION_KEY)
+            if index_keys:
+                pipe.sinter(index_keys)
+            if status_keys:
+                pipe.sunion(status_keys)
+            version, *id_sets = pipe.execute()
+        if version != self._INDEX_VERSION.encode():
+            LOGGER.debug("Component indexes are not ready")
+            return None
+        result: set[str] = { comp_id.decode() for comp_id in id_sets[0] }
+        for id_set in id_sets[1:]:
+            result.intersection_update(comp_id.decode() for comp_id in id_set)
+        return result
+
+    def get_session_counts(self, session: str, /, *,
+                           max_error_components: int) -> SessionComponentCounts | None:
+        """
+        Returns the counts of the components of the specified session, listing up to
+        max_error_components components with each error.
+        Returns None if the indexes are not ready.
+        """
+        # Use a transaction so that the index version and counts are consistent
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.get(INDEX_VERSION_KEY)
+            pipe.hgetall(f"{_SESSION_COUNTS_KEY_PREFIX}{session}")
+            pipe.hgetall(f"{_SESSION_ERRORS_KEY_PREFIX}{session}")
+            # The redis type annotations are not ideal, so we need to use cast here
+            version, raw_counts, raw_errors = cast(
+                tuple[bytes | None, dict[bytes, bytes], dict[bytes, bytes]], pipe.execute())
+        if version != self._INDEX_VERSION.encode():
+            LOGGER.debug("Component indexes are not ready")
+            return None
+        counts = { _decode(field): int(value) for field, value in raw_counts.items() }
+        statuses: dict[str, int] = {}
+        phases: dict[str, int] = {}
+        for field, value in counts.items():
+            kind, _, name = field.partition(":")
+            if kind == "status":
+                statuses[name] = value
+            elif kind == "phase":
+                phases[name] = value
+        errors = { _decode(error): int(value) for error, value in raw_errors.items() }
+        error_components: dict[str, list[str]] = {}
+        if errors:
+            error_list = list(errors)
+            with self.client.pipeline(transaction=False) as pipe:
+                for error in error_list:
+                    error_hash = hashlib.sha1(error.encode()).hexdigest()
+                    pipe.srandmember(_index_key("session_error", f"{session}:{error_hash}"),
+                                     max_error_components)
+                # The redis type annotations are not ideal, so we need to use cast here
+                members = cast(list[list[bytes]], pipe.execute())
+            error_components = { error: [_decode(comp_id) for comp_id in comp_ids]
+                                 for error, comp_ids in zip(error_list, members) }
+        return SessionComponentCounts(total=counts.get("total", 0),
+                                      staged=counts.get("staged", 0),
+                                      statuses=statuses,
+                                      phases=phases,
+                                      errors=errors,
+                                      error_components=error_components)
+
+    def get_changes(self, after: str | None, /, *, limit: int) -> ComponentChanges:
+        """
+        Returns up to limit entries from the component change stream, following the entry with
+        the specified cursor (or from the start of the stream, if it is None).
+        Raises ValueError if the cursor is not valid.
+        """
+        after_id = _parse_stream_id(after) if after is not None else None
+        start = f"({after}" if after is not None else "-"
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.xrange(CHANGES_STREAM_KEY, min=start, max="+", count=limit)
+            # Fails if the stream does not exist (no changes have been recorded)
+            pipe.xinfo_stream(CHANGES_STREAM_KEY)
+            # The redis type annotations are not ideal, so we need to use cast here
+            entries, info = cast(tuple[list[tuple[bytes, dict[bytes, bytes]]],
+                                       dict[str, object] | redis.ResponseError],
+                                 pipe.execute(raise_on_error=False))
+        if isinstance(entries, redis.ResponseError):
+            raise entries
+        if isinstance(info, redis.ResponseError):
+            last_id = max_deleted_id = "0-0"
+        else:
+            last_id = _decode(info["last-generated-id"])
+            max_deleted_id = _decode(info["max-deleted-entry-id"])
+        changes = [ComponentChange(cursor=_decode(entry_id),
+                                   id=_decode(fields[b"id"]),
+                                   op=_decode(fields[b"op"]),
+                                   fields=cast(list[str], loads_json(fields[b"fields"])),
+                                   status=_decode(fields[b"status"]),
+                                   phase=_decode(fields[b"phase"]),
+                                   # Not recorded by older versions of BOS
+                                   session=_decode(fields.get(b"session", b"")))
+                   for entry_id, fields in entries]
+        # If any entry following the specified cursor has been trimmed from the stream, then
+        # some changes since then are no longer available
+        truncated = after_id is not None and _parse_stream_id(max_deleted_id) > after_id
+        if changes:
+            next_cursor = changes[-1].cursor
+        else:
+            next_cursor = after if after is not None else last_id
+        return ComponentChanges(changes=changes, next_cursor=next_cursor, truncated=truncated)
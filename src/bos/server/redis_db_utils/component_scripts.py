@@ -0,0 +1,594 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Lua scripts used by the ComponentDBWrapper
+
+Every write to the components database goes through one of these scripts, so that the
+secondary indexes are updated atomically with the records themselves.
+
+All of the scripts expect ARGV[1] to be the BOS meta key prefix, and ARGV[2] to be the maximum
+length of the component change stream (see below). The remaining arguments are script-specific.
+
+As with the other databases, <prefix>keys is the sorted index of all component IDs, and
+<prefix>generation is incremented by every write.
+
+The status of each component is calculated whenever it is written, and stored in its
+status.status field, so that it does not need to be calculated when it is read.
+
+Index sets are named <prefix>index:<field>:<value>, and contain the IDs of all components
+with that value. The <prefix>index_of hash maps each component ID to a JSON list of the
+index names that it is currently a member of, so that its old memberships can be removed
+when it changes. For each session and component error, the index set
+<prefix>index:session_error:<session>:<SHA1 of error> contains the IDs of the components in
+the session with that error.
+
+The components of each session are also counted, in the following hashes:
+<prefix>session_counts:<session> has fields 'total' (components in the session), 'staged'
+(components with the session staged), 'status:<status>' (components in the session, by status),
+and 'phase:<phase>' (enabled components in the session which are not on hold, by phase).
+<prefix>session_errors:<session> maps each error to the number of components in the session
+with that error. These counts must be kept in sync with SessionStatusData in
+bos.server.controllers.v2.session_status. The <prefix>counts_of hash maps each component ID to
+a JSON list of the { hash, field } pairs that it is currently counted in.
+
+Every change to a component is also recorded in the <prefix>changes stream, with the fields
+'id' (the component ID), 'op' ('put', 'patch', or 'delete'), 'fields' (a JSON list of the
+top-level fields of the record that changed), 'status', 'phase', and 'session' (the new status,
+phase, and session of the component, or empty if it was deleted). The stream is trimmed to
+approximately the maximum length given by the caller. If that is 0, changes are not recorded.
+Writes which do not change a component are not recorded.
+
+Each change is also published, as a JSON object with the same fields plus 'cursor' (the ID of
+the stream entry, or empty if changes are not being recorded), to the <prefix>watch:components
+channel (see bos.server.redis_db_utils.notifications). Pub/sub channels are not specific to a
+database, so the channel name must identify the database.
+"""
+
+# Common functions used by all of the component scripts
+_PRELUDE = """
+local META = ARGV[1]
+local CHANGES_MAXLEN = tonumber(ARGV[2])
+local CHANGES = META .. 'changes'
+local WATCH_CHANNEL = META .. 'watch:components'
+local INDEX_OF = META .. 'index_of'
+local COUNTS_OF = META .. 'counts_of'
+local KEYS_INDEX = META .. 'keys'
+local GENERATION = META .. 'generation'
+
+-- Python truthiness, as applied to decoded JSON values
+local function truthy(v)
+    if v == nil or v == false or v == cjson.null or v == 0 or v == '' then
+        return false
+    end
+    if type(v) == 'table' and next(v) == nil then
+        return false
+    end
+    return true
+end
+
+local function as_table(v)
+    if type(v) == 'table' then
+        return v
+    end
+    return {}
+end
+
+local function nonempty_string(v)
+    return type(v) == 'string' and v ~= ''
+end
+
+-- This must be kept in sync with _calculate_status in bos.server.controllers.v2.components
+local function component_status(rec)
+    local status = as_table(rec.status)
+    if truthy(status.status_override) then
+        return tostring(status.status_override)
+    end
+    local phase = status.phase
+    local last_action = as_table(rec.last_action)
+    local action = last_action.action
+    if phase == 'powering_on' then
+        if action == 'powering_on' and not truthy(last_action.failed) then
+            return 'power_on_called'
+        end
+        return 'power_on_pending'
+    elseif phase == 'powering_off' then
+        if action == 'powering_off_gracefully' then
+            return 'power_off_gracefully_called'
+        elseif action == 'powering_off_forcefully' then
+            return 'power_off_forcefully_called'
+        end
+        return 'power_off_pending'
+    elseif phase == 'configuring' then
+        return 'configuring'
+    end
+    return 'stable'
+end
+
+-- Store the status of the component in its status.status field, as _set_status in
+-- bos.server.controllers.v2.components would. Returns true if the record was changed.
+local function materialize_status(rec)
+    if rec.status == nil then
+        rec.status = { phase = '', status_override = '' }
+    end
+    if type(rec.status) ~= 'table' then
+        return false
+    end
+    local status = component_status(rec)
+    if rec.status.status == status then
+        return false
+    end
+    rec.status.status = status
+    return true
+end
+
+local function index_names(rec)
+    local names = {}
+    if type(rec.enabled) == 'boolean' then
+        names[#names + 1] = 'enabled:' .. tostring(rec.enabled)
+    end
+    if nonempty_string(rec.session) then
+        names[#names + 1] = 'session:' .. rec.session
+    end
+    local staged_session = as_table(rec.staged_state).session
+    if nonempty_string(staged_session) then
+        names[#names + 1] = 'staged_session:' .. staged_session
+    end
+    local phase = as_table(rec.status).phase
+    if nonempty_string(phase) then
+        names[#names + 1] = 'phase:' .. phase
+    end
+    names[#names + 1] = 'status:' .. component_status(rec)
+    if nonempty_string(rec.session) and truthy(rec.error) then
+        local error_hash = redis.sha1hex(tostring(rec.error))
+        names[#names + 1] = 'session_error:' .. rec.session .. ':' .. error_hash
+    end
+    return names
+end
+
+-- Returns the session counters that the specified component is counted in,
+-- as a list of { hash, field } pairs
+local function counter_names(rec)
+    local counters = {}
+    if nonempty_string(rec.session) then
+        local counts = META .. 'session_counts:' .. rec.session
+        counters[#counters + 1] = { counts, 'total' }
+        counters[#counters + 1] = { counts, 'status:' .. component_status(rec) }
+        local status = as_table(rec.status)
+        -- A component with no status is treated as having an empty phase
+        local phase = status.phase
+        if rec.status == nil then
+            phase = ''
+        end
+        if truthy(rec.enabled) and status.status_override ~= 'on_hold' and
+           type(phase) == 'string' then
+            counters[#counters + 1] = { counts, 'phase:' .. phase }
+        end
+        if truthy(rec.error) then
+            counters[#counters + 1] = { META .. 'session_errors:' .. rec.session,
+                                        tostring(rec.error) }
+        end
+    end
+    local staged_session = as_table(rec.staged_state).session
+    if nonempty_string(staged_session) then
+        counters[#counters + 1] = { META .. 'session_counts:' .. staged_session, 'staged' }
+    end
+    return counters
+end
+
+-- Update the session counters for the specified component.
+-- rec is the decoded new record, or nil if the component has been deleted.
+local function recount(id, rec)
+    local old_counters = {}
+    local old = redis.call('HGET', COUNTS_OF, id)
+    if old then
+        for _, counter in ipairs(cjson.decode(old)) do
+            old_counters[cjson.encode(counter)] = counter
+        end
+    end
+    local counters = {}
+    if rec ~= nil then
+        counters = counter_names(rec)
+    end
+    for _, counter in ipairs(counters) do
+        local name = cjson.encode(counter)
+        if old_counters[name] then
+            old_counters[name] = nil
+        else
+            redis.call('HINCRBY', counter[1], counter[2], 1)
+        end
+    end
+    for _, counter in pairs(old_counters) do
+        if redis.call('HINCRBY', counter[1], counter[2], -1) <= 0 then
+            redis.call('HDEL', counter[1], counter[2])
+        end
+    end
+    if #counters > 0 then
+        redis.call('HSET', COUNTS_OF, id, cjson.encode(counters))
+    else
+        redis.call('HDEL', COUNTS_OF, id)
+    end
+end
+
+-- Update the index memberships and session counters of the specified component.
+-- rec is the decoded new record, or nil if the component has been deleted.
+local function reindex(id, rec)
+    recount(id, rec)
+    local old_names = {}
+    local old = redis.call('HGET', INDEX_OF, id)
+    if old then
+        for _, name in ipairs(cjson.decode(old)) do
+            old_names[name] = true
+        end
+    end
+    if rec == nil then
+        for name, _ in pairs(old_names) do
+            redis.call('SREM', META .. 'index:' .. name, id)
+        end
+        redis.call('HDEL', INDEX_OF, id)
+        redis.call('ZREM', KEYS_INDEX, id)
+        return
+    end
+    redis.call('ZADD', KEYS_INDEX, 0, id)
+    local names = index_names(rec)
+    for _, name in ipairs(names) do
+        if old_names[name] then
+            old_names[name] = nil
+        else
+            redis.call('SADD', META .. 'index:' .. name, id)
+        end
+    end
+    for name, _ in pairs(old_names) do
+        redis.call('SREM', META .. 'index:' .. name, id)
+    end
+    redis.call('HSET', INDEX_OF, id, cjson.encode(names))
+end
+
+-- Deep equality of decoded JSON values
+local function equal(a, b)
+    if type(a) ~= 'table' or type(b) ~= 'table' then
+        return a == b
+    end
+    for k, v in pairs(a) do
+        if not equal(v, b[k]) then
+            return false
+        end
+    end
+    for k, _ in pairs(b) do
+        if a[k] == nil then
+            return false
+        end
+    end
+    return true
+end
+
+-- Returns the sorted list of top-level fields which differ between the two decoded records.
+-- Either record may be nil.
+local function changed_fields(old, new)
+    old = old or {}
+    new = new or {}
+    local fields = {}
+    for k, v in pairs(new) do
+        if not equal(v, old[k]) then
+            fields[#fields + 1] = tostring(k)
+        end
+    end
+    for k, _ in pairs(old) do
+        if new[k] == nil then
+            fields[#fields + 1] = tostring(k)
+        end
+    end
+    table.sort(fields)
+    return fields
+end
+
+-- Record a change to the specified component in the change stream, and publish it.
+-- old_data is the encoded old record (or false/nil if there was none), and rec is the
+-- decoded new record (or nil if the component has been deleted).
+local function record_change(id, op, old_data, rec)
+    local old = nil
+    if old_data then
+        old = cjson.decode(old_data)
+    end
+    local fields = changed_fields(old, rec)
+    if #fields == 0 then
+        return
+    end
+    local status = ''
+    local phase = ''
+    local session = ''
+    if rec ~= nil then
+        status = component_status(rec)
+        phase = as_table(rec.status).phase
+        if type(phase) ~= 'string' then
+            phase = ''
+        end
+        if nonempty_string(rec.session) then
+            session = rec.session
+        end
+    end
+    local encoded_fields = cjson.encode(fields)
+    local cursor = ''
+    if CHANGES_MAXLEN > 0 then
+        cursor = redis.call('XADD', CHANGES, 'MAXLEN', '~', CHANGES_MAXLEN, '*', 'id', id,
+                            'op', op, 'fields', encoded_fields, 'status', status,
+                            'phase', phase, 'session', session)
+    end
+    redis.call('PUBLISH', WATCH_CHANNEL, cjson.encode({
+        cursor = cursor, id = id, op = op, fields = fields, status = status, phase = phase,
+        session = session }))
+end
+"""
+
+# ARGV[3..n] are alternating component IDs and JSON-encoded component records.
+# Everything is decoded before anything is written, so that a bad record cannot
+# cause a partial update.
+# Returns the number of records written.
+PUT_SCRIPT = _PRELUDE + """
+local records = {}
+for i = 3, #ARGV, 2 do
+    local rec = cjson.decode(ARGV[i + 1])
+    local data = ARGV[i + 1]
+    if materialize_status(rec) then
+        data = cjson.encode(rec)
+    end
+    records[#records + 1] = { ARGV[i], data, rec }
+end
+for _, r in ipairs(records) do
+    local old_data = redis.call('SET', r[1], r[2], 'GET')
+    reindex(r[1], r[3])
+    record_change(r[1], 'put', old_data, r[3])
+end
+if #records > 0 then
+    redis.call('INCR', GENERATION)
+end
+return #records
+"""
+
+# ARGV[3..n] are triples of component IDs, the data that each component is expected to
+# currently have, and JSON-encoded component records.
+# Each record is only written if its component still has the expected data.
+# Everything is decoded and compared before anything is written, as with PUT_SCRIPT.
+# Returns a list of the IDs of the components which were not written, because they had
+# changed (or been deleted).
+COMPARE_AND_PUT_SCRIPT = _PRELUDE + """
+local records = {}
+local conflicts = {}
+for i = 3, #ARGV, 3 do
+    local rec = cjson.decode(ARGV[i + 2])
+    local data = ARGV[i + 2]
+    if materialize_status(rec) then
+        data = cjson.encode(rec)
+    end
+    if redis.call('GET', ARGV[i]) == ARGV[i + 1] then
+        records[#records + 1] = { ARGV[i], data, rec }
+    else
+        conflicts[#conflicts + 1] = ARGV[i]
+    end
+end
+for _, r in ipairs(records) do
+    local old_data = redis.call('SET', r[1], r[2], 'GET')
+    reindex(r[1], r[3])
+    record_change(r[1], 'put', old_data, r[3])
+end
+if #records > 0 then
+    redis.call('INCR', GENERATION)
+end
+return conflicts
+"""
+
+# ARGV[3..n] are component IDs.
+# Returns a list with one entry per ID -- the deleted record, or nil if it did not exist.
+GET_AND_DELETE_SCRIPT = _PRELUDE + """
+local results = {}
+local deleted = false
+for i = 3, #ARGV do
+    local id = ARGV[i]
+    local data = redis.call('GETDEL', id)
+    if data then
+        reindex(id, nil)
+        record_change(id, 'delete', data, nil)
+        results[i - 2] = data
+        deleted = true
+    else
+        results[i - 2] = false
+    end
+end
+if deleted then
+    redis.call('INCR', GENERATION)
+end
+return results
+"""
+
+# ARGV[3..n] are component IDs.
+# Recomputes the index memberships of the specified components from their current records.
+# Also stores the current status of any of the components whose status.status field is
+# missing or out of date (for components written by older versions of BOS).
+# Returns the number of IDs processed.
+REINDEX_SCRIPT = _PRELUDE + """
+local written = false
+for i = 3, #ARGV do
+    local id = ARGV[i]
+    local data = redis.call('GET', id)
+    if data then
+        local rec = cjson.decode(data)
+        if materialize_status(rec) then
+            redis.call('SET', id, cjson.encode(rec))
+            written = true
+        end
+        reindex(id, rec)
+    else
+        reindex(id, nil)
+    end
+end
+if written then
+    redis.call('INCR', GENERATION)
+end
+return #ARGV - 2
+"""
+
+# ARGV[3] is a string of option flags:
+#   s -- skip any components which do not exist (otherwise, no changes are made if any are missing)
+#   a -- if a patch includes actual_state, refuse to apply it to any component whose state is
+#        being changed by BOS (in which case no changes are made)
+# ARGV[4] is either a JSON-encoded patch to apply to every specified component (in which case
+# ARGV[5..n] are component IDs), or is empty (in which case ARGV[5..n] are alternating component
+# IDs and JSON-encoded patches).
+#
+# Every patch is applied before anything is written, so that an error cannot cause a
+# partial update.
+#
+# Returns one of the following:
+#   { 'OK', <patched record or false if skipped>, ... } (one entry per component ID)
+#   { 'NOT_FOUND', <component ID> }
+#   { 'CONFLICT', <component ID> }
+#   { 'INVALID', <component ID>, <error message> }
+PATCH_SCRIPT = _PRELUDE + """
+local FLAGS = ARGV[3]
+local SKIP_MISSING = string.find(FLAGS, 's', 1, true) ~= nil
+local CHECK_ACTUAL_STATE = string.find(FLAGS, 'a', 1, true) ~= nil
+local SHARED_PATCH = ARGV[4]
+
+-- How each of the dict fields of a component is merged
+local DICT_FIELDS = {
+    actual_state = 'state', desired_state = 'state', staged_state = 'state',
+    last_action = 'dict', event_stats = 'dict', status = 'dict'
+}
+
+local function update(target, source, name)
+    if type(target) ~= 'table' then
+        error('existing ' .. name .. ' is not a dict', 0)
+    end
+    if type(source) ~= 'table' then
+        error('new ' .. name .. ' is not a dict', 0)
+    end
+    for k, v in pairs(source) do
+        target[k] = v
+    end
+end
+
+-- This must be kept in sync with update_component_record in bos.common.types.components
+local function merge(rec, patch)
+    patch.id = nil
+    for field, kind in pairs(DICT_FIELDS) do
+        local new = patch[field]
+        if new ~= nil then
+            patch[field] = nil
+            local cur = rec[field]
+            if cur == nil then
+                rec[field] = new
+            else
+                if kind == 'state' and type(new) == 'table' and new.boot_artifacts ~= nil then
+                    local boot_artifacts = new.boot_artifacts
+                    new.boot_artifacts = nil
+                    if type(cur) == 'table' and cur.boot_artifacts ~= nil then
+                        update(cur.boot_artifacts, boot_artifacts, field .. '.boot_artifacts')
+                    elseif type(cur) == 'table' then
+                        cur.boot_artifacts = boot_artifacts
+                    end
+                end
+                update(cur, new, field)
+            end
+        end
+    end
+    for k, v in pairs(patch) do
+        rec[k] = v
+    end
+end
+
+-- BOS does not allow the actual state to be updated while it is actively changing the state
+-- of the component, because that can interfere with its ability to determine the next action
+-- (for example, when the actual state is cleared by the setup operator to trigger a reboot).
+local function actual_state_change_allowed(rec)
+    if not truthy(rec.enabled) then
+        -- This component is not being managed by BOS
+        return true
+    end
+    if component_status(rec) == 'stable' then
+        -- BOS believes the component is in the correct state
+        return true
+    end
+    -- Otherwise, only allowed if BOS just powered on the component and is waiting
+    -- for the new state to be reported
+    return as_table(rec.last_action).action == 'powering_on'
+end
+
+local ids = {}
+local patches = {}
+if SHARED_PATCH ~= '' then
+    for i = 5, #ARGV do
+        ids[#ids + 1] = ARGV[i]
+        patches[#patches + 1] = SHARED_PATCH
+    end
+else
+    for i = 5, #ARGV, 2 do
+        ids[#ids + 1] = ARGV[i]
+        patches[#patches + 1] = ARGV[i + 1]
+    end
+end
+
+local records = {}
+local old_data = {}
+for i, id in ipairs(ids) do
+    local data = redis.call('GET', id)
+    if data then
+        old_data[i] = data
+        local rec = cjson.decode(data)
+        local patch = cjson.decode(patches[i])
+        if CHECK_ACTUAL_STATE and patch.actual_state ~= nil and
+           not actual_state_change_allowed(rec) then
+            return { 'CONFLICT', id }
+        end
+        local ok, err = pcall(merge, rec, patch)
+        if not ok then
+            return { 'INVALID', id, tostring(err) }
+        end
+        materialize_status(rec)
+        records[i] = rec
+    elseif SKIP_MISSING then
+        records[i] = false
+    else
+        return { 'NOT_FOUND', id }
+    end
+end
+
+local results = { 'OK' }
+local written = false
+for i, id in ipairs(ids) do
+    local rec = records[i]
+    if rec then
+        local data = cjson.encode(rec)
+        redis.call('SET', id, data)
+        reindex(id, rec)
+        record_change(id, 'patch', old_data[i], rec)
+        results[i + 1] = data
+        written = true
+    else
+        results[i + 1] = false
+    end
+end
+if written then
+    redis.call('INCR', GENERATION)
+end
+return results
+"""
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -26,10 +26,13 @@ DBWrapper class
 """
 
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Generator, Iterable
+from collections.abc import Callable, Generator, Iterable, Iterator
 from itertools import batched, islice
 import json
 import logging
+import threading
+import time
+import uuid
 from typing import (ClassVar,
                     Generic,
                     Protocol,
@@ -41,16 +44,111 @@ from redis.maint_notifications import MaintNotificationsConfig
 from bos.common.types.general import JsonData, JsonDict
 from bos.common.utils import exc_type_msg
 
-from .defs import DB_HOST, DB_PORT, Databases
+from .codec import RecordCodec, RecordDecodeError, RecordFormat, get_record_format_setting
+from .defs import DB_HOST, DB_PORT, META_KEY_PREFIX, Databases, is_meta_key
 from .defs import BosDataRecord as DataT
 from .exceptions import (BosDBException,
                          InvalidDBDataType,
                          InvalidDBJsonDataType,
+                         InvalidDBData,
                          NonJsonDBData,
-                         NotFoundInDB)
+                         KeySnapshotNotFound,
+                         NotFoundInDB,
+                         UndecodableDBData)
+from .read_cache import READ_CACHE_LOOKUPS, get_read_cache
+from .tracing import TRACING_ENABLED, TracingConnection
 
 LOGGER = logging.getLogger(__name__)
 
+# Sorted set of all of the data record keys in a database. All members have the same score, so
+# they are ordered lexically, allowing pages of keys to be retrieved using ZRANGE BYLEX.
+KEYS_INDEX_KEY = f"{META_KEY_PREFIX}keys"
+
+# Incremented by every write to a database
+GENERATION_KEY = f"{META_KEY_PREFIX}generation"
+
+# Set to the index version once the indexes of a database have been fully built
+INDEX_VERSION_KEY = f"{META_KEY_PREFIX}index_version"
+
+# Sorted sets holding snapshots of the keys of a database, so that a listing can be paged through
+# without being affected by records that are created or deleted while it is in progress
+_SNAPSHOT_KEY_PREFIX = f"{META_KEY_PREFIX}snapshot:"
+
+# How long a key snapshot is kept after it was last read
+_SNAPSHOT_TTL_SECONDS = 300
+
+# Member added to every key snapshot, so that the snapshot exists even if it contains no keys
+# (Redis does not store empty sorted sets). It sorts before any key, and is never returned.
+_SNAPSHOT_SENTINEL = ""
+
+# How long a process reuses the generation of a database that it last read, when checking
+# whether its read cache entries are current. Writes made by other processes may not be seen
+# by get() for up to this long.
+_READ_CACHE_GENERATION_SECONDS = 1.0
+
+# Held by a process while it builds the indexes of a database
+_INDEX_LOCK_KEY = f"{META_KEY_PREFIX}index_lock"
+
+# How long a process may hold the index lock before it is considered abandoned
+_INDEX_LOCK_SECONDS = 300
+
+# Maximum number of keys retrieved or processed by a single DB call
+_BATCH_SIZE = 500
+
+# Maximum number of records used to train a zstd dictionary
+_ZSTD_DICT_SAMPLE_COUNT = 5000
+
+# ARGV[1] is the name of the key index; ARGV[2..n] are keys.
+# Adds the specified keys to the key index if they exist, and removes them from it if they do not.
+# Returns the number of keys processed.
+_REINDEX_KEYS_SCRIPT = """
+for i = 2, #ARGV do
+    if redis.call('EXISTS', ARGV[i]) == 1 then
+        redis.call('ZADD', ARGV[1], 0, ARGV[i])
+    else
+        redis.call('ZREM', ARGV[1], ARGV[i])
+    end
+end
+return #ARGV - 1
+"""
+
+# ARGV[1..n] are (key, expected data, new data) triples.
+# Updates each key to its new data, but only if its current data is the expected data.
+# Returns the number of keys updated.
+_COMPARE_AND_SET_SCRIPT = """
+local count = 0
+for i = 1, #ARGV, 3 do
+    if redis.call('GET', ARGV[i]) == ARGV[i + 1] then
+        redis.call('SET', ARGV[i], ARGV[i + 2])
+        count = count + 1
+    end
+end
+return count
+"""
+
+class _LocalGeneration:
+    """
+    The generation of a database, as last read by this process, for the read cache
+    """
+
+    def __init__(self) -> None:
+        self.value = 0
+        # Time (from time.monotonic) that the value was read
+        self.checked = float("-inf")
+        self.lock = threading.Lock()
+
+    def update(self, generation: int) -> None:
+        """
+        Record a newly read generation (unless a later one has already been recorded)
+        """
+        with self.lock:
+            if generation >= self.value:
+                self.value = generation
+                self.checked = time.monotonic()
+
+# Shared by all of the DBWrapper instances for each database
+_LOCAL_GENERATIONS = {db: _LocalGeneration() for db in Databases}
+
 class SpecificDatabase(Protocol): # pylint: disable=too-few-public-methods
     """ Require that some classes set the _Database class variable """
     _Database: ClassVar[Databases]
@@ -61,9 +159,29 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
 
     Because the underlying Redis client is threadsafe, this class is as well,
     and can be safely shared by multiple threads.
+
+    In addition to the data records, each database has a sorted index of the record keys,
+    which is used to iterate over the keys in order without scanning the whole database.
+    Subclasses may maintain additional indexes.
     """
+
+    # Increment this if the index format changes, to force the indexes to be rebuilt
+    _INDEX_VERSION: ClassVar[str] = "1"
+
+    # Set this to False for databases whose records must always be written as JSON
+    _BINARY_RECORDS_SUPPORTED: ClassVar[bool] = True
+
+    # Set this to True for databases whose records are read frequently and change rarely, so
+    # that get() uses the read cache
+    _USE_READ_CACHE: ClassVar[bool] = False
+
     def __init__(self) -> None:
         self._client = _get_redis_client(self.db)
+        self._reindex_keys_script = self.client.register_script(_REINDEX_KEYS_SCRIPT)
+        self._compare_and_set_script = self.client.register_script(_COMPARE_AND_SET_SCRIPT)
+        write_format = (get_record_format_setting() if self._BINARY_RECORDS_SUPPORTED
+                        else RecordFormat.JSON)
+        self._codec = RecordCodec(self.client, write_format)
 
     @property
     def db(self) -> Databases:
@@ -87,7 +205,7 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
         Return True otherwise.
         """
         try:
-            self.info()
+            self.client.ping()
         except Exception as err:
             LOGGER.debug("Failed to query database %s : %s", self.db.name, exc_type_msg(err))
             return False
@@ -102,7 +220,8 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
 
     def _load_jsondict(self, key: str, data: object, /) -> JsonDict:
         """
-        Parses entry as JSON and verifies it is a dict, or raises an appropriate exception.
+        Decodes entry (whatever its format) and verifies it is a dict, or raises an appropriate
+        exception.
         """
         if data is None:
             raise NotFoundInDB(db=self.db, key=key)
@@ -112,12 +231,15 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
             raise InvalidDBDataType(db=self.db, entry_data=data, key=key)
 
         try:
-            jsondata = json.loads(data)
+            jsondata = self._codec.decode(data)
         except json.decoder.JSONDecodeError as exc:
             raise NonJsonDBData(self.db, key=key, entry_data=data,
                                 exc=exc_type_msg(exc)) from exc
+        except RecordDecodeError as exc:
+            raise UndecodableDBData(self.db, key=key, entry_data=data,
+                                    exc=exc_type_msg(exc)) from exc
 
-        # Because we just loaded the data using json.load, we know the format is JSON
+        # All of the record formats decode to JSON-compatible data
         # The only thing we really need to make sure of is that it's a dict
         if not isinstance(jsondata, dict):
             # Cast the entry data for poor mypy, since we know it is JsonData
@@ -132,34 +254,110 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
 
     def get(self, key: str, /) -> DataT:
         """Get the data for the given key."""
+        if self._USE_READ_CACHE:
+            return self._load_bosdata(key, self._cached_get(key))
         # The redis type annotations are not ideal, so we need to use cast here
         # But we cast to object to avoid making any assumptions about its type
         # We do this rather than casting to Any since the Any type bypasses type checking
         data = cast(object, self.client.get(key))
         return self._load_bosdata(key, data)
 
+    @property
+    def generation(self) -> int:
+        """
+        Returns the current generation of the database, which is incremented by every write
+        """
+        # The redis type annotations are not ideal, so we need to use cast here
+        return int(cast(bytes | None, self.client.get(GENERATION_KEY)) or 0)
+
+    def _cached_get(self, key: str, /) -> object:
+        """
+        Returns the raw data for the specified key (or None if it does not exist), using
+        the read cache if possible. Cache entries are labeled with the generation of the
+        database that they were read at, and only entries for the generation last read by this
+        process (which is reread every _READ_CACHE_GENERATION_SECONDS) are used, so a cache hit
+        does not require any database requests.
+        """
+        cache = get_read_cache()
+        local_generation = _LOCAL_GENERATIONS[self.db]
+        if time.monotonic() - local_generation.checked < _READ_CACHE_GENERATION_SECONDS:
+            # The generation may be up to _READ_CACHE_GENERATION_SECONDS old, but writes made by
+            # this process are always seen, because they update it
+            cache_key = f"{self.db.value}:{local_generation.value}:{key}"
+            if (cached_data := cache.get(cache_key)) is not None:
+                READ_CACHE_LOOKUPS.labels(self.db.name, "hit").inc()
+                return cached_data
+        READ_CACHE_LOOKUPS.labels(self.db.name, "miss").inc()
+        # Read the generation along with the data, so we know which generation the data belongs to
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.get(GENERATION_KEY)
+            pipe.get(key)
+            # The redis type annotations are not ideal, so we need to use cast here
+            # But we cast to object to avoid making any assumptions about its type
+            generation, data = cast(list[object], pipe.execute())
+        generation = int(cast(bytes | None, generation) or 0)
+        local_generation.update(generation)
+        if isinstance(data, bytes):
+            cache.set(f"{self.db.value}:{generation}:{key}", data)
+        return data
+
     def delete(self, key: str, /) -> None:
         """
         Deletes data from the database. No need to make this data-type specific, since we don't
         actually return the data.
         """
         # Use get_and_delete so we can raise a Not Found exception if appropriate
-        if self.client.getdel(key) is None:
+        if self._get_and_delete(key) is None:
             raise NotFoundInDB(db=self.db, key=key)
 
+    def mdelete(self, keys: Iterable[str], /) -> int:
+        """
+        Deletes the specified keys from the database, without retrieving their data.
+        Keys which do not exist are ignored.
+        Returns the number of keys that were deleted.
+        """
+        count = 0
+        for key_batch in batched(keys, _BATCH_SIZE):
+            with self.client.pipeline(transaction=True) as pipe:
+                pipe.unlink(*key_batch)
+                pipe.zrem(KEYS_INDEX_KEY, *key_batch)
+                pipe.incr(GENERATION_KEY)
+                # The redis type annotations are not ideal, so we need to use cast here
+                deleted, _, generation = cast(list[int], pipe.execute())
+            _LOCAL_GENERATIONS[self.db].update(generation)
+            count += deleted
+        return count
+
     def put(self, key: str, data: DataT | JsonDict, /) -> None:
         """
-        JSON-encode the specified data and write it to the database under the specified key
+        Encode the specified data and write it to the database under the specified key
         """
-        self.client.set(key, json.dumps(data))
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(key, self._codec.encode(data))
+            pipe.zadd(KEYS_INDEX_KEY, {key: 0})
+            pipe.incr(GENERATION_KEY)
+            # The redis type annotations are not ideal, so we need to use cast here
+            _LOCAL_GENERATIONS[self.db].update(cast(list[int], pipe.execute())[2])
 
     def get_and_delete_raw(self, key: str, /) -> JsonDict:
         """Get the data for the given key and delete it from the DB."""
-        # The redis type annotations are not ideal, so we need to use cast here
-        # But we cast to object to avoid making any assumptions about its type
-        # We do this rather than casting to Any since the Any type bypasses type checking
-        data = cast(object, self.client.getdel(key))
-        return self._load_jsondict(key, data)
+        return self._load_jsondict(key, self._get_and_delete(key))
+
+    def _get_and_delete(self, key: str, /) -> object:
+        """
+        Delete the specified key from the DB and the key index.
+        Returns its data, or None if it did not exist.
+        """
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.getdel(key)
+            pipe.zrem(KEYS_INDEX_KEY, key)
+            pipe.incr(GENERATION_KEY)
+            # The redis type annotations are not ideal, so we need to use cast here
+            # But we cast to object to avoid making any assumptions about its type
+            # We do this rather than casting to Any since the Any type bypasses type checking
+            results = cast(list[object], pipe.execute())
+        _LOCAL_GENERATIONS[self.db].update(cast(int, results[2]))
+        return results[0]
 
     def get_and_delete(self, key: str, /) -> DataT:
         jsondict = self.get_and_delete_raw(key)
@@ -179,7 +377,8 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
                          filter_func: Callable[[DataT], OutDataT | None], *,
                          start_after_key: str | None = None,
                          specific_keys: Iterable[str] | None = None,
-                         page_size: int = 0) -> list[OutDataT]:
+                         page_size: int = 0,
+                         snapshot: str | None = None) -> list[OutDataT]:
         """
         Get an array of data for all keys after passing them through the specified filter
         (discarding any for which the filter returns None)
@@ -187,14 +386,30 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
         If page_size is specified, the number of items in the returned list will be equal
         to or less than the page_size.
         More elements may remain and additional queries will be needed to acquire them.
+        If snapshot is specified, only the keys in that key snapshot are considered.
+        """
+        return list(self.iter_filtered(filter_func, start_after_key=start_after_key,
+                                       specific_keys=specific_keys, page_size=page_size,
+                                       snapshot=snapshot))
+
+    def iter_filtered[OutDataT](self,
+                      filter_func: Callable[[DataT], OutDataT | None], *,
+                      start_after_key: str | None = None,
+                      specific_keys: Iterable[str] | None = None,
+                      page_size: int = 0,
+                      snapshot: str | None = None) -> Iterator[OutDataT]:
+        """
+        The same as get_all_filtered, except that the data is yielded as it is read from the
+        database, rather than returned as a list.
         """
         filtered_values_including_nones = map(filter_func,
                                               self.iter_values(start_after_key=start_after_key,
-                                                               specific_keys=specific_keys))
+                                                               specific_keys=specific_keys,
+                                                               snapshot=snapshot))
         filtered_values = (data for data in filtered_values_including_nones if data is not None)
         if page_size:
-            return list(islice(filtered_values, page_size))
-        return list(filtered_values)
+            return islice(filtered_values, page_size)
+        return filtered_values
 
     def mget(self, keys: Iterable[str], /) -> dict[str, DataT]:
         """
@@ -202,7 +417,7 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
         Raises exception if any are not found.
         """
         raw_data_list: list[object] = []
-        for key_sublist in batched(keys, 500):
+        for key_sublist in batched(keys, _BATCH_SIZE):
             # The redis type annotations are not ideal, so we need to use cast here
             # But we cast to object to avoid making any assumptions about its type
             # We do this rather than casting to Any since the Any type bypasses type checking
@@ -233,40 +448,214 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
 
     def mput(self, key_data_map: dict[str, DataT] | dict[str, JsonDict], /) -> None:
         """
-        JSON-encode all data and then write each item to the database under its respective key
+        Encode all data and then write each item to the database under its respective key
         """
-        self.client.mset({ key: json.dumps(data) for key, data in key_data_map.items()})
+        if not key_data_map:
+            return
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.mset({ key: self._codec.encode(data) for key, data in key_data_map.items()})
+            pipe.zadd(KEYS_INDEX_KEY, dict.fromkeys(key_data_map, 0))
+            pipe.incr(GENERATION_KEY)
+            # The redis type annotations are not ideal, so we need to use cast here
+            _LOCAL_GENERATIONS[self.db].update(cast(list[int], pipe.execute())[2])
 
     def iter_values(self, /, *,
                     start_after_key: str | None = None,
-                    specific_keys: Iterable[str] | None = None) -> Generator[DataT, None, None]:
+                    specific_keys: Iterable[str] | None = None,
+                    snapshot: str | None = None) -> Generator[DataT, None, None]:
         """
         Iterate through every item in the database. Parse each item as a string and yield it.
         If start_after_key is specified, skip any keys that are lexically <= the specified key.
         """
         for _, data in self.iter_items(start_after_key=start_after_key,
-                                       specific_keys=specific_keys):
+                                       specific_keys=specific_keys,
+                                       snapshot=snapshot):
             yield data
 
     def iter_keys(self, /, *,
                   start_after_key: str | None = None,
-                  specific_keys: Iterable[str] | None = None) -> Generator[str, None, None]:
+                  specific_keys: Iterable[str] | None = None,
+                  snapshot: str | None = None) -> Generator[str, None, None]:
         """
         Sorted list of all current keys in DB
+
+        If snapshot is specified, the keys are read one page at a time from that key snapshot
+        (see create_key_snapshot), skipping any which are not in specific_keys (if it is
+        specified). Raises KeySnapshotNotFound if the snapshot does not exist.
+
+        Otherwise, if specific_keys is specified, the DB is not scanned at all -- the caller is
+        responsible for skipping any keys which turn out not to exist.
+
+        Otherwise, if the key index is ready, the keys are read from it one page at a time,
+        as they are needed. If not, the whole DB must be scanned and sorted.
         """
-        all_keys_set = {k.decode() for k in self.client.scan_iter()}
-        if specific_keys is not None:
-            all_keys_set.intersection_update(specific_keys)
+        if snapshot is not None:
+            key_filter = None if specific_keys is None else set(specific_keys)
+            for snapshot_page in self._iter_snapshot_pages(snapshot, start_after_key):
+                yield from (snapshot_page if key_filter is None else
+                            (k for k in snapshot_page if k in key_filter))
+            return
+        if specific_keys is None:
+            page = self._get_key_index_page(start_after_key, check_ready=True)
+            if page is not None:
+                while page:
+                    yield from page
+                    if len(page) < _BATCH_SIZE:
+                        return
+                    page = self._get_key_index_page(page[-1], check_ready=False)
+                return
+            all_keys_set = set(self._scan_keys())
+        else:
+            all_keys_set = {k for k in specific_keys if not is_meta_key(k)}
         all_keys_list = sorted(all_keys_set)
         if start_after_key is None:
             yield from all_keys_list
         else:
             yield from filter(lambda k: k > start_after_key, all_keys_list)
 
+    def create_key_snapshot(self, specific_keys: Iterable[str] | None = None) -> str:
+        """
+        Store a snapshot of the keys of all records in the DB (or of the specified keys),
+        which can be read using iter_keys (and the methods that call it). Returns its ID.
+
+        The snapshot expires if it is not read for _SNAPSHOT_TTL_SECONDS.
+        """
+        snapshot = uuid.uuid4().hex
+        snapshot_key = f"{_SNAPSHOT_KEY_PREFIX}{snapshot}"
+        if specific_keys is None:
+            # If the key index is ready, copy it, without reading any keys out of the DB
+            with self.client.pipeline(transaction=True) as pipe:
+                pipe.get(INDEX_VERSION_KEY)
+                pipe.zunionstore(snapshot_key, [KEYS_INDEX_KEY])
+                pipe.zadd(snapshot_key, {_SNAPSHOT_SENTINEL: 0})
+                pipe.expire(snapshot_key, _SNAPSHOT_TTL_SECONDS)
+                version = pipe.execute()[0]
+            if version == self._INDEX_VERSION.encode():
+                return snapshot
+            LOGGER.debug("Indexes for database %s are not ready", self.db.name)
+            self.client.unlink(snapshot_key)
+            specific_keys = self._scan_keys()
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.zadd(snapshot_key, {_SNAPSHOT_SENTINEL: 0})
+            pipe.expire(snapshot_key, _SNAPSHOT_TTL_SECONDS)
+            pipe.execute()
+        for keys in batched((k for k in specific_keys if not is_meta_key(k)), _BATCH_SIZE):
+            with self.client.pipeline(transaction=False) as pipe:
+                pipe.zadd(snapshot_key, dict.fromkeys(keys, 0))
+                pipe.expire(snapshot_key, _SNAPSHOT_TTL_SECONDS)
+                pipe.execute()
+        return snapshot
+
+    def _iter_snapshot_pages(self, snapshot: str,
+                             start_after_key: str | None, /) -> Generator[list[str], None, None]:
+        """
+        Yield pages of keys from the specified key snapshot, starting after the specified key,
+        and keeping the snapshot from expiring while it is being read.
+        Raises KeySnapshotNotFound if the snapshot does not exist.
+        """
+        snapshot_key = f"{_SNAPSHOT_KEY_PREFIX}{snapshot}"
+        while True:
+            # ZRANGEBYLEX syntax: '-' means the start of the set, '(' means exclusive
+            start = "-" if start_after_key is None else f"({start_after_key}"
+            with self.client.pipeline(transaction=False) as pipe:
+                pipe.expire(snapshot_key, _SNAPSHOT_TTL_SECONDS)
+                pipe.zrangebylex(snapshot_key, start, "+", start=0, num=_BATCH_SIZE)
+                exists, page = pipe.execute()
+            if not exists:
+                raise KeySnapshotNotFound(db=self.db, snapshot=snapshot)
+            yield [key.decode() for key in page if key != _SNAPSHOT_SENTINEL.encode()]
+            if len(page) < _BATCH_SIZE:
+                return
+            start_after_key = page[-1].decode()
+
+    def _scan_keys(self) -> Generator[str, None, None]:
+        """
+        Scan the DB and yield the keys of all data records, in no particular order
+        """
+        for key in self.client.scan_iter(count=_BATCH_SIZE):
+            if not is_meta_key(key):
+                yield key.decode()
+
+    def _get_key_index_page(self, start_after_key: str | None, /, *,
+                            check_ready: bool) -> list[str] | None:
+        """
+        Returns the next page of keys from the key index, starting after the specified key.
+        If check_ready is True, returns None if the key index is not ready.
+        """
+        # ZRANGEBYLEX syntax: '-' means the start of the set, '(' means exclusive
+        start = "-" if start_after_key is None else f"({start_after_key}"
+        with self.client.pipeline(transaction=check_ready) as pipe:
+            if check_ready:
+                pipe.get(INDEX_VERSION_KEY)
+            pipe.zrangebylex(KEYS_INDEX_KEY, start, "+", start=0, num=_BATCH_SIZE)
+            results = pipe.execute()
+        if check_ready and results[0] != self._INDEX_VERSION.encode():
+            LOGGER.debug("Indexes for database %s are not ready", self.db.name)
+            return None
+        return [key.decode() for key in results[-1]]
+
+    @property
+    def indexes_ready(self) -> bool:
+        """
+        Returns True if the indexes have been fully built and are current
+        """
+        return self.client.get(INDEX_VERSION_KEY) == self._INDEX_VERSION.encode()
+
+    def ensure_indexes(self) -> None:
+        """
+        Build the indexes, if they are not already built and no other process is building them.
+        """
+        if self.indexes_ready:
+            LOGGER.debug("Indexes for database %s are ready", self.db.name)
+            return
+        if not self.client.set(_INDEX_LOCK_KEY, 1, nx=True, ex=_INDEX_LOCK_SECONDS):
+            LOGGER.info("Indexes for database %s are being built by another process", self.db.name)
+            return
+        try:
+            # Check again, in case they were built between our first check and taking the lock
+            if not self.indexes_ready:
+                self.rebuild_indexes()
+        finally:
+            self.client.delete(_INDEX_LOCK_KEY)
+
+    def rebuild_indexes(self) -> None:
+        """
+        Discard the current indexes and rebuild them from the data records.
+
+        Until this completes, the indexes are reported as not ready, and callers fall back to
+        scanning the records directly. Writes made while this is running update the indexes as
+        usual, and rebuilding the index entries of a record is idempotent, so no updates are lost.
+        """
+        LOGGER.info("Rebuilding indexes for database %s", self.db.name)
+        index_keys = self._get_index_keys()
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(INDEX_VERSION_KEY)
+            pipe.unlink(*index_keys)
+            pipe.execute()
+        count = 0
+        for batch in batched(self._scan_keys(), _BATCH_SIZE):
+            count += self._reindex(batch)
+        self.client.set(INDEX_VERSION_KEY, self._INDEX_VERSION)
+        LOGGER.info("Done rebuilding indexes for database %s (%d records)", self.db.name, count)
+
+    def _get_index_keys(self) -> list[str | bytes]:
+        """
+        Returns the names of all of the index keys in the DB
+        """
+        return [KEYS_INDEX_KEY]
+
+    def _reindex(self, keys: Iterable[str], /) -> int:
+        """
+        Update the index entries for the specified keys, based on their current data.
+        Returns the number of keys processed.
+        """
+        return cast(int, self._reindex_keys_script(args=[KEYS_INDEX_KEY, *keys]))
+
     def _iter_items[DataFormat](
         self, /, *, start_after_key: str | None,
         load_func: Callable[[str, object], DataFormat],
-        specific_keys: Iterable[str] | None
+        specific_keys: Iterable[str] | None,
+        snapshot: str | None = None
     ) -> Generator[tuple[str, DataFormat], None, None]:
         """
         Iterate through every item in the database. Parse each item using the specified function
@@ -274,7 +663,8 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
         If start_after_key is specified, skip any keys that are lexically <= the specified key.
         """
         for next_keys in batched(self.iter_keys(start_after_key=start_after_key,
-                                                specific_keys=specific_keys), 500):
+                                                specific_keys=specific_keys,
+                                                snapshot=snapshot), _BATCH_SIZE):
             # The redis type annotations are not ideal, so we need to use cast here
             # But we cast to object to avoid making any assumptions about its type
             # We do this rather than casting to Any since the Any type bypasses type checking
@@ -285,23 +675,57 @@ class DBWrapper(SpecificDatabase, Generic[DataT], ABC):
 
     def iter_items(
         self, /, *, start_after_key: str | None = None,
-        specific_keys: Iterable[str] | None = None
+        specific_keys: Iterable[str] | None = None,
+        snapshot: str | None = None
     ) -> Generator[tuple[str, DataT], None, None]:
         """
         Wrapper for _iter_items that specified the appropriate BOS data type loading function,
         and defaults start_after_key to None.
         """
         yield from self._iter_items(start_after_key=start_after_key, load_func=self._load_bosdata,
-                                    specific_keys=specific_keys)
+                                    specific_keys=specific_keys, snapshot=snapshot)
 
     def iter_items_raw(self) -> Generator[tuple[str, JsonDict], None, None]:
         """
-        Intended for use by the BOS migration job. Wrapper for _iter_items that only does JSON
+        Intended for use by the BOS migration job. Wrapper for _iter_items that only does
         decoding, not any further data processing.
         """
         yield from self._iter_items(start_after_key=None, load_func=self._load_jsondict,
                                     specific_keys=None)
 
+    def convert_record_format(self) -> int:
+        """
+        Intended for use by the BOS migration job. Re-encode every record in the current write
+        format, first training a new zstd dictionary from the current records, if applicable.
+        Records which are modified while this is running are left alone, since they will
+        already have been written in the current format.
+        Returns the number of records that were re-encoded.
+        """
+        LOGGER.info("Converting %s records to %s format", self.db.name,
+                    self._codec.write_format.value)
+        if self._codec.write_format == RecordFormat.MSGPACK_ZSTD:
+            self._codec.train_zstd_dict(
+                data for _, data in islice(self.iter_items_raw(), _ZSTD_DICT_SAMPLE_COUNT))
+        count = 0
+        for keys in batched(self._scan_keys(), _BATCH_SIZE):
+            args: list[str | bytes] = []
+            # The redis type annotations are not ideal, so we need to use cast here
+            # But we cast to object to avoid making any assumptions about its type
+            for key, data in zip(keys, cast(list[object], self.client.mget(keys))):
+                if not isinstance(data, bytes):
+                    continue
+                try:
+                    new_data = self._codec.encode(self._load_jsondict(key, data))
+                except InvalidDBData as exc:
+                    LOGGER.warning("Not converting %s: %s", key, exc)
+                    continue
+                if new_data != data:
+                    args.extend((key, data, new_data))
+            if args:
+                count += cast(int, self._compare_and_set_script(args=args))
+        LOGGER.info("Converted %d %s records", count, self.db.name)
+        return count
+
 def _get_redis_client(db: Databases) -> redis.client.Redis:
     """Create a connection with the database."""
     LOGGER.debug("Creating database connection host: %s port: %s database: %d (%s)",
@@ -310,11 +734,20 @@ def _get_redis_client(db: Databases) -> redis.client.Redis:
         # explicitly disabling maint_notifications, to avoid a warning message being logged, as
         # they're not supported (although it causes no problems beyond the warning message)
         mn_config = MaintNotificationsConfig(enabled=False)
-        rclient: redis.client.Redis = redis.Redis(host=DB_HOST,
-                                                  port=DB_PORT,
-                                                  db=db.value,
-                                                  protocol=3,
-                                                  maint_notifications_config=mn_config)
+        if TRACING_ENABLED:
+            pool = redis.ConnectionPool(connection_class=TracingConnection,
+                                        host=DB_HOST,
+                                        port=DB_PORT,
+                                        db=db.value,
+                                        protocol=3,
+                                        maint_notifications_config=mn_config)
+            rclient: redis.client.Redis = redis.Redis(connection_pool=pool)
+        else:
+            rclient = redis.Redis(host=DB_HOST,
+                                  port=DB_PORT,
+                                  db=db.value,
+                                  protocol=3,
+                                  maint_notifications_config=mn_config)
     except Exception as err:
         LOGGER.error("Failed to connect to database %d (%s) : %s", db.value, db.name,
                      exc_type_msg(err))
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -48,6 +48,20 @@ class Databases(IntEnum):
 DB_HOST = 'cray-bos-db'
 DB_PORT = 6379
 
+# BOS keeps some bookkeeping data (like indexes) in the same databases as the records
+# themselves. All such keys begin with this prefix, and anything that iterates over the
+# keys in a database must skip them.
+META_KEY_PREFIX = '__bos__:'
+META_KEY_PREFIX_BYTES = META_KEY_PREFIX.encode()
+
+def is_meta_key(key: str | bytes) -> bool:
+    """
+    Returns True if the specified key is used for BOS bookkeeping, rather than for a data record
+    """
+    if isinstance(key, bytes):
+        return key.startswith(META_KEY_PREFIX_BYTES)
+    return key.startswith(META_KEY_PREFIX)
+
 # The decoded data formats for the different BOS databases
 BosDataRecord = TypeVar("BosDataRecord", BootArtifacts, ComponentRecord, OptionsDict,
                         Session, SessionExtendedStatus, SessionTemplate)
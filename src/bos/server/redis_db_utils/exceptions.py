@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -52,6 +52,16 @@ class BosDBException(Exception):
         return " ".join(err_info_list)
 
 
+class KeySnapshotNotFound(BosDBException):
+    """
+    Raised when a key snapshot does not exist (most likely because it has expired)
+    """
+    DEFAULT_MSG = "Key snapshot not found in database"
+
+    def __init__(self, db: Databases, snapshot: str, **kwargs: str|None) -> None:
+        super().__init__(db=db, snapshot=snapshot, **kwargs)
+
+
 class BosDBEntryException(BosDBException):
     """
     Parent class for exceptions related to specific DB entries
@@ -115,3 +125,32 @@ class NonJsonDBData(InvalidDBData):
     def __init__(self, db: Databases, entry_data: bytes | bytearray | str, key: str,
                  **kwargs: str|None) -> None:
         super().__init__(db=db, key=key, entry_data=entry_data, **kwargs)
+
+class UndecodableDBData(InvalidDBData):
+    """
+    Raised when decoding a binary-format entry fails
+    """
+    DEFAULT_MSG = "Unable to decode database entry"
+
+    def __init__(self, db: Databases, entry_data: bytes | bytearray | str, key: str,
+                 **kwargs: str|None) -> None:
+        super().__init__(db=db, key=key, entry_data=entry_data, **kwargs)
+
+class InvalidDBPatch(BosDBEntryException):
+    """
+    Raised when a patch cannot be applied to a DB entry (for example, because it would require
+    merging a dict field into a non-dict field)
+    """
+    DEFAULT_MSG = "Unable to apply patch to database entry"
+
+    def __init__(self, db: Databases, key: str, **kwargs: str|None) -> None:
+        super().__init__(db=db, key=key, **kwargs)
+
+class DBPatchConflict(BosDBEntryException):
+    """
+    Raised when a patch is not allowed to be applied to a DB entry in its current state
+    """
+    DEFAULT_MSG = "Patch not allowed for current state of database entry"
+
+    def __init__(self, db: Databases, key: str, **kwargs: str|None) -> None:
+        super().__init__(db=db, key=key, **kwargs)
@@ -0,0 +1,60 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Database index initialization
+"""
+
+import logging
+
+from bos.common.utils import exc_type_msg
+
+from .boot_artifacts_dbwrapper import BootArtifactsDBWrapper
+from .component_dbwrapper import ComponentDBWrapper
+from .dbwrapper import DBWrapper
+from .options_dbwrapper import OptionsDBWrapper
+from .session_dbwrapper import SessionDBWrapper
+from .session_status_dbwrapper import SessionStatusDBWrapper
+from .session_template_dbwrapper import SessionTemplateDBWrapper
+
+LOGGER = logging.getLogger(__name__)
+
+ALL_DB_WRAPPER_CLASSES: tuple[type[DBWrapper], ...] = (BootArtifactsDBWrapper,
+                                                      ComponentDBWrapper,
+                                                      OptionsDBWrapper,
+                                                      SessionDBWrapper,
+                                                      SessionStatusDBWrapper,
+                                                      SessionTemplateDBWrapper)
+
+def init_db_indexes() -> None:
+    """
+    Called at server startup to make sure that the indexes exist in all of the databases.
+    Failure is not fatal -- until the indexes of a database exist, queries just do not use them.
+    """
+    for db_class in ALL_DB_WRAPPER_CLASSES:
+        db = db_class()
+        try:
+            db.ensure_indexes()
+        except Exception as err:
+            LOGGER.warning("Unable to build indexes for database %s: %s", db.db.name,
+                           exc_type_msg(err))
@@ -0,0 +1,254 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Change notifications, using Redis pub/sub
+
+Changes to components are published by the component DB scripts, and changes to sessions are
+published by the SessionDBWrapper. Each notification is a JSON object describing the change.
+
+Within each process, all of the watchers share a single pub/sub connection, which is opened
+when the first watcher is created and closed when the last one is closed, so that the load on
+the database does not depend on the number of watchers.
+"""
+
+from collections.abc import Iterable
+import json
+import logging
+import queue
+import threading
+from types import TracebackType
+from typing import NamedTuple, Self
+
+import redis
+
+from bos.common.types.general import JsonDict
+from bos.common.utils import exc_type_msg
+
+from .dbwrapper import _get_redis_client
+from .defs import META_KEY_PREFIX, Databases
+
+LOGGER = logging.getLogger(__name__)
+
+# Pub/sub channels are not specific to a database, so their names must identify the database.
+# The component channel name must be kept in sync with bos.server.redis_db_utils.component_scripts
+COMPONENT_CHANGES_CHANNEL = f"{META_KEY_PREFIX}watch:components"
+SESSION_CHANGES_CHANNEL = f"{META_KEY_PREFIX}watch:sessions"
+_CHANNELS = (COMPONENT_CHANGES_CHANNEL, SESSION_CHANGES_CHANNEL)
+
+# Maximum number of notifications queued for a watcher. A watcher which falls further behind
+# than this is closed.
+_WATCHER_QUEUE_SIZE = 10000
+
+# How long the pub/sub thread waits for a message before checking whether it is still needed
+_POLL_SECONDS = 1.0
+
+# How long a new watcher waits for the pub/sub connection to be subscribed
+_SUBSCRIBE_TIMEOUT_SECONDS = 5.0
+
+
+class ChangeNotification(NamedTuple):
+    """
+    A notification received from one of the change channels
+    """
+    channel: str
+    data: JsonDict
+
+
+class WatcherClosed(Exception):
+    """
+    Raised when a watcher is read after it has been closed, either because it fell too far
+    behind, or because the pub/sub connection was lost
+    """
+
+
+class Watcher:
+    """
+    Receives all of the change notifications published after it was created, until it is closed.
+    This should be used as a context manager, so that it is always closed.
+    """
+
+    def __init__(self, dispatcher: "_Dispatcher") -> None:
+        self._dispatcher = dispatcher
+        self._queue: queue.Queue[ChangeNotification | None] = queue.Queue(_WATCHER_QUEUE_SIZE)
+        self._closed = False
+
+    def get(self, timeout: float) -> ChangeNotification | None:
+        """
+        Returns the next notification, or None if there is none within the specified timeout.
+        Raises WatcherClosed if the watcher has been closed.
+        """
+        if self._closed:
+            raise WatcherClosed()
+        try:
+            notification = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if notification is None:
+            self._closed = True
+            raise WatcherClosed()
+        return notification
+
+    def close(self) -> None:
+        """
+        Stop receiving notifications
+        """
+        self._closed = True
+        self._dispatcher.remove(self)
+
+    def _put(self, notification: ChangeNotification) -> None:
+        """
+        Called by the dispatcher with each notification
+        """
+        try:
+            self._queue.put_nowait(notification)
+        except queue.Full:
+            LOGGER.warning("Change watcher has fallen too far behind; closing it")
+            self._dispatcher.remove(self)
+            self._abort()
+
+    def _abort(self) -> None:
+        """
+        Called by the dispatcher when it stops sending notifications to this watcher
+        """
+        # Make room for the sentinel, if necessary. Anything discarded would not be read anyway.
+        while True:
+            try:
+                self._queue.put_nowait(None)
+                return
+            except queue.Full:
+                self._queue.get_nowait()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc_val: BaseException | None,
+                 exc_tb: TracebackType | None) -> None:
+        self.close()
+
+
+class _Dispatcher:
+    """
+    Receives notifications on the change channels, and passes them to all of the watchers in
+    this process. The pub/sub connection is only open while there are watchers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._watchers: set[Watcher] = set()
+        self._thread: threading.Thread | None = None
+        self._subscribed = threading.Event()
+        self._client: redis.Redis | None = None
+
+    def watch(self) -> Watcher:
+        """
+        Returns a new watcher. Once this returns, the watcher will receive every notification
+        subsequently published (unless the pub/sub connection fails, in which case the watcher
+        is closed).
+        """
+        watcher = Watcher(self)
+        with self._lock:
+            self._watchers.add(watcher)
+            if self._thread is None:
+                if self._client is None:
+                    self._client = _get_redis_client(Databases.COMPONENTS)
+                self._subscribed = threading.Event()
+                self._thread = threading.Thread(target=self._run,
+                                                args=(self._client, self._subscribed),
+                                                name="bos-change-notifications", daemon=True)
+                self._thread.start()
+            subscribed = self._subscribed
+        if not subscribed.wait(_SUBSCRIBE_TIMEOUT_SECONDS):
+            LOGGER.warning("Timed out waiting to subscribe to change notifications")
+        return watcher
+
+    def remove(self, watcher: Watcher) -> None:
+        """
+        Stop sending notifications to the specified watcher
+        """
+        with self._lock:
+            self._watchers.discard(watcher)
+
+    def _run(self, client: redis.Redis, subscribed: threading.Event) -> None:
+        """
+        Body of the pub/sub thread, which exits once there are no watchers left
+        """
+        LOGGER.debug("Subscribing to change notifications")
+        pubsub = client.pubsub()
+        try:
+            pubsub.subscribe(*_CHANNELS)
+            subscriptions = 0
+            while True:
+                message = pubsub.get_message(timeout=_POLL_SECONDS)
+                with self._lock:
+                    if not self._watchers:
+                        self._thread = None
+                        LOGGER.debug("No change watchers remain; unsubscribing")
+                        return
+                    watchers = list(self._watchers)
+                if message is None:
+                    continue
+                if message["type"] == "subscribe":
+                    subscriptions += 1
+                    if subscriptions == len(_CHANNELS):
+                        subscribed.set()
+                elif message["type"] == "message":
+                    notification = ChangeNotification(channel=message["channel"].decode(),
+                                                      data=json.loads(message["data"]))
+                    for watcher in watchers:
+                        watcher._put(notification)  # pylint: disable=protected-access
+        except Exception as err:
+            LOGGER.error("Error receiving change notifications: %s", exc_type_msg(err))
+            with self._lock:
+                watchers = list(self._watchers)
+                self._watchers.clear()
+                self._thread = None
+            _abort_all(watchers)
+        finally:
+            # If the thread is exiting before the subscription completed, do not leave
+            # new watchers waiting for it
+            subscribed.set()
+            pubsub.close()
+
+
+def _abort_all(watchers: Iterable[Watcher]) -> None:
+    for watcher in watchers:
+        watcher._abort()  # pylint: disable=protected-access
+
+
+_DISPATCHER = _Dispatcher()
+
+
+def watch_changes() -> Watcher:
+    """
+    Returns a watcher, which receives every change notification published after this returns,
+    until it is closed
+    """
+    return _DISPATCHER.watch()
+
+
+def publish_change(client: redis.Redis, channel: str, data: JsonDict) -> None:
+    """
+    Publish a change notification
+    """
+    client.publish(channel, json.dumps(data))
@@ -54,6 +54,9 @@ class OptionsDBWrapper(DBWrapper[OptionsDict]):
 
     _Database = Databases.OPTIONS
 
+    # These records are read frequently and change rarely
+    _USE_READ_CACHE = True
+
     @property
     def options_exist(self) -> bool:
         return OPTIONS_KEY in self
@@ -0,0 +1,157 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Read cache for frequently read DB records
+
+When the BOS server runs under uWSGI with the BOS cache configured (see config/uwsgi.ini),
+the cache is shared by all of the worker processes. Otherwise, each process has its own
+in-memory cache.
+
+The cache holds the raw (encoded) records, keyed by database, database generation, and record
+key. Every write to a database increments its generation, so a cached record can only be
+returned if the database has not changed since it was read.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import logging
+import os
+import threading
+
+from prometheus_client import Counter
+
+from bos.common.utils import int_from_env
+
+try:
+    # This module only exists when running under uWSGI
+    import uwsgi
+except ImportError:
+    uwsgi = None
+
+LOGGER = logging.getLogger(__name__)
+
+# Name of the cache defined in config/uwsgi.ini
+UWSGI_CACHE_NAME = "bos_db_records"
+
+# Maximum number of records held by the per-process cache
+_LOCAL_CACHE_ITEMS = int_from_env("BOS_DB_READ_CACHE_ITEMS", 1024)
+
+# Records larger than this are not cached
+_MAX_RECORD_BYTES = 64*1024
+
+READ_CACHE_LOOKUPS = Counter("bos_db_read_cache_lookups",
+                             "Lookups in the DB read cache, by database and result (hit or miss)",
+                             ["db", "result"])
+
+class ReadCache(ABC):
+    """
+    A bounded cache mapping strings to bytes. Implementations must be threadsafe.
+    """
+
+    @abstractmethod
+    def get(self, key: str, /) -> bytes | None:
+        """Returns the cached value, or None if it is not cached"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, /) -> None:
+        """Caches the specified value, possibly evicting other values"""
+
+class LocalReadCache(ReadCache):
+    """
+    In-process cache, with least-recently-used eviction
+    """
+
+    def __init__(self, max_items: int) -> None:
+        self._max_items = max_items
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, /) -> bytes | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, /) -> None:
+        if len(value) > _MAX_RECORD_BYTES:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_items:
+                self._data.popitem(last=False)
+
+class UwsgiReadCache(ReadCache):
+    """
+    Cache shared by all of the uWSGI worker processes. The uWSGI cache itself is responsible
+    for locking and for least-recently-used eviction.
+    """
+
+    def get(self, key: str, /) -> bytes | None:
+        value = uwsgi.cache_get(key, UWSGI_CACHE_NAME)
+        return value if isinstance(value, bytes) else None
+
+    def set(self, key: str, value: bytes, /) -> None:
+        if len(value) > _MAX_RECORD_BYTES:
+            return
+        # This does nothing if the cache is full and nothing can be evicted
+        uwsgi.cache_update(key, value, 0, UWSGI_CACHE_NAME)
+
+def _uwsgi_cache_available() -> bool:
+    """
+    Returns True if running under uWSGI with the BOS cache configured
+    """
+    if uwsgi is None:
+        return False
+    # uwsgi.opt maps each option to its value (or list of values, if it is specified more than
+    # once), as bytes
+    cache_options = uwsgi.opt.get("cache2", [])
+    if not isinstance(cache_options, list):
+        cache_options = [cache_options]
+    cache_name_option = f"name={UWSGI_CACHE_NAME}"
+    return any(cache_name_option in str(option, "utf-8") if isinstance(option, bytes)
+               else cache_name_option in str(option)
+               for option in cache_options)
+
+_read_cache: ReadCache | None = None
+_read_cache_lock = threading.Lock()
+
+def get_read_cache() -> ReadCache:
+    """
+    Returns the read cache for this process, creating it if needed
+    """
+    global _read_cache
+    if (cache := _read_cache) is not None:
+        return cache
+    with _read_cache_lock:
+        if _read_cache is None:
+            if _uwsgi_cache_available():
+                LOGGER.info("Using shared uWSGI cache for DB reads")
+                _read_cache = UwsgiReadCache()
+            else:
+                LOGGER.info("Using per-process cache for DB reads (up to %d records)",
+                            _LOCAL_CACHE_ITEMS)
+                _read_cache = LocalReadCache(_LOCAL_CACHE_ITEMS)
+        return _read_cache
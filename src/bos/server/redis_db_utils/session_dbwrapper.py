@@ -24,21 +24,47 @@
 """
 SessionDBWrapper class
 """
+from collections.abc import Iterable
 from typing import cast
 
 from bos.common.types.general import JsonDict
 from bos.common.types.sessions import Session
 
 from .defs import Databases
+from .notifications import SESSION_CHANGES_CHANNEL, publish_change
 from .tenant_aware_dbwrapper import TenantAwareDBWrapper
 
 class SessionDBWrapper(TenantAwareDBWrapper[Session]):
     """
     Session database wrapper
+
+    Every change made using the tenanted methods is published to SESSION_CHANGES_CHANNEL,
+    as a JSON object with the fields 'name', 'tenant', 'op' ('put' or 'delete'), and 'status'
+    (the new status of the session, or empty if it was deleted).
     """
 
     _Database = Databases.SESSIONS
 
+    def _publish_change(self, name: str, tenant: str | None, op: str, status: str) -> None:
+        publish_change(self.client, SESSION_CHANGES_CHANNEL,
+                       {"name": name, "tenant": tenant or "", "op": op, "status": status})
+
+    def tenanted_put(self, name: str, tenant: str | None, new_data: Session, /) -> None:
+        super().tenanted_put(name, tenant, new_data)
+        self._publish_change(name, tenant, "put", new_data.get("status", {}).get("status", ""))
+
+    def tenanted_delete(self, name: str, tenant: str | None, /) -> None:
+        super().tenanted_delete(name, tenant)
+        self._publish_change(name, tenant, "delete", "")
+
+    def tenanted_mdelete(self, name_tenant_pairs: Iterable[tuple[str, str | None]], /) -> int:
+        name_tenant_pairs = list(name_tenant_pairs)
+        count = super().tenanted_mdelete(name_tenant_pairs)
+        if count:
+            for name, tenant in name_tenant_pairs:
+                self._publish_change(name, tenant, "delete", "")
+        return count
+
     def _jsondict_to_bosdata(self, key: str, jsondict: JsonDict, /) -> Session:
         """
         Eventually this should probably actually make sure that the record being returned is in the
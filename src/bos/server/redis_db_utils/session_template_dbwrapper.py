@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2025-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -39,6 +39,9 @@ class SessionTemplateDBWrapper(TenantAwareDBWrapper[SessionTemplate]):
 
     _Database = Databases.SESSION_TEMPLATES
 
+    # These records are read frequently and change rarely
+    _USE_READ_CACHE = True
+
     def _jsondict_to_bosdata(self, key: str, jsondict: JsonDict, /) -> SessionTemplate:
         """
         Eventually this should probably actually make sure that the record being returned is in the
@@ -1,7 +1,7 @@
 #
 # MIT License
 #
-# (C) Copyright 2021-2025 Hewlett Packard Enterprise Development LP
+# (C) Copyright 2021-2026 Hewlett Packard Enterprise Development LP
 #
 # Permission is hereby granted, free of charge, to any person obtaining a
 # copy of this software and associated documentation files (the "Software"),
@@ -26,6 +26,7 @@ TenantAwareDBWrapper class
 """
 
 from abc import ABC
+from collections.abc import Iterable
 
 from typing import Generic
 
@@ -60,6 +61,14 @@ class TenantAwareDBWrapper(DBWrapper[DataT], Generic[DataT], ABC):
         """Deletes data from the database."""
         return self.delete(get_tenant_aware_key(name, tenant))
 
+    def tenanted_mdelete(self, name_tenant_pairs: Iterable[tuple[str, str | None]], /) -> int:
+        """
+        Deletes the data for the specified names/tenants from the database. Any which do not
+        exist are ignored. Returns the number that were deleted.
+        """
+        return self.mdelete(get_tenant_aware_key(name, tenant)
+                            for name, tenant in name_tenant_pairs)
+
     def tenanted_mput(self, name_tenant_data_map: dict[tuple[str, str|None], DataT], /) -> None:
         """Put data in to the database, replacing any old data."""
         self.mput({ get_tenant_aware_key(*name_tenant_tuple): data
@@ -0,0 +1,270 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Tracing of the commands sent to the BOS databases
+
+The Redis clients use TracingConnection, which counts the commands, round trips, bytes sent
+and received, and the time spent waiting for responses, for each database. The counts are
+attributed to the current operation (usually the API controller handling the current request),
+as set by start_operation, and its totals are returned by end_operation. Calls made outside of
+an operation (such as by background threads) are not counted.
+
+Commands which take longer than BOS_REDIS_SLOW_COMMAND_MS milliseconds (default 100; 0
+disables this) are logged. Tracing can be disabled entirely by setting BOS_REDIS_TRACING to
+false.
+
+A pipeline is a single round trip, however many commands it contains. The time of a round trip
+is from the start of sending the commands to the end of reading the last response, so the time
+of an operation is the total time it spent waiting for the database. The latency of each
+command (for the slow command log) is from the start of sending it to the end of reading its
+response.
+"""
+
+from collections import deque
+from collections.abc import Iterable
+from contextvars import ContextVar, Token
+import logging
+import os
+import socket
+import time
+from typing import Any, Self
+
+import redis
+
+from bos.common.utils import float_from_env
+
+from .defs import Databases
+
+LOGGER = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.environ.get("BOS_REDIS_TRACING", "true").lower() != "false"
+SLOW_COMMAND_SECONDS = float_from_env("BOS_REDIS_SLOW_COMMAND_MS", 100.0) / 1000
+
+# The operation name logged for slow commands made when no operation has been started (for
+# example, by background threads, and during server startup)
+NO_OPERATION = "-"
+
+
+class RedisCallStats:
+    """
+    Counts of the database calls made by an operation
+    """
+    __slots__ = ("commands", "round_trips", "bytes_sent", "bytes_received", "seconds")
+
+    def __init__(self) -> None:
+        self.commands = 0
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.seconds = 0.0
+
+    def add(self, other: Self) -> None:
+        """
+        Add the counts from the other stats to these
+        """
+        self.commands += other.commands
+        self.round_trips += other.round_trips
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.seconds += other.seconds
+
+    def __str__(self) -> str:
+        return (f"{self.commands} commands in {self.round_trips} round trips, "
+                f"{self.bytes_sent} bytes sent, {self.bytes_received} bytes received, "
+                f"{self.seconds * 1000:.1f} ms")
+
+
+class OperationStats:
+    """
+    The database calls made by an operation, by database name
+    """
+
+    def __init__(self, operation: str) -> None:
+        self.operation = operation
+        self.by_db: dict[str, RedisCallStats] = {}
+
+    def _get(self, db_name: str) -> RedisCallStats:
+        if (stats := self.by_db.get(db_name)) is None:
+            stats = self.by_db[db_name] = RedisCallStats()
+        return stats
+
+    def total(self) -> RedisCallStats:
+        """
+        Returns the totals for all databases
+        """
+        total = RedisCallStats()
+        for stats in self.by_db.values():
+            total.add(stats)
+        return total
+
+
+_CURRENT_OPERATION: ContextVar[OperationStats | None] = ContextVar("bos_redis_operation",
+                                                                   default=None)
+
+
+def start_operation(operation: str) -> Token[OperationStats | None]:
+    """
+    Attribute subsequent database calls (in the current context) to the specified operation.
+    Returns a token to pass to end_operation.
+    """
+    return _CURRENT_OPERATION.set(OperationStats(operation))
+
+
+def end_operation(token: Token[OperationStats | None]) -> OperationStats | None:
+    """
+    Stop attributing database calls to the operation started with the specified token, and
+    return its totals
+    """
+    stats = _CURRENT_OPERATION.get()
+    _CURRENT_OPERATION.reset(token)
+    return stats
+
+
+def current_operation() -> OperationStats | None:
+    """
+    Returns the operation to which database calls are currently attributed, if any
+    """
+    return _CURRENT_OPERATION.get()
+
+
+def _record(db_name: str, *, commands: int=0, round_trips: int=0, bytes_sent: int=0,
+            bytes_received: int=0, seconds: float=0.0) -> None:
+    if (operation := _CURRENT_OPERATION.get()) is None:
+        return
+    stats = operation._get(db_name)  # pylint: disable=protected-access
+    stats.commands += commands
+    stats.round_trips += round_trips
+    stats.bytes_sent += bytes_sent
+    stats.bytes_received += bytes_received
+    stats.seconds += seconds
+
+
+class _CountingSocket:
+    """
+    Wraps the socket of a TracingConnection, to count the bytes received from it
+    """
+
+    def __init__(self, sock: socket.socket, connection: "TracingConnection") -> None:
+        self._sock = sock
+        self._connection = connection
+
+    def recv(self, bufsize: int, *args: Any) -> bytes:
+        data = self._sock.recv(bufsize, *args)
+        self._connection.bytes_received += len(data)
+        return data
+
+    def recv_into(self, buffer: Any, *args: Any) -> int:
+        count = self._sock.recv_into(buffer, *args)
+        self._connection.bytes_received += count
+        return count
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._sock, name)
+
+
+def _command_name(name: object) -> str:
+    if isinstance(name, bytes):
+        return name.decode(errors="replace").upper()
+    return str(name).upper()
+
+
+class TracingConnection(redis.Connection):
+    """
+    Redis connection which records the calls made using it
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.bytes_received = 0
+        # Commands which have been packed, but not yet sent
+        self._unsent: list[str] = []
+        # Commands which have been sent, with the times they were sent, in the order in which
+        # their responses will be read
+        self._pending: deque[tuple[str, float]] = deque()
+        # The time up to which the waiting time for the pending commands has been recorded
+        self._last_recorded = 0.0
+        super().__init__(*args, **kwargs)
+        self._db_name = _db_name(self.db)
+
+    def _connect(self) -> _CountingSocket:  # type: ignore[override]
+        return _CountingSocket(super()._connect(), self)
+
+    def send_command(self, *args: Any, **kwargs: Any) -> None:
+        self._unsent.append(_command_name(args[0]))
+        super().send_command(*args, **kwargs)
+
+    def pack_commands(self, commands: Iterable[Any]) -> list[bytes | memoryview]:
+        commands = list(commands)
+        self._unsent.extend(_command_name(command[0]) for command in commands)
+        return super().pack_commands(commands)
+
+    def send_packed_command(self, command: Any, check_health: bool=True) -> None:
+        names, self._unsent = self._unsent, []
+        packed = [command] if isinstance(command, (str, bytes)) else command
+        bytes_sent = sum(len(item) for item in packed)
+        start = time.monotonic()
+        # This may send a health check command (which is handled recursively)
+        super().send_packed_command(command, check_health)
+        if names:
+            if not self._pending:
+                self._last_recorded = start
+            self._pending.extend((name, start) for name in names)
+        _record(self._db_name, commands=len(names), round_trips=1 if names else 0,
+                bytes_sent=bytes_sent)
+
+    def read_response(self, *args: Any, **kwargs: Any) -> Any:
+        bytes_before = self.bytes_received
+        try:
+            return super().read_response(*args, **kwargs)
+        finally:
+            bytes_received = self.bytes_received - bytes_before
+            if self._pending:
+                self._record_response(bytes_received)
+            else:
+                # Not a response to a command (for example, a pub/sub message), so the time
+                # spent waiting for it is not counted
+                _record(self._db_name, bytes_received=bytes_received)
+
+    def _record_response(self, bytes_received: int) -> None:
+        name, sent = self._pending.popleft()
+        now = time.monotonic()
+        _record(self._db_name, bytes_received=bytes_received, seconds=now - self._last_recorded)
+        self._last_recorded = now
+        latency = now - sent
+        if SLOW_COMMAND_SECONDS and latency >= SLOW_COMMAND_SECONDS:
+            operation = _CURRENT_OPERATION.get()
+            LOGGER.warning("Slow %s command on database %s: %.1f ms (operation %s)", name,
+                           self._db_name, latency * 1000,
+                           operation.operation if operation is not None else NO_OPERATION)
+
+    def disconnect(self, *args: Any) -> None:
+        self._unsent.clear()
+        self._pending.clear()
+        super().disconnect(*args)
+
+
+def _db_name(db: object) -> str:
+    try:
+        return Databases(int(db)).name  # type: ignore[call-overload]
+    except (TypeError, ValueError):
+        return str(db)
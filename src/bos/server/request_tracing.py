@@ -0,0 +1,98 @@
+#
+# MIT License
+#
+# (C) Copyright 2026 Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+#
+"""
+Instrumentation of API requests
+
+Each request is traced as an operation named after the endpoint controller handling it (see
+bos.server.redis_db_utils.tracing). When it ends, the database calls it made are logged, and
+its metrics are recorded (see bos.server.metrics). The request is not finished until any
+streamed response body has been sent, so the time taken and the calls made while generating
+it are included.
+"""
+
+import logging
+import time
+
+import flask
+
+from bos.server import metrics
+from bos.server.redis_db_utils import tracing
+
+LOGGER = logging.getLogger(__name__)
+
+# Operation name used for requests which do not match any endpoint
+UNMATCHED_OPERATION = "unmatched"
+
+
+def request_operation_name() -> str:
+    """
+    Returns the name of the endpoint controller handling the current request
+    """
+    endpoint = flask.request.endpoint
+    if endpoint is None:
+        return UNMATCHED_OPERATION
+    view = flask.current_app.view_functions.get(endpoint)
+    return getattr(view, "__name__", endpoint)
+
+
+def start_request_tracing() -> None:
+    """
+    For use as a flask before_request function
+    """
+    flask.g.request_start_time = time.monotonic()
+    flask.g.redis_tracing_token = tracing.start_operation(request_operation_name())
+
+
+def record_response(response: flask.Response) -> flask.Response:
+    """
+    For use as a flask after_request function. This must run after any other after_request
+    functions which modify the response (so it must be registered before them).
+    """
+    flask.g.response_status = response.status_code
+    flask.g.response_size = None if response.is_streamed else response.content_length
+    return response
+
+
+def end_request_tracing(exc: BaseException | None) -> None:
+    """
+    For use as a flask teardown_request function
+    """
+    token = flask.g.pop("redis_tracing_token", None)
+    if token is None:
+        return
+    stats = tracing.end_operation(token)
+    if stats is None:
+        return
+    # If the request failed with an unhandled exception, the after_request functions did not run
+    status = flask.g.pop("response_status", 500 if exc is not None else 200)
+    metrics.observe_request(stats.operation, flask.request.method, status,
+                            time.monotonic() - flask.g.pop("request_start_time"),
+                            flask.request.content_length, flask.g.pop("response_size", None))
+    metrics.observe_redis_calls(stats)
+    if not stats.by_db or not LOGGER.isEnabledFor(logging.DEBUG):
+        return
+    LOGGER.debug("%s %s (%s) database calls: %s; %s", flask.request.method, flask.request.path,
+                 stats.operation, stats.total(),
+                 "; ".join(f"{db_name}: {db_stats}"
+                           for db_name, db_stats in sorted(stats.by_db.items())))